@@ -0,0 +1,241 @@
+"""
+Load generator for the gateway -> agent -> MCP server path.
+
+Sends queries at a fixed arrival rate (open loop, --rps) or from a fixed
+number of workers (closed loop, --concurrency) and reports throughput, error
+rates and p50/p95/p99 latency: end to end as seen by the client, and per hop
+from the Server-Timing headers the services add (gateway, upstream, agent,
+queue, llm, tool).
+
+    python benchmarks/loadgen.py --rps 20 --duration 30
+    python benchmarks/loadgen.py --concurrency 16 --requests 500 --unique
+    python benchmarks/loadgen.py --rps 20 --json-out run.json --baseline base.json
+
+With --baseline the run fails (exit code 1) if any p95 regresses by more
+than --tolerance against the saved JSON report.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+
+DEFAULT_QUERIES = [
+    "What is the weather in Paris?",
+    "What is the weather in London?",
+    "Compare the weather in Tokyo and the weather in Lima",
+    "Please calculate (12.5 * 4 + 3) / 7",
+    "Hello there, who are you?",
+]
+
+
+@dataclass
+class Sample:
+    status: int
+    latency: float
+    hops: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+def parse_server_timing(values: List[str]) -> Dict[str, float]:
+    """'gateway;dur=12.5, llm;dur=3' -> {"gateway": 12.5, "llm": 3.0} (milliseconds)."""
+    hops: Dict[str, float] = {}
+    for value in values:
+        for metric in value.split(","):
+            name, *params = [part.strip() for part in metric.split(";")]
+            for param in params:
+                if param.startswith("dur="):
+                    hops[name] = hops.get(name, 0.0) + float(param[4:])
+    return hops
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = int(rank), min(int(rank) + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def load_queries(path: Optional[str]) -> List[str]:
+    if not path:
+        return DEFAULT_QUERIES
+    with open(path) as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        return [line.strip() for line in f if line.strip()]
+
+
+class LoadGenerator:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.queries = itertools.cycle(load_queries(args.queries))
+        self.counter = itertools.count()
+        self.samples: List[Sample] = []
+        self.started = 0.0
+        self.measuring_from = 0.0
+
+    def _payload(self) -> dict:
+        query = next(self.queries)
+        n = next(self.counter)
+        if self.args.unique:
+            # Defeats the answer cache so every request exercises the full path
+            query = f"{query} (#{n})"
+        payload = {"query": query, "response_mode": self.args.response_mode}
+        if self.args.path.endswith("/batch"):
+            payload = {"queries": [query] * self.args.batch_size, "response_mode": self.args.response_mode}
+        return payload
+
+    async def _one(self, client: httpx.AsyncClient) -> None:
+        payload = self._payload()
+        started = time.perf_counter()
+        try:
+            resp = await client.post(self.args.path, json=payload)
+            await resp.aread()
+            sample = Sample(resp.status_code, time.perf_counter() - started,
+                            parse_server_timing(resp.headers.get_list("server-timing")))
+        except httpx.HTTPError as e:
+            sample = Sample(0, time.perf_counter() - started, error=type(e).__name__)
+        if started >= self.measuring_from:
+            self.samples.append(sample)
+
+    def _done(self, sent: int) -> bool:
+        if self.args.requests and sent >= self.args.requests:
+            return True
+        return time.perf_counter() - self.started >= self.args.warmup + self.args.duration
+
+    async def run(self) -> None:
+        headers = {"X-INTERNAL-KEY": self.args.key, "X-Client-Id": self.args.client_id}
+        limits = httpx.Limits(max_connections=max(self.args.concurrency, 1) * 2)
+        async with httpx.AsyncClient(
+            base_url=self.args.url, headers=headers, timeout=self.args.timeout, limits=limits
+        ) as client:
+            self.started = time.perf_counter()
+            self.measuring_from = self.started + self.args.warmup
+            if self.args.rps:
+                await self._open_loop(client)
+            else:
+                await self._closed_loop(client)
+            self.elapsed = time.perf_counter() - max(self.measuring_from, self.started)
+
+    async def _open_loop(self, client: httpx.AsyncClient) -> None:
+        interval = 1.0 / self.args.rps
+        tasks = set()
+        sent = 0
+        next_at = time.perf_counter()
+        while not self._done(sent):
+            task = asyncio.create_task(self._one(client))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            sent += 1
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+        await asyncio.gather(*tasks)
+
+    async def _closed_loop(self, client: httpx.AsyncClient) -> None:
+        sent = 0
+
+        async def worker():
+            nonlocal sent
+            while not self._done(sent):
+                sent += 1
+                await self._one(client)
+
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+
+    def report(self) -> dict:
+        ok = [s for s in self.samples if 200 <= s.status < 300]
+        hops: Dict[str, List[float]] = defaultdict(list)
+        for sample in ok:
+            for name, ms in sample.hops.items():
+                hops[name].append(ms)
+        latency = {"client": [s.latency * 1000 for s in ok], **hops}
+        statuses = Counter(str(s.status) if s.status else s.error for s in self.samples)
+        total = len(self.samples)
+        return {
+            "requests": total,
+            "duration_s": round(self.elapsed, 2),
+            "throughput_rps": round(total / self.elapsed, 2) if self.elapsed else 0.0,
+            "error_rate": round((total - len(ok)) / total, 4) if total else 0.0,
+            "statuses": dict(statuses),
+            "latency_ms": {
+                name: {
+                    "p50": round(percentile(values, 50), 1),
+                    "p95": round(percentile(values, 95), 1),
+                    "p99": round(percentile(values, 99), 1),
+                    "max": round(max(values), 1),
+                    "count": len(values),
+                }
+                for name, values in latency.items() if values
+            },
+        }
+
+
+def print_report(report: dict) -> None:
+    print(f"requests {report['requests']}  duration {report['duration_s']}s  "
+          f"throughput {report['throughput_rps']} req/s  error rate {report['error_rate']:.2%}")
+    print(f"statuses {report['statuses']}")
+    print(f"{'hop':<10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}{'n':>8}")
+    for name, row in report["latency_ms"].items():
+        print(f"{name:<10}{row['p50']:>10}{row['p95']:>10}{row['p99']:>10}{row['max']:>10}{row['count']:>8}")
+
+
+def compare(report: dict, baseline_path: str, tolerance: float) -> List[str]:
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = []
+    for name, row in report["latency_ms"].items():
+        before = baseline.get("latency_ms", {}).get(name)
+        if before and before["p95"] > 0 and row["p95"] > before["p95"] * (1 + tolerance):
+            regressions.append(f"{name} p95 {before['p95']} -> {row['p95']} ms")
+    if report["error_rate"] > baseline.get("error_rate", 0.0) + tolerance / 10:
+        regressions.append(f"error rate {baseline.get('error_rate', 0.0):.2%} -> {report['error_rate']:.2%}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="gateway (or agent) base URL")
+    parser.add_argument("--path", default="/ask", help="/ask or /ask/batch")
+    parser.add_argument("--key", default="supersecretkey", help="X-INTERNAL-KEY value")
+    parser.add_argument("--client-id", default="loadgen")
+    parser.add_argument("--rps", type=float, default=0.0, help="open-loop arrival rate; 0 for closed loop")
+    parser.add_argument("--concurrency", type=int, default=8, help="closed-loop workers")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to measure after warmup")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds of unmeasured warmup")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many requests instead")
+    parser.add_argument("--queries", help="file with one query per line, or a JSON list")
+    parser.add_argument("--unique", action="store_true", help="make every query unique (bypass answer cache)")
+    parser.add_argument("--response-mode", default="final_only")
+    parser.add_argument("--batch-size", type=int, default=4, help="queries per request for /ask/batch")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json-out", help="write the report as JSON")
+    parser.add_argument("--baseline", help="JSON report to compare p95s against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed p95 regression (fraction)")
+    args = parser.parse_args()
+
+    generator = LoadGenerator(args)
+    asyncio.run(generator.run())
+    report = generator.report()
+    print_report(report)
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        regressions = compare(report, args.baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Micro-benchmark of response serialization for the agent and gateway.
+
+Builds "full" mode responses from realistic multi-step message lists (each
+round: user question, AI turn with two tool calls and token usage, two tool
+results, final AI answer) and times the ways they can be encoded:
+
+  agent    jsonable_encoder   model_dump() messages, jsonable_encoder + json.dumps
+                              (JSONResponse without a response model)
+           response_model     model_dump() messages, validate + dump_json
+                              (FastAPI's response_model path)
+           orjson             message_to_dict() + serialization.dumps (current)
+  gateway  re-encode          resp.json() + JSONResponse(content=data)
+           passthrough        bytes relayed as received (current)
+
+    python benchmarks/serialization_bench.py
+    python benchmarks/serialization_bench.py --rounds 1 4 16 --number 500
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "services" / "langgraph-agent"))
+
+import orjson  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from src.agents.response import final_answer, tool_trace  # noqa: E402
+from src.schemas import AskResponse  # noqa: E402
+from src.serialization import dumps, message_to_dict  # noqa: E402
+
+
+def conversation(rounds: int) -> List[BaseMessage]:
+    messages: List[BaseMessage] = []
+    for i in range(rounds):
+        usage = {"input_tokens": 900 + 150 * i, "output_tokens": 40, "total_tokens": 940 + 150 * i}
+        messages += [
+            HumanMessage(content=f"What is the weather in Paris, and what is 12 * {i}?", id=f"human-{i}"),
+            AIMessage(
+                content="",
+                id=f"ai-{i}-tools",
+                tool_calls=[
+                    {"name": "get_weather", "args": {"city": "Paris"}, "id": f"call-{i}-w"},
+                    {"name": "calculate", "args": {"operation": "multiply", "a": 12, "b": i}, "id": f"call-{i}-m"},
+                ],
+                response_metadata={
+                    "token_usage": {"completion_tokens": 40, "prompt_tokens": usage["input_tokens"]},
+                    "model_name": "llama-3.3-70b-versatile",
+                    "finish_reason": "tool_calls",
+                },
+                usage_metadata=usage,
+            ),
+            ToolMessage(content="Paris: overcast clouds, 12.4°C", name="get_weather", tool_call_id=f"call-{i}-w"),
+            ToolMessage(content=str(12.0 * i), name="calculate", tool_call_id=f"call-{i}-m"),
+            AIMessage(
+                content=f"It is 12.4°C with overcast clouds in Paris, and 12 * {i} = {12 * i}. " * 3,
+                id=f"ai-{i}-answer",
+                response_metadata={"model_name": "llama-3.3-70b-versatile", "finish_reason": "stop"},
+                usage_metadata={**usage, "output_tokens": 60},
+            ),
+        ]
+    return messages
+
+
+def response(messages: List[BaseMessage], to_dict: Callable[[BaseMessage], Dict]) -> AskResponse:
+    return AskResponse(
+        content=final_answer(messages),
+        response_mode="full",
+        tool_trace=tool_trace(messages),
+        messages=[to_dict(m) for m in messages],
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[1, 4, 16], help="tool rounds per conversation")
+    parser.add_argument("--number", type=int, default=300, help="iterations per measurement")
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(AskResponse)
+
+    for rounds in args.rounds:
+        messages = conversation(rounds)
+
+        def jsonable_path() -> bytes:
+            content = jsonable_encoder(response(messages, BaseMessage.model_dump), exclude_none=True)
+            return JSONResponse(content).body
+
+        def response_model_path() -> bytes:
+            value = adapter.validate_python(response(messages, BaseMessage.model_dump))
+            return adapter.dump_json(value, exclude_none=True)
+
+        def orjson_path() -> bytes:
+            return dumps(response(messages, message_to_dict))
+
+        body = orjson_path()
+        # Same document as FastAPI's response_model path
+        assert orjson.loads(body) == json.loads(response_model_path())
+
+        def reencode_path() -> bytes:
+            return JSONResponse(json.loads(body)).body
+
+        def passthrough_path() -> bytes:
+            return body
+
+        print(f"{rounds} round(s): {len(messages)} messages, {len(body) / 1024:.1f} KiB")
+        paths = {
+            "agent": [
+                ("jsonable_encoder", jsonable_path),
+                ("response_model", response_model_path),
+                ("orjson", orjson_path),
+            ],
+            "gateway": [("re-encode", reencode_path), ("passthrough", passthrough_path)],
+        }
+        for hop, timed in paths.items():
+            baseline = None
+            for name, fn in timed:
+                seconds = min(timeit.repeat(fn, number=args.number, repeat=3)) / args.number
+                baseline = baseline or seconds
+                print(f"  {hop:<8} {name:<17} {seconds * 1e6:>9.1f} us  {baseline / seconds:>6.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
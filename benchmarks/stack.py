@@ -0,0 +1,168 @@
+"""
+Runs the whole stack offline for load tests: a stub weather upstream, the
+weather and math MCP servers, the agent with the scripted fake LLM
+(LLM_PROVIDER=fake) and the gateway, all on localhost.
+
+    python benchmarks/stack.py                        # start and wait for Ctrl-C
+    python benchmarks/stack.py -- --rps 20 --unique   # start, run loadgen.py, stop
+
+Use --env KEY=VALUE (repeatable) to override service settings, e.g.
+--env FAKE_LLM_LATENCY_MS=200 or --env ANSWER_CACHE_ENABLED=true.
+--agent-workers N runs the agent under gunicorn with N workers (needs
+gunicorn and uvicorn-worker), sharing conversation memory through SQLite.
+--agent-replicas N starts N agents (on 8001, then 8102, 8103, ...) and has
+the gateway balance across them (LANGGRAPH_AGENT_URLS).
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+SERVICES = ROOT / "services"
+KEY = "supersecretkey"
+
+PORTS = {"stub": 8999, "weather": 8002, "math": 8003, "agent": 8001, "gateway": 8000}
+
+
+def agent_ports(replicas: int) -> Dict[str, int]:
+    """Port per agent replica: "agent" on 8001, then "agent2" on 8102, "agent3" on 8103, ..."""
+    ports = {"agent": PORTS["agent"]}
+    for i in range(2, replicas + 1):
+        ports[f"agent{i}"] = 8100 + i
+    return ports
+
+
+def service_env(overrides: Dict[str, str], replicas: int) -> Dict[str, str]:
+    env = {
+        **os.environ,
+        "INTERNAL_API_KEY": KEY,
+        "LOG_LEVEL": "WARNING",
+        # weather-server
+        "WEATHER_API_KEY": "offline",
+        "WEATHER_BASE_URL": f"http://127.0.0.1:{PORTS['stub']}/data/2.5/weather",
+        # math-server
+        "MATH_PORT": str(PORTS["math"]),
+        # langgraph-agent
+        "LLM_PROVIDER": "fake",
+        "GROQ_API_KEY": "offline",
+        "MCP_TOOL_CONFIG": json.dumps({
+            "weather": {"url": f"http://127.0.0.1:{PORTS['weather']}/mcp", "transport": "streamable_http"},
+            "math": {"url": f"http://127.0.0.1:{PORTS['math']}/mcp", "transport": "streamable_http"},
+        }),
+        "MEMORY_BACKEND": "memory",
+        # Measure the real path by default; opt back in with --env ANSWER_CACHE_ENABLED=true
+        "ANSWER_CACHE_ENABLED": "false",
+        # api-gateway
+        "LANGGRAPH_AGENT_URL": f"http://127.0.0.1:{PORTS['agent']}",
+        "LANGGRAPH_AGENT_URLS": ",".join(f"http://127.0.0.1:{port}" for port in agent_ports(replicas).values()),
+    }
+    env.update(overrides)
+    return env
+
+
+def commands(latency_ms: float, agent_workers: int, replicas: int) -> List[tuple]:
+    """(name, cwd, command, extra env) per service, in start order."""
+    python = sys.executable
+    uvicorn = [python, "-m", "uvicorn", "--log-level", "warning", "--host", "127.0.0.1"]
+
+    def agent(port: int) -> tuple:
+        if agent_workers <= 1:
+            return uvicorn + ["--port", str(port), "src.main:app"], {}
+        return (
+            [python, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--log-level", "warning",
+             "--bind", f"127.0.0.1:{port}", "src.main:app"],
+            {
+                "WEB_CONCURRENCY": str(agent_workers),
+                "MEMORY_BACKEND": "sqlite",
+                "MEMORY_SQLITE_PATH": str(Path(tempfile.gettempdir()) / "stack-checkpoints.sqlite"),
+            },
+        )
+
+    agents = [(name, SERVICES / "langgraph-agent", *agent(port)) for name, port in agent_ports(replicas).items()]
+    return [
+        ("stub", ROOT, [python, "benchmarks/stubs/weather_upstream.py", "--latency-ms", str(latency_ms)], {}),
+        ("weather", SERVICES / "mcp-servers" / "weather-server", [python, "src/main.py"], {}),
+        ("math", SERVICES / "mcp-servers" / "math-server", [python, "src/main.py"], {}),
+        *agents,
+        ("gateway", SERVICES / "api-gateway", uvicorn + ["--port", str(PORTS["gateway"]), "src.main:app"], {}),
+    ]
+
+
+def port_open(port: int) -> bool:
+    with socket.socket() as sock:
+        return sock.connect_ex(("127.0.0.1", port)) == 0
+
+
+def wait_for_port(name: str, port: int, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{name} exited with code {process.returncode}")
+        if port_open(port):
+            return
+        time.sleep(0.2)
+    raise RuntimeError(f"{name} did not open port {port} within {timeout:.0f}s")
+
+
+def main() -> int:
+    argv = sys.argv[1:]
+    loadgen_args = argv[argv.index("--") + 1:] if "--" in argv else None
+    argv = argv[:argv.index("--")] if "--" in argv else argv
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--upstream-latency-ms", type=float, default=80.0, help="stub weather API delay")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE")
+    parser.add_argument("--agent-workers", type=int, default=1, help="agent worker processes (gunicorn if > 1)")
+    parser.add_argument("--agent-replicas", type=int, default=1, help="agent instances behind the gateway")
+    args = parser.parse_args(argv)
+
+    ports = {**PORTS, **agent_ports(args.agent_replicas)}
+    busy = [f"{name} :{port}" for name, port in ports.items() if port_open(port)]
+    if busy:
+        parser.error(f"ports already in use ({', '.join(busy)}); is another stack running?")
+    # Tear the stack down on SIGTERM (e.g. from `timeout`) as well as Ctrl-C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(143))
+
+    env = service_env(dict(item.split("=", 1) for item in args.env), args.agent_replicas)
+    processes = []
+    try:
+        services = commands(args.upstream_latency_ms, args.agent_workers, args.agent_replicas)
+        for name, cwd, command, extra_env in services:
+            process = subprocess.Popen(command, cwd=cwd, env={**env, **extra_env}, start_new_session=True)
+            processes.append(process)
+            wait_for_port(name, ports[name], process)
+            print(f"[stack] {name} up on :{ports[name]}", flush=True)
+        # The agent discovers MCP tools in the background right after startup
+        time.sleep(2)
+
+        if loadgen_args is not None:
+            return subprocess.call(
+                [sys.executable, str(ROOT / "benchmarks" / "loadgen.py"), "--key", KEY, *loadgen_args]
+            )
+        print("[stack] ready; gateway at http://127.0.0.1:8000 (Ctrl-C to stop)", flush=True)
+        signal.pause()
+        return 0
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        # Stop front to back so nothing is left talking to a dead dependency
+        for process in reversed(processes):
+            if process.poll() is not None:
+                continue
+            os.killpg(process.pid, signal.SIGTERM)
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
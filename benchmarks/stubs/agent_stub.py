@@ -0,0 +1,108 @@
+"""
+Offline stand-in for a langgraph-agent replica, for exercising the gateway's
+load balancing, retries, circuit breaking and hedging without the real stack.
+
+Serves GET /health, POST /ask, /ask/stream and /ask/batch with canned
+answers after an artificial delay. A share of calls can be slow, fail with
+500 or be rejected with 503 like the agent's admission control. GET /stats
+reports the calls served.
+
+    python benchmarks/stubs/agent_stub.py --port 8101 --latency-ms 50
+    python benchmarks/stubs/agent_stub.py --port 8102 --error-ratio 0.5 --slow-ratio 0.1 --slow-ms 2000
+
+Point the gateway at a set of them:
+
+    LANGGRAPH_AGENT_URLS=http://127.0.0.1:8101,http://127.0.0.1:8102 uvicorn src.main:app --port 8000
+"""
+import argparse
+import asyncio
+import json
+import random
+from collections import Counter
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+options = argparse.Namespace(latency_ms=50.0, slow_ratio=0.0, slow_ms=1000.0, error_ratio=0.0, busy_ratio=0.0, port=0)
+calls: Counter = Counter()
+
+
+async def _outcome(path: str):
+    """Sleep like a run would, then None for success or the error response."""
+    calls[path] += 1
+    if random.random() < options.busy_ratio:
+        calls["busy"] += 1
+        return JSONResponse({"detail": "Server busy, try again later"}, status_code=503, headers={"Retry-After": "1"})
+    slow = random.random() < options.slow_ratio
+    await asyncio.sleep((options.slow_ms if slow else options.latency_ms) / 1000)
+    if random.random() < options.error_ratio:
+        calls["error"] += 1
+        return JSONResponse({"detail": "Agent execution failed"}, status_code=500)
+    return None
+
+
+def _answer(query: str) -> dict:
+    return {"content": f"stub {options.port}: {query}", "finish_reason": "stop"}
+
+
+async def ask(request: Request) -> JSONResponse:
+    payload = await request.json()
+    return await _outcome("/ask") or JSONResponse(_answer(payload.get("query", "")))
+
+
+async def ask_batch(request: Request):
+    payload = await request.json()
+    error = await _outcome("/ask/batch")
+    if error is not None:
+        return error
+    results = [{"index": i, "response": _answer(q)} for i, q in enumerate(payload.get("queries", []))]
+    if not payload.get("stream"):
+        return JSONResponse({"results": results})
+    return StreamingResponse((json.dumps(r) + "\n" for r in results), media_type="application/x-ndjson")
+
+
+async def ask_stream(request: Request):
+    payload = await request.json()
+    error = await _outcome("/ask/stream")
+    if error is not None:
+        return error
+
+    async def events():
+        for word in _answer(payload.get("query", ""))["content"].split():
+            yield f"event: token\ndata: {json.dumps({'content': word + ' '})}\n\n"
+        yield f"event: done\ndata: {json.dumps({'finish_reason': 'stop'})}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+async def health(request: Request) -> JSONResponse:
+    return JSONResponse({"status": "ok"})
+
+
+async def stats(request: Request) -> JSONResponse:
+    return JSONResponse(dict(calls))
+
+
+app = Starlette(routes=[
+    Route("/health", health),
+    Route("/ask", ask, methods=["POST"]),
+    Route("/ask/stream", ask_stream, methods=["POST"]),
+    Route("/ask/batch", ask_batch, methods=["POST"]),
+    Route("/stats", stats),
+])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8101)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--slow-ratio", type=float, default=0.0, help="share of calls taking --slow-ms instead")
+    parser.add_argument("--slow-ms", type=float, default=1000.0)
+    parser.add_argument("--error-ratio", type=float, default=0.0, help="share of calls failing with 500")
+    parser.add_argument("--busy-ratio", type=float, default=0.0, help="share of calls rejected with 503")
+    options = parser.parse_args()
+    uvicorn.run(app, host=options.host, port=options.port, log_level="warning")
@@ -0,0 +1,60 @@
+"""
+Offline stand-in for the OpenWeatherMap current-weather endpoint.
+
+Serves GET /data/2.5/weather?q=<city> with a deterministic, OpenWeatherMap-shaped
+body after an optional artificial delay. Point the weather server at it with
+WEATHER_BASE_URL=http://127.0.0.1:8999/data/2.5/weather.
+
+    python benchmarks/stubs/weather_upstream.py --port 8999 --latency-ms 80
+"""
+import argparse
+import asyncio
+import hashlib
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+DESCRIPTIONS = ["clear sky", "few clouds", "scattered clouds", "light rain", "overcast clouds"]
+
+latency_seconds = 0.0
+calls = 0
+
+
+async def weather(request: Request) -> JSONResponse:
+    global calls
+    calls += 1
+    city = request.query_params.get("q", "")
+    if not city:
+        return JSONResponse({"cod": "400", "message": "Nothing to geocode"}, status_code=400)
+    if latency_seconds:
+        await asyncio.sleep(latency_seconds)
+    seed = int.from_bytes(hashlib.sha256(city.casefold().encode()).digest()[:4], "little")
+    return JSONResponse({
+        "name": city,
+        "main": {"temp": round(-5 + (seed % 400) / 10, 1), "humidity": seed % 100},
+        "weather": [{"description": DESCRIPTIONS[seed % len(DESCRIPTIONS)]}],
+        "cod": 200,
+    })
+
+
+async def stats(request: Request) -> JSONResponse:
+    return JSONResponse({"calls": calls})
+
+
+app = Starlette(routes=[
+    Route("/data/2.5/weather", weather),
+    Route("/stats", stats),
+])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    args = parser.parse_args()
+    latency_seconds = args.latency_ms / 1000
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
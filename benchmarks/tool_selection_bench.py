@@ -0,0 +1,105 @@
+"""
+Micro-benchmark of per-query tool selection in the agent.
+
+Registers the real weather and math tools plus N synthetic MCP servers of
+five tools each, then, for a few representative queries, reports how many
+tools and approximate schema tokens each model call would carry with every
+tool bound versus with the ToolIndex selection, and how long selection takes.
+
+    python benchmarks/tool_selection_bench.py
+    python benchmarks/tool_selection_bench.py --servers 0 10 40 --top-k 4 --embedder hashing
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "services" / "langgraph-agent"))
+
+from langchain_core.tools import BaseTool, StructuredTool  # noqa: E402
+from langchain_core.utils.function_calling import convert_to_openai_tool  # noqa: E402
+
+from src.cache.embedders import load_embedder  # noqa: E402
+from src.tools.tool_index import ToolIndex  # noqa: E402
+
+QUERIES = [
+    "What is the weather in Paris?",
+    "calculate (12 + 7) * 3",
+    "Find the open invoices for account 4411",
+    "Summarize the last deployment of the billing service",
+]
+
+DOMAINS = [
+    ("invoice", "billing invoices, payments and refunds for a customer account"),
+    ("ticket", "support tickets: open, update, assign and close"),
+    ("deploy", "service deployments, rollbacks and release history"),
+    ("calendar", "calendar events, meeting rooms and availability"),
+    ("inventory", "warehouse stock levels, SKUs and reorder points"),
+    ("crm", "customer contacts, leads and sales opportunities"),
+    ("docs", "internal documentation pages and search"),
+    ("hr", "employee directory, time off and org chart"),
+]
+ACTIONS = ["search", "get", "create", "update", "delete"]
+
+
+def _tool(server: str, name: str, description: str, args: dict) -> BaseTool:
+    async def run(**kwargs):
+        return ""
+
+    schema = {"type": "object", "properties": args, "required": list(args)}
+    return StructuredTool.from_function(
+        coroutine=run, name=name, description=description, args_schema=schema,
+        # As the agent's MCP session pool tags the tools it discovers
+        metadata={"mcp_server": server},
+    )
+
+
+def registry(servers: int) -> List[BaseTool]:
+    tools = [
+        _tool("weather", "get_weather", "Get the current weather for a city",
+              {"city": {"type": "string", "description": "City name"}}),
+        _tool("math", "calculate", "Apply add, subtract, multiply, divide or power to two numbers",
+              {"operation": {"type": "string"}, "a": {"type": "number"}, "b": {"type": "number"}}),
+        _tool("math", "evaluate", "Evaluate an arithmetic expression such as (2 + 3) * 4",
+              {"expression": {"type": "string", "description": "Arithmetic expression"}}),
+    ]
+    for i in range(servers):
+        domain, about = DOMAINS[i % len(DOMAINS)]
+        for action in ACTIONS:
+            tools.append(_tool(
+                f"{domain}{i}", f"{domain}{i}_{action}",
+                f"{action.capitalize()} {about} (server {i})",
+                {"id": {"type": "string", "description": f"{domain} identifier"},
+                 "filters": {"type": "object", "description": "Optional field filters"}},
+            ))
+    return tools
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", type=int, nargs="+", default=[0, 10, 40], help="synthetic MCP servers")
+    parser.add_argument("--top-k", type=int, default=6)
+    parser.add_argument("--embedder", default=None, help='None (keywords), "hashing" or package.module:Class')
+    parser.add_argument("--number", type=int, default=2000, help="iterations per timing")
+    args = parser.parse_args()
+
+    for servers in args.servers:
+        tools = registry(servers)
+        tokens = {t.name: len(json.dumps(convert_to_openai_tool(t))) // 4 for t in tools}
+        everything = sum(tokens.values())
+        index = ToolIndex(tools, args.top_k, load_embedder(args.embedder), min_similarity=0.1)
+        print(f"{servers} extra server(s): {len(tools)} tools, ~{everything} schema tokens when all are bound")
+        for query in QUERIES:
+            selected = index.select(query)
+            # Uncached cost: a fresh index lookup for a query not seen before
+            seconds = min(timeit.repeat(lambda: index._scores(query), number=args.number, repeat=3)) / args.number
+            print(f"  {query[:44]:<44} {len(selected):>3} tools  ~{sum(tokens[n] for n in selected):>6} tokens"
+                  f"  select {seconds * 1e6:>7.1f} us  {', '.join(selected[:3])}{' ...' if len(selected) > 3 else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,66 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     INTERNAL_API_KEY: str = "supersecretkey"
+    # Extra caller keys as JSON {"label": "key"}; the label becomes the caller's
+    # client id. INTERNAL_API_KEY is always accepted (label "internal").
+    API_KEYS: str = "{}"
+    # Optional JSON file of the same shape, re-read when it changes, so keys
+    # can be rotated without a restart
+    API_KEYS_FILE: Optional[str] = None
+    API_KEYS_RELOAD_SECONDS: float = 10.0
+    # Per-key token bucket (requests/second, 0 = unlimited); API_KEY_RATE_LIMITS
+    # overrides the rate per label as JSON {"label": rps}
+    API_KEY_RATE_LIMIT_RPS: float = 0.0
+    API_KEY_RATE_LIMIT_BURST: int = 20
+    API_KEY_RATE_LIMITS: str = "{}"
     LANGGRAPH_AGENT_URL: str = "http://langgraph-agent:8000"
+    # Agent replicas as a comma-separated list; when set it replaces LANGGRAPH_AGENT_URL
+    LANGGRAPH_AGENT_URLS: str = ""
     LOG_LEVEL: str = "INFO"
+    # Logging: "text" or "json"; SAMPLED per-request lines are kept at LOG_SAMPLE_RATIO
+    LOG_FORMAT: str = "text"
+    LOG_SAMPLE_RATIO: float = 1.0
+    LOG_QUEUE_SIZE: int = 10000
+
+    # Upstream HTTP client (shared by all proxied requests and all agent replicas)
+    AGENT_HTTP_MAX_CONNECTIONS: int = 100
+    AGENT_HTTP_MAX_KEEPALIVE: int = 20
+    AGENT_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    AGENT_HTTP2: bool = True
+    AGENT_CONNECT_TIMEOUT: float = 5.0
+    AGENT_READ_TIMEOUT: float = 120.0
+    AGENT_WRITE_TIMEOUT: float = 10.0
+    AGENT_POOL_TIMEOUT: float = 5.0
+
+    # Agent replicas: requests go to the one with the fewest in flight. Replicas
+    # failing UNHEALTHY_THRESHOLD consecutive GET /health checks are skipped
+    # (interval 0 disables the checks)
+    AGENT_HEALTH_INTERVAL_SECONDS: float = 5.0
+    AGENT_HEALTH_TIMEOUT: float = 2.0
+    AGENT_HEALTH_UNHEALTHY_THRESHOLD: int = 2
+    # Circuit breaker per replica: opens after this many consecutive failed
+    # calls, then lets one trial call through after RESET_SECONDS
+    AGENT_BREAKER_FAILURE_THRESHOLD: int = 5
+    AGENT_BREAKER_RESET_SECONDS: float = 15.0
+    # Extra attempts per request on other replicas (hedges included). Calls
+    # that never ran are always retryable; timeouts and 5xx only for stateless
+    # (no thread_id) calls. Retries are capped at RATIO of requests, with at
+    # most RESERVE saved up for bursts
+    AGENT_RETRY_MAX: int = 1
+    AGENT_RETRY_BUDGET_RATIO: float = 0.2
+    AGENT_RETRY_BUDGET_RESERVE: float = 10.0
+    # Send a stateless, non-streaming call to a second replica if the first has
+    # not answered within this many ms, keeping the first answer (0 = off)
+    AGENT_HEDGE_AFTER_MS: float = 0.0
+
+    # Tracing (OpenTelemetry). Exporters: console | file (JSON lines) | otlp
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "console"
+    TRACING_FILE: str = "traces.jsonl"
+    TRACING_SAMPLE_RATIO: float = 1.0
 
     class Config:
         env_file = ".env"
@@ -7,11 +7,11 @@ import logging
 logger = logging.getLogger("api-gateway")
 
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
-    logger.error(f"HTTP error: {exc.detail}")
+    logger.error("HTTP error: %s", exc.detail)
     return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    logger.error(f"Validation error: {exc.errors()}")
+    logger.error("Validation error: %s", exc.errors())
     return JSONResponse(status_code=422, content={"detail": exc.errors()})
 
 async def unhandled_exception_handler(request: Request, exc: Exception):
@@ -0,0 +1,340 @@
+import asyncio
+import importlib.util
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from .config import settings
+from .logger import setup_logger
+from .metrics import UPSTREAM_HEDGES, UPSTREAM_RETRIES, UPSTREAM_SECONDS
+from .timing import record
+from .tracing import client_span
+from .upstreams import RetryBudget, Upstream, UpstreamPool
+
+logger = setup_logger("agent-http-client")
+
+# The agent rejected the request before running it (admission control), so
+# another replica may take it whatever the request is
+_NOT_RUN = {503}
+# The run failed or timed out part way; retrying may repeat its side effects
+_FAILED = {500, 502, 504}
+
+
+class NoUpstreamAvailable(Exception):
+    """Every agent replica's circuit breaker is open."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("No agent replica available")
+        self.retry_after = retry_after
+
+
+def agent_urls() -> List[str]:
+    """LANGGRAPH_AGENT_URLS (comma separated), else the single LANGGRAPH_AGENT_URL."""
+    urls = [url.strip() for url in settings.LANGGRAPH_AGENT_URLS.split(",") if url.strip()]
+    return urls or [settings.LANGGRAPH_AGENT_URL]
+
+
+def _retry_reason(
+    resp: Optional[httpx.Response], error: Optional[BaseException], idempotent: bool
+) -> Optional[str]:
+    """Why an attempt may be repeated on another replica, or None if it may not."""
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+        return "connect"
+    if resp is not None and resp.status_code in _NOT_RUN:
+        return "unavailable"
+    if not idempotent:
+        return None
+    if isinstance(error, httpx.TransportError) and not isinstance(error, httpx.PoolTimeout):
+        return "transport"
+    if resp is not None and resp.status_code in _FAILED:
+        return "server_error"
+    return None
+
+
+def _answered(task: "asyncio.Task[httpx.Response]") -> bool:
+    return not task.cancelled() and task.exception() is None and task.result().status_code not in _NOT_RUN | _FAILED
+
+
+class AgentHTTPClient:
+    """
+    App-scoped, pooled HTTP client used to proxy requests to the langgraph-agent.
+
+    One instance is created at startup and closed at shutdown so that every
+    proxied request reuses keep-alive connections from the same pool instead of
+    opening a new TCP (and TLS) connection per call.
+
+    With several agent replicas each attempt goes to the one the UpstreamPool
+    picks. Attempts that never ran (connection refused, agent 503) are retried
+    on another replica; ones that may have run part way (timeouts, 5xx) only
+    for idempotent requests. Retries and hedges go to healthy replicas only
+    and are bounded per request by AGENT_RETRY_MAX and overall by the retry
+    budget. When a retry fails in transit the earlier replica's answer (e.g.
+    a 503 with Retry-After) is returned instead of the transport error.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.pool = UpstreamPool(
+            urls,
+            failure_threshold=settings.AGENT_BREAKER_FAILURE_THRESHOLD,
+            reset_seconds=settings.AGENT_BREAKER_RESET_SECONDS,
+            health_interval=settings.AGENT_HEALTH_INTERVAL_SECONDS,
+            health_timeout=settings.AGENT_HEALTH_TIMEOUT,
+            unhealthy_threshold=settings.AGENT_HEALTH_UNHEALTHY_THRESHOLD,
+        )
+        self.budget = RetryBudget(settings.AGENT_RETRY_BUDGET_RATIO, settings.AGENT_RETRY_BUDGET_RESERVE)
+        self.hedge_after = settings.AGENT_HEDGE_AFTER_MS / 1000
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Pool usage counters, reported by stats()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_requests = 0
+        self.pool_timeouts = 0
+        self.errors = 0
+
+    @property
+    def max_connections(self) -> int:
+        return settings.AGENT_HTTP_MAX_CONNECTIONS
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("Agent HTTP client is not started")
+        return self._client
+
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+
+        http2 = settings.AGENT_HTTP2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("AGENT_HTTP2 is enabled but 'h2' is not installed; falling back to HTTP/1.1")
+            http2 = False
+
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.AGENT_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AGENT_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.AGENT_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.AGENT_CONNECT_TIMEOUT,
+                read=settings.AGENT_READ_TIMEOUT,
+                write=settings.AGENT_WRITE_TIMEOUT,
+                pool=settings.AGENT_POOL_TIMEOUT,
+            ),
+        )
+        self.pool.start()
+        logger.info(
+            "Agent HTTP client started (upstreams=%s, http2=%s, max_connections=%d)",
+            ",".join(u.url for u in self.pool.upstreams), http2, settings.AGENT_HTTP_MAX_CONNECTIONS,
+        )
+
+    async def close(self) -> None:
+        await self.pool.stop()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("Agent HTTP client closed")
+
+    @asynccontextmanager
+    async def _track(self, upstream: Upstream) -> AsyncIterator[None]:
+        self.in_flight += 1
+        self.total_requests += 1
+        upstream.outstanding += 1
+        upstream.requests += 1
+        if self.in_flight > self.peak_in_flight:
+            self.peak_in_flight = self.in_flight
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            upstream.outstanding -= 1
+
+    def _settle(
+        self, upstream: Upstream, resp: Optional[httpx.Response] = None, error: Optional[BaseException] = None
+    ) -> None:
+        """Count an attempt's outcome and feed it to the replica's circuit breaker."""
+        if isinstance(error, httpx.PoolTimeout):
+            # Our own pool was exhausted; the replica was never asked
+            self.pool_timeouts += 1
+            self.errors += 1
+            upstream.probing = False
+        elif isinstance(error, httpx.HTTPError) or (resp is not None and resp.status_code in _FAILED):
+            if error is not None:
+                self.errors += 1
+            upstream.on_failure(self.pool.failure_threshold)
+        elif resp is not None:
+            upstream.on_success()
+        else:
+            # Cancelled (a caller went away or a hedge lost): says nothing about the replica
+            upstream.probing = False
+
+    def _pick(self) -> Upstream:
+        upstream = self.pool.pick()
+        if upstream is None:
+            raise NoUpstreamAvailable(self.pool.retry_after())
+        return upstream
+
+    def _retry(self, tried: List[Upstream], reason: Optional[str]) -> Optional[Upstream]:
+        """The replica for another attempt, if the last one may be retried and the limits allow it."""
+        if reason is None or len(tried) > settings.AGENT_RETRY_MAX or self.budget.balance < 1:
+            return None
+        upstream = self.pool.pick(exclude=tried, healthy_only=True)
+        if upstream is None:
+            return None
+        self.budget.withdraw()
+        UPSTREAM_RETRIES.labels(reason).inc()
+        logger.warning("Retrying agent call on %s (%s from %s)", upstream.url, reason, tried[-1].url)
+        return upstream
+
+    async def _attempt(self, upstream: Upstream, method: str, path: str, kwargs: Dict[str, Any]) -> httpx.Response:
+        # Own copy: client_span writes this attempt's traceparent into it
+        headers = dict(kwargs.get("headers") or {})
+        try:
+            with client_span(f"{method} {path}", headers, **{"server.address": upstream.url}) as span:
+                async with self._track(upstream):
+                    resp = await self.client.request(method, f"{upstream.url}{path}", **{**kwargs, "headers": headers})
+                span.set_attribute("http.response.status_code", resp.status_code)
+        except BaseException as e:
+            self._settle(upstream, error=e)
+            raise
+        self._settle(upstream, resp)
+        return resp
+
+    async def _hedged(
+        self, upstream: Upstream, method: str, path: str, kwargs: Dict[str, Any], tried: List[Upstream]
+    ) -> httpx.Response:
+        """
+        Attempt on `upstream`; if it has not answered after AGENT_HEDGE_AFTER_MS,
+        send the same request to a second replica and keep the first good answer.
+        """
+        tasks = [asyncio.create_task(self._attempt(upstream, method, path, kwargs))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            second = None
+            if not done and self.budget.balance >= 1:
+                second = self.pool.pick(exclude=tried, healthy_only=True)
+            if second is None:
+                return await tasks[0]
+            self.budget.withdraw()
+            tried.append(second)
+            tasks.append(asyncio.create_task(self._attempt(second, method, path, kwargs)))
+
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: not _answered(t)):
+                    if pending and not _answered(task):
+                        continue
+                    UPSTREAM_HEDGES.labels("primary" if task is tasks[0] else "hedge").inc()
+                    return task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def post(self, path: str, idempotent: bool = False, **kwargs: Any) -> httpx.Response:
+        """
+        POST to an agent replica. `idempotent` requests (no conversation state to
+        corrupt) may also be retried after timeouts and 5xx, and hedged.
+        """
+        started = time.perf_counter()
+        status = "error"
+        self.budget.deposit()
+        tried: List[Upstream] = []
+        answer: Optional[httpx.Response] = None
+        upstream = self._pick()
+        try:
+            while True:
+                hedge = idempotent and self.hedge_after > 0 and not tried
+                tried.append(upstream)
+                resp, error = None, None
+                try:
+                    if hedge:
+                        resp = await self._hedged(upstream, "POST", path, kwargs, tried)
+                    else:
+                        resp = await self._attempt(upstream, "POST", path, kwargs)
+                except httpx.TransportError as e:
+                    error = e
+                if resp is not None:
+                    answer = resp
+
+                upstream = self._retry(tried, _retry_reason(resp, error, idempotent))
+                if upstream is None:
+                    if answer is None:
+                        raise error
+                    status = str(answer.status_code)
+                    return answer
+        finally:
+            elapsed = time.perf_counter() - started
+            record("upstream", elapsed)
+            UPSTREAM_SECONDS.labels(path, status).observe(elapsed)
+
+    @asynccontextmanager
+    async def stream(self, method: str, path: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """
+        Send a request and yield the response with its body still unread. Only
+        attempts that never ran are retried, and never once a byte was relayed.
+        """
+        started = time.perf_counter()
+        status = "error"
+        self.budget.deposit()
+        tried: List[Upstream] = []
+        # A rejection that was retried, read in full in case every retry fails in transit
+        answer: Optional[httpx.Response] = None
+        upstream: Optional[Upstream] = self._pick()
+        try:
+            while upstream is not None:
+                tried.append(upstream)
+                headers = dict(kwargs.get("headers") or {})
+                url = f"{upstream.url}{path}"
+                with client_span(f"{method} {path}", headers, **{"server.address": upstream.url}) as span:
+                    async with self._track(upstream):
+                        try:
+                            async with self.client.stream(method, url, **{**kwargs, "headers": headers}) as resp:
+                                span.set_attribute("http.response.status_code", resp.status_code)
+                                retry = self._retry(tried, _retry_reason(resp, None, idempotent=False))
+                                if retry is None:
+                                    status = str(resp.status_code)
+                                    yield resp
+                                else:
+                                    await resp.aread()
+                                    answer = resp
+                        except httpx.TransportError as e:
+                            self._settle(upstream, error=e)
+                            relayed = status != "error"
+                            retry = None if relayed else self._retry(tried, _retry_reason(None, e, idempotent=False))
+                            if retry is None and (relayed or answer is None):
+                                raise
+                        except BaseException as e:
+                            self._settle(upstream, error=e)
+                            raise
+                        else:
+                            self._settle(upstream, resp)
+                upstream = retry
+            if answer is not None and status == "error":
+                status = str(answer.status_code)
+                yield answer
+        finally:
+            # Covers the whole stream, not just time to first byte
+            UPSTREAM_SECONDS.labels(path, status).observe(time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool usage, used to size AGENT_HTTP_MAX_CONNECTIONS."""
+        return {
+            "max_connections": self.max_connections,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "saturation": round(self.in_flight / self.max_connections, 4) if self.max_connections else 0.0,
+            "total_requests": self.total_requests,
+            "pool_timeouts": self.pool_timeouts,
+            "errors": self.errors,
+            "retry_budget": round(self.budget.balance, 2),
+            "upstreams": self.pool.stats(),
+        }
+
+
+agent_client = AgentHTTPClient(agent_urls())
@@ -1,13 +1,19 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from .routes.ask import router as ask_router
-from .middleware.auth import internal_key_middleware
-from .logger import setup_logger
+from .http_client import agent_client
+from .middleware.auth import InternalKeyMiddleware
+from .logger import SAMPLED, RequestIdMiddleware, setup_logger, shutdown_logging
+from .metrics import MetricsMiddleware, register_stats, register_upstream_stats
+from .timing import ServerTimingMiddleware
+from .tracing import TracingMiddleware, setup_tracing, shutdown_tracing
 from .exceptions import (
     http_exception_handler, validation_exception_handler, unhandled_exception_handler
 )
 
 logger = setup_logger("api-gateway")
+setup_tracing("api-gateway")
 
 app = FastAPI(title="API Gateway")
 
@@ -16,7 +22,13 @@ app.add_middleware(
     CORSMiddleware, allow_origins=["*"], allow_credentials=True,
     allow_methods=["*"], allow_headers=["*"]
 )
-app.middleware("http")(internal_key_middleware)
+app.add_middleware(InternalKeyMiddleware)
+app.add_middleware(ServerTimingMiddleware, name="gateway")
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+# Added last so it is outermost: every log line of a request, auth
+# rejections included, carries its request id
+app.add_middleware(RequestIdMiddleware)
 
 # Routers
 app.include_router(ask_router)
@@ -29,11 +41,33 @@ app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(Exception, unhandled_exception_handler)
 
+@app.on_event("startup")
+async def startup():
+    await agent_client.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await agent_client.close()
+    shutdown_tracing()
+    shutdown_logging()
+
 @app.get("/health")
 async def health():
-    logger.info("Health check OK")
+    logger.info("Health check OK", extra=SAMPLED)
     return {"status": "ok"}
+
+@app.get("/health/pool")
+async def pool_health():
+    return agent_client.stats()
+
+register_stats("agent_pool", agent_client.stats, counters=["total_requests", "pool_timeouts", "errors"])
+register_upstream_stats(agent_client.pool.stats)
+
+@app.get("/metrics")
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/")
 async def root():
-    logger.info("Root endpoint accessed")
+    logger.info("Root endpoint accessed", extra=SAMPLED)
     return {"message": "Welcome to the API Gateway!"}
\ No newline at end of file
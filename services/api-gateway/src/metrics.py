@@ -0,0 +1,106 @@
+import time
+from typing import Any, Callable, Dict, Iterable, List
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import REGISTRY, CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+# Proxied agent runs take seconds; buckets reach the upstream read timeout
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being handled")
+AUTH_REJECTIONS = Counter("auth_rejections", "Requests rejected by the API key check", ["reason"])
+UPSTREAM_SECONDS = Histogram(
+    "agent_upstream_duration_seconds", "Latency of calls to the langgraph-agent", ["path", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_RETRIES = Counter("agent_upstream_retries", "Agent calls retried on another replica", ["reason"])
+UPSTREAM_HEDGES = Counter("agent_upstream_hedges", "Hedged agent calls, by which attempt answered", ["winner"])
+BREAKER_TRANSITIONS = Counter(
+    "agent_upstream_breaker_transitions", "Circuit breaker state changes per replica", ["upstream", "state"]
+)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency (labelled with the route
+    template, not the raw path, to keep cardinality bounded) and in-flight count.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(time.perf_counter() - started)
+
+
+class StatsCollector(Collector):
+    """
+    Exposes the numeric fields of a component's stats() dict, read only at
+    scrape time. Fields named in `counters` become counters, the rest gauges.
+    """
+
+    def __init__(self, prefix: str, stats: Callable[[], Dict[str, Any]], counters: Iterable[str] = ()):
+        self.prefix = prefix
+        self.stats = stats
+        self.counters = set(counters)
+
+    def collect(self):
+        for name, value in self.stats().items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            metric = f"{self.prefix}_{name}"
+            if name in self.counters:
+                yield CounterMetricFamily(metric, f"{self.prefix} {name}", value=value)
+            else:
+                yield GaugeMetricFamily(metric, f"{self.prefix} {name}", value=value)
+
+
+class UpstreamCollector(Collector):
+    """Per-replica outstanding requests, health check result and breaker state, read at scrape time."""
+
+    def __init__(self, stats: Callable[[], List[Dict[str, Any]]]):
+        self.stats = stats
+
+    def collect(self):
+        labels = ["upstream"]
+        outstanding = GaugeMetricFamily("agent_upstream_outstanding", "Requests in flight per replica", labels=labels)
+        healthy = GaugeMetricFamily("agent_upstream_healthy", "1 if the replica passes health checks", labels=labels)
+        open_ = GaugeMetricFamily("agent_upstream_breaker_open", "1 if the replica's breaker is open", labels=labels)
+        for upstream in self.stats():
+            outstanding.add_metric([upstream["url"]], upstream["outstanding"])
+            healthy.add_metric([upstream["url"]], int(upstream["healthy"]))
+            open_.add_metric([upstream["url"]], int(upstream["breaker"] == "open"))
+        yield outstanding
+        yield healthy
+        yield open_
+
+
+def register_stats(prefix: str, stats: Callable[[], Dict[str, Any]], counters: Iterable[str] = ()) -> None:
+    REGISTRY.register(StatsCollector(prefix, stats, counters))
+
+
+def register_upstream_stats(stats: Callable[[], List[Dict[str, Any]]]) -> None:
+    REGISTRY.register(UpstreamCollector(stats))
@@ -1,17 +1,167 @@
-from fastapi import Request, HTTPException
+import hashlib
+import hmac
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
 from ..config import settings
 from ..logger import setup_logger
+from ..metrics import AUTH_REJECTIONS
 
 logger = setup_logger("auth-middleware")
 
-async def internal_key_middleware(request: Request, call_next):
-    if request.url.path.startswith("/health"):
-        return await call_next(request)
+# Liveness checks and Prometheus scrapes come from inside the deployment. Exact
+# paths: /health/pool lists the agent replicas and stays behind a key
+PUBLIC_PATHS = frozenset({"/health", "/metrics"})
+INTERNAL_LABEL = "internal"
+
+
+def _digest(key: str) -> bytes:
+    return hashlib.sha256(key.encode()).digest()
+
+
+def _response(status: int, detail: str, headers: Tuple = ()) -> Tuple[dict, dict]:
+    body = json.dumps({"detail": detail}).encode()
+    start = {
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *headers],
+    }
+    return start, {"type": "http.response.body", "body": body}
+
+
+FORBIDDEN = _response(403, "Invalid internal API key")
+
+
+class KeyRing:
+    """
+    Accepted API keys, stored as SHA-256 digests with their labels.
+
+    Lookups hash the presented key and compare it against every stored digest
+    with hmac.compare_digest, without stopping at the first match, so timing
+    reveals neither the key nor which label it belongs to. Keys come from
+    INTERNAL_API_KEY, API_KEYS and, if set, API_KEYS_FILE, which is re-read
+    (at most every API_KEYS_RELOAD_SECONDS) when its mtime changes.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[bytes, str]] = []
+        self._file_mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._load()
+
+    def _load(self) -> None:
+        labelled: Dict[str, str] = {INTERNAL_LABEL: settings.INTERNAL_API_KEY}
+        labelled.update(json.loads(settings.API_KEYS))
+        path = settings.API_KEYS_FILE
+        if path:
+            try:
+                self._file_mtime = os.stat(path).st_mtime
+                with open(path) as f:
+                    labelled.update(json.load(f))
+            except (OSError, ValueError) as e:
+                # Keep serving with the keys we already have
+                logger.error("Could not load API keys from %s: %s", path, e)
+                if self._keys:
+                    return
+        self._keys = [(_digest(key), label) for label, key in labelled.items() if key]
+        logger.info("Loaded %d API keys", len(self._keys))
+
+    def _maybe_reload(self) -> None:
+        if not settings.API_KEYS_FILE:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < settings.API_KEYS_RELOAD_SECONDS:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(settings.API_KEYS_FILE).st_mtime
+        except OSError:
+            return
+        if mtime != self._file_mtime:
+            self._load()
+
+    def label_for(self, key: Optional[bytes]) -> Optional[str]:
+        """Label of the matching key, or None."""
+        self._maybe_reload()
+        if not key:
+            return None
+        presented = hashlib.sha256(key).digest()
+        match = None
+        for digest, label in self._keys:
+            if hmac.compare_digest(presented, digest):
+                match = label
+        return match
+
+
+class RateLimiter:
+    """Token bucket per key label; labels without a configured rate are unlimited."""
+
+    def __init__(self, default_rps: float, burst: int, overrides: Dict[str, float]):
+        self.default_rps = default_rps
+        self.burst = burst
+        self.overrides = overrides
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def acquire(self, label: str) -> float:
+        """Take a token; returns 0 on success or the seconds until one is available."""
+        rate = self.overrides.get(label, self.default_rps)
+        if rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(label, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated) * rate)
+        if tokens < 1.0:
+            self._buckets[label] = (tokens, now)
+            return (1.0 - tokens) / rate
+        self._buckets[label] = (tokens - 1.0, now)
+        return 0.0
+
+
+class InternalKeyMiddleware:
+    """
+    Pure ASGI API-key check. Rejections are answered directly from prebuilt
+    messages, without touching routing or response wrappers. Accepted requests
+    carry the key's label in request.state.api_key_label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.keys = KeyRing()
+        self.limiter = RateLimiter(
+            settings.API_KEY_RATE_LIMIT_RPS,
+            settings.API_KEY_RATE_LIMIT_BURST,
+            json.loads(settings.API_KEY_RATE_LIMITS),
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in PUBLIC_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        key = None
+        for name, value in scope["headers"]:
+            if name == b"x-internal-key":
+                key = value
+                break
+        label = self.keys.label_for(key)
+        if label is None:
+            # Counted rather than logged at warning level, so a flood of bad keys stays cheap
+            AUTH_REJECTIONS.labels("invalid_key").inc()
+            logger.debug("Invalid internal API key for %s", scope["path"])
+            for message in FORBIDDEN:
+                await send(message)
+            return
 
-    key = request.headers.get("X-INTERNAL-KEY")
-    logger.debug(f"Received request with path: {request.url.path}")
-    if key != settings.INTERNAL_API_KEY:
-        logger.warning("Invalid internal API key")
-        raise HTTPException(status_code=403, detail="Invalid internal API key")
+        wait = self.limiter.acquire(label)
+        if wait:
+            AUTH_REJECTIONS.labels("rate_limited").inc()
+            retry_after = str(max(1, math.ceil(wait))).encode()
+            for message in _response(429, "Rate limit exceeded for this API key", ((b"retry-after", retry_after),)):
+                await send(message)
+            return
 
-    return await call_next(request)
+        scope.setdefault("state", {})["api_key_label"] = label
+        await self.app(scope, receive, send)
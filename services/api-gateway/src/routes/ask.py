@@ -1,55 +1,182 @@
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
+import json
+from contextlib import AsyncExitStack
+from typing import AsyncIterator, Callable, Optional
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 from ..config import settings
-from ..logger import setup_logger
-import httpx
+from ..http_client import NoUpstreamAvailable, agent_client
+from ..logger import SAMPLED, request_id, setup_logger
+from ..middleware.auth import INTERNAL_LABEL
 
 logger = setup_logger("ask-route")
 router = APIRouter()
 
 @router.post("/ask")
-async def ask_proxy(payload: dict):
-    logger.info("Received query for proxy")
+async def ask_proxy(payload: dict, request: Request):
+    logger.info("Received query for proxy", extra=SAMPLED)
     try:
-        async with httpx.AsyncClient() as client:
-            print(f"Forwarding to {settings.LANGGRAPH_AGENT_URL}/ask")
-            resp = await client.post(
-                f"{settings.LANGGRAPH_AGENT_URL}/ask",
-                json=payload,
-                headers={"X-INTERNAL-KEY": settings.INTERNAL_API_KEY}
-            )
-        logger.info("Forwarded query to langgraph-agent")
-        logger.debug(f"Response from langgraph-agent: {resp.status_code} - {resp.text}")
-        ai_content = extract_ai_content(resp.json())
-
-        return JSONResponse(status_code=resp.status_code, content={"content": ai_content})
+        resp = await agent_client.post(
+            "/ask",
+            json=payload,
+            headers=agent_headers(request),
+            idempotent=stateless(payload)
+        )
+        logger.debug("Response from langgraph-agent: %s (%d bytes)", resp.status_code, len(resp.content))
+
+        if resp.is_error:
+            return agent_error(resp)
+
+        # The agent already shapes the body (content, optional tool_trace/messages)
+        return passthrough(resp)
+    except NoUpstreamAvailable as e:
+        return unavailable(e)
     except Exception as e:
         logger.exception("Error forwarding to langgraph-agent")
         return JSONResponse(status_code=500, content={"detail": "Gateway error"})
 
-# def extract_ai_content(response_json: dict) -> str:
-#     """
-#     Extract the 'content' from the first AI message in the response JSON.
-#     Returns a default message if no AI content is found.
-#     """
-#     messages = response_json.get("messages", [])
-#     for msg in messages:
-#         if msg.get("type") == "ai":
-#             return msg.get("content", "")
-#     return "No response content found."
+@router.post("/ask/stream")
+async def ask_stream_proxy(payload: dict, request: Request):
+    """
+    Proxy the agent's SSE stream to the caller chunk by chunk, without buffering.
+    """
+    logger.info("Received streaming query for proxy", extra=SAMPLED)
+    return await proxy_stream(
+        "/ask/stream", payload, agent_headers(request), sse_error,
+        media_type="text/event-stream",
+        response_headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-def extract_ai_content(data: dict) -> str:
+@router.post("/ask/batch")
+async def ask_batch_proxy(payload: dict, request: Request):
     """
-    Extract AI response content from LLM JSON response
+    Proxy a batch of queries in one round trip. With "stream": true the agent's
+    NDJSON results are relayed as they complete.
     """
+    logger.info("Received batch for proxy", extra=SAMPLED)
+    if payload.get("stream"):
+        return await proxy_stream(
+            "/ask/batch", payload, agent_headers(request), ndjson_error, media_type="application/x-ndjson"
+        )
     try:
-        messages = data["response"]["messages"]
-        # Find the last AI message
-        for message in reversed(messages):
-            if message.get("type") == "ai":
-                return message.get("content", "")
-        
-        return "No AI response found"
-    
-    except (KeyError, TypeError) as e:
-        return f"Error extracting response: {str(e)}"
+        resp = await agent_client.post(
+            "/ask/batch",
+            json=payload,
+            headers=agent_headers(request),
+            idempotent=stateless(payload)
+        )
+        if resp.is_error:
+            return agent_error(resp)
+        return passthrough(resp)
+    except NoUpstreamAvailable as e:
+        return unavailable(e)
+    except Exception:
+        logger.exception("Error forwarding batch to langgraph-agent")
+        return JSONResponse(status_code=500, content={"detail": "Gateway error"})
+
+def agent_headers(request: Request) -> dict:
+    """
+    Headers for agent calls: the internal key, the request id for log
+    correlation and the caller's identity for fair-share admission.
+    """
+    headers = {"X-INTERNAL-KEY": settings.INTERNAL_API_KEY, "X-Request-ID": request_id.get()}
+    # Callers with their own API key are identified by its label; the shared
+    # internal key (e.g. the UI) may name its end users with X-Client-Id
+    label = getattr(request.state, "api_key_label", INTERNAL_LABEL)
+    client_id = label if label != INTERNAL_LABEL else request.headers.get("X-Client-Id")
+    if client_id:
+        headers["X-Client-Id"] = client_id
+    return headers
+
+def stateless(payload: dict) -> bool:
+    """
+    No conversation thread anywhere in the request, so running it twice (a
+    retry or hedge on another agent replica) cannot append a turn twice.
+    """
+    return not payload.get("thread_id")
+
+def passthrough_headers(resp) -> dict:
+    """Agent response headers worth relaying: Retry-After for backoff, Server-Timing for per-hop latency."""
+    return {name: resp.headers[name] for name in ("Retry-After", "Server-Timing") if name in resp.headers}
+
+def passthrough(resp) -> Response:
+    """Relay the agent's JSON body as received, without decoding and re-encoding it."""
+    return Response(
+        content=resp.content,
+        status_code=resp.status_code,
+        media_type=resp.headers.get("Content-Type", "application/json"),
+        headers=passthrough_headers(resp),
+    )
+
+def agent_error(resp) -> JSONResponse:
+    """Pass an agent error through, keeping Retry-After on 429/503 so clients back off."""
+    try:
+        detail = resp.json().get("detail", "Agent error")
+    except ValueError:
+        detail = "Agent error"
+    return JSONResponse(
+        status_code=resp.status_code,
+        content={"detail": detail},
+        headers=passthrough_headers(resp),
+    )
+
+def unavailable(e: NoUpstreamAvailable) -> JSONResponse:
+    """Every agent replica's circuit is open; tell the client when one will be tried again."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "No agent available, try again later"},
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+async def proxy_stream(
+    path: str,
+    payload: dict,
+    headers: dict,
+    error_frame: Callable[[str], bytes],
+    media_type: str,
+    response_headers: Optional[dict] = None,
+) -> Response:
+    """
+    Open the agent stream before answering, so an agent rejection (429/503
+    from admission control, 5xx) reaches the client with its own status and
+    Retry-After instead of as an error frame inside a 200 stream.
+    """
+    stack = AsyncExitStack()
+    try:
+        resp = await stack.enter_async_context(agent_client.stream("POST", path, json=payload, headers=headers))
+        if resp.status_code != 200:
+            logger.warning("langgraph-agent %s returned %s", path, resp.status_code)
+            await resp.aread()
+            await stack.aclose()
+            return agent_error(resp)
+    except NoUpstreamAvailable as e:
+        await stack.aclose()
+        return unavailable(e)
+    except Exception:
+        logger.exception("Error opening stream from langgraph-agent")
+        await stack.aclose()
+        return JSONResponse(status_code=500, content={"detail": "Gateway error"})
+    # The background task also releases the stream if the client leaves before the body starts
+    return StreamingResponse(
+        relay_stream(resp, stack, error_frame),
+        media_type=media_type,
+        headers=response_headers,
+        background=BackgroundTask(stack.aclose),
+    )
+
+async def relay_stream(resp, stack: AsyncExitStack, error_frame: Callable[[str], bytes]) -> AsyncIterator[bytes]:
+    """Relay a streamed agent response body chunk by chunk."""
+    try:
+        async for chunk in resp.aiter_raw():
+            yield chunk
+    except Exception:
+        logger.exception("Error streaming from langgraph-agent")
+        yield error_frame("Gateway error")
+    finally:
+        await stack.aclose()
+
+def sse_error(detail: str) -> bytes:
+    return f"event: error\ndata: {json.dumps({'detail': detail})}\n\n".encode()
+
+def ndjson_error(detail: str) -> bytes:
+    return (json.dumps({"error": detail}) + "\n").encode()
@@ -0,0 +1,51 @@
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+# Per-request phase durations (seconds), reported in the Server-Timing header
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("server_timings", default=None)
+
+
+def record(name: str, seconds: float) -> None:
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def server_timing(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
+
+
+class ServerTimingMiddleware:
+    """
+    Pure ASGI middleware that times each HTTP request and adds a Server-Timing
+    header with the total (as `name`) plus any phases recorded while handling
+    it, e.g. "gateway;dur=412.3, upstream;dur=405.9". Proxied responses also
+    carry the agent's own Server-Timing header, so clients see every hop.
+    """
+
+    def __init__(self, app, name: str):
+        self.app = app
+        self.name = name
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _timings.set(timings)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                phases = {self.name: time.perf_counter() - started, **timings}
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(phases).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
@@ -0,0 +1,122 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Sequence
+
+from opentelemetry import context, propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor, ConsoleSpanExporter, SimpleSpanProcessor, SpanExporter, SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import Span, SpanKind, Status, StatusCode
+
+from .config import settings
+from .logger import setup_logger
+
+logger = setup_logger("tracing")
+
+# Until setup_tracing() installs a provider this hands out no-op spans
+tracer = trace.get_tracer("api-gateway")
+
+_configured = False
+
+
+class JSONLinesSpanExporter(SpanExporter):
+    """Appends one JSON object per finished span to a local file."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", buffering=1)
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        for span in spans:
+            self._file.write(span.to_json(indent=None) + "\n")
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        self._file.close()
+
+
+def _span_processor():
+    kind = settings.TRACING_EXPORTER.lower()
+    if kind == "otlp":
+        # Optional: pip install opentelemetry-exporter-otlp-proto-http; reads OTEL_EXPORTER_OTLP_*
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return BatchSpanProcessor(OTLPSpanExporter())
+    # Local exporters write each span as it ends: uvicorn exits on SIGTERM
+    # without running atexit hooks, which would drop a batch still in memory
+    if kind == "file":
+        return SimpleSpanProcessor(JSONLinesSpanExporter(settings.TRACING_FILE))
+    return SimpleSpanProcessor(ConsoleSpanExporter())
+
+
+def setup_tracing(service_name: str) -> None:
+    """Install the global tracer provider when TRACING_ENABLED is set."""
+    global _configured
+    if _configured or not settings.TRACING_ENABLED:
+        return
+    _configured = True
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    provider.add_span_processor(_span_processor())
+    trace.set_tracer_provider(provider)
+    logger.info("Tracing enabled (%s exporter)", settings.TRACING_EXPORTER)
+
+
+def shutdown_tracing() -> None:
+    """Flush spans still buffered for export (OTLP batches)."""
+    global _configured
+    if _configured:
+        _configured = False
+        trace.get_tracer_provider().shutdown()
+
+
+@contextmanager
+def client_span(name: str, headers: Dict[str, str], **attributes) -> Iterator[Span]:
+    """
+    Span for an outgoing request. Its trace context is written into `headers`
+    (W3C traceparent) so the callee's spans join the same trace. The span is
+    not made current, so this is safe to hold across yields in a stream.
+    """
+    span = tracer.start_span(name, kind=SpanKind.CLIENT, attributes=attributes)
+    propagate.inject(headers, context=trace.set_span_in_context(span))
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        span.set_status(Status(StatusCode.ERROR, type(e).__name__))
+        raise
+    finally:
+        span.end()
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware that opens a server span per HTTP request, continuing
+    the caller's trace when a traceparent header is present.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _configured:
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        parent: Optional[context.Context] = propagate.extract(carrier)
+        name = f"{scope['method']} {scope['path']}"
+        attributes = {"http.request.method": scope["method"], "url.path": scope["path"]}
+
+        with tracer.start_as_current_span(name, context=parent, kind=SpanKind.SERVER, attributes=attributes) as span:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    span.set_attribute("http.response.status_code", status)
+                    if status >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
@@ -0,0 +1,201 @@
+import asyncio
+import random
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+from .logger import setup_logger
+from .metrics import BREAKER_TRANSITIONS
+
+logger = setup_logger("agent-upstreams")
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class Upstream:
+    """
+    One agent replica: its in-flight request count, the result of the active
+    health checks and a circuit breaker fed by the outcome of real requests.
+    """
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        # Assumed healthy until a check says otherwise, so traffic flows at startup
+        self.healthy = True
+        self.health_failures = 0
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+        self.requests = 0
+        self.errors = 0
+
+    def available(self, now: float, reset_seconds: float) -> bool:
+        """Whether the breaker lets a request through; an open breaker half-opens after reset_seconds."""
+        if self.state == OPEN and now - self.opened_at >= reset_seconds:
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            # A single trial request decides whether the replica is back
+            return not self.probing
+        return self.state == CLOSED
+
+    def on_success(self) -> None:
+        self.failures = 0
+        self.probing = False
+        if self.state != CLOSED:
+            self._transition(CLOSED)
+
+    def on_failure(self, threshold: int) -> None:
+        self.errors += 1
+        self.failures += 1
+        self.probing = False
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= threshold):
+            self.opened_at = time.monotonic()
+            self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        logger.warning("Agent %s circuit %s -> %s", self.url, self.state, state)
+        BREAKER_TRANSITIONS.labels(self.url, state).inc()
+        self.state = state
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "outstanding": self.outstanding,
+            "healthy": self.healthy,
+            "breaker": self.state,
+            "consecutive_failures": self.failures,
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+
+class RetryBudget:
+    """
+    Caps retries and hedges at `ratio` of regular traffic: every request
+    deposits `ratio` tokens, every retry spends one. The balance never
+    exceeds `reserve`, which also bounds a burst of retries, so a replica
+    outage cannot multiply the load on the replicas that are left.
+    """
+
+    def __init__(self, ratio: float, reserve: float):
+        self.ratio = ratio
+        self.reserve = reserve
+        self.balance = reserve
+
+    def deposit(self) -> None:
+        self.balance = min(self.reserve, self.balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.balance < 1:
+            return False
+        self.balance -= 1
+        return True
+
+
+class UpstreamPool:
+    """
+    Agent replicas behind the gateway. Requests go to the available replica
+    with the fewest outstanding requests (ties broken at random). Replicas
+    failing the active health check are skipped while any healthy one is
+    left; when none is, a request's first attempt ignores the checks and
+    only open breakers exclude a replica, so a broken health endpoint cannot
+    take down traffic on its own. Retries and hedges only go to healthy
+    replicas.
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        failure_threshold: int,
+        reset_seconds: float,
+        health_interval: float,
+        health_timeout: float,
+        unhealthy_threshold: int,
+    ):
+        self.upstreams = [Upstream(url) for url in urls]
+        if not self.upstreams:
+            raise ValueError("At least one agent URL is required")
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.unhealthy_threshold = unhealthy_threshold
+        self._health_task: Optional[asyncio.Task] = None
+        self._health_client: Optional[httpx.AsyncClient] = None
+
+    def pick(self, exclude: Iterable[Upstream] = (), healthy_only: bool = False) -> Optional[Upstream]:
+        """
+        The replica for the next attempt, or None when every breaker is open (or
+        all are excluded). With `healthy_only` (retries and hedges) replicas
+        failing their health checks are never picked.
+        """
+        now = time.monotonic()
+        excluded = set(map(id, exclude))
+        candidates = [
+            u for u in self.upstreams if id(u) not in excluded and u.available(now, self.reset_seconds)
+        ]
+        healthy = [u for u in candidates if u.healthy]
+        candidates = healthy if healthy or healthy_only else candidates
+        if not candidates:
+            return None
+        least = min(u.outstanding for u in candidates)
+        upstream = random.choice([u for u in candidates if u.outstanding == least])
+        if upstream.state == HALF_OPEN:
+            upstream.probing = True
+        return upstream
+
+    def retry_after(self) -> int:
+        """Seconds until the next breaker half-opens, for Retry-After when nothing is available."""
+        now = time.monotonic()
+        waits = [self.reset_seconds - (now - u.opened_at) for u in self.upstreams if u.state == OPEN]
+        return max(1, int(min(waits, default=self.reset_seconds)) + 1)
+
+    def start(self) -> None:
+        if self._health_task is not None or self.health_interval <= 0:
+            return
+        # Own small client, so checks are not queued behind proxied requests when the main pool is busy
+        self._health_client = httpx.AsyncClient(
+            timeout=self.health_timeout, limits=httpx.Limits(max_connections=len(self.upstreams))
+        )
+        self._health_task = asyncio.create_task(self._health_loop(self._health_client))
+
+    async def stop(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        if self._health_client is not None:
+            await self._health_client.aclose()
+            self._health_client = None
+
+    async def _health_loop(self, client: httpx.AsyncClient) -> None:
+        while True:
+            await asyncio.gather(*(self._check(client, u) for u in self.upstreams))
+            await asyncio.sleep(self.health_interval)
+
+    async def _check(self, client: httpx.AsyncClient, upstream: Upstream) -> None:
+        try:
+            resp = await client.get(f"{upstream.url}/health")
+            ok = resp.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            upstream.health_failures = 0
+            if not upstream.healthy:
+                logger.info("Agent %s is healthy again", upstream.url)
+            upstream.healthy = True
+            return
+        upstream.health_failures += 1
+        if upstream.healthy and upstream.health_failures >= self.unhealthy_threshold:
+            logger.warning("Agent %s failed %d health checks", upstream.url, upstream.health_failures)
+            upstream.healthy = False
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [u.stats() for u in self.upstreams]
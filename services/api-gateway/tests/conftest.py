@@ -0,0 +1,76 @@
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+SERVICE = Path(__file__).resolve().parent.parent
+ROOT = SERVICE.parent.parent
+
+# The gateway is imported as the src package, as when run from its service directory
+sys.path.insert(0, str(SERVICE))
+
+from src.config import settings  # noqa: E402
+from src.http_client import AgentHTTPClient  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(base: str, process: subprocess.Popen) -> None:
+    deadline = time.monotonic() + 15
+    while True:
+        try:
+            httpx.get(f"{base}/health")
+            return
+        except httpx.TransportError:
+            if time.monotonic() > deadline or process.poll() is not None:
+                raise RuntimeError("agent stub did not start")
+            time.sleep(0.1)
+
+
+@pytest.fixture
+def agent_stub():
+    """Starts benchmarks/stubs/agent_stub.py with the given flags and returns its base URL."""
+    processes = []
+
+    def start(*flags: str, port: int = 0) -> str:
+        port = port or free_port()
+        process = subprocess.Popen(
+            [sys.executable, str(ROOT / "benchmarks" / "stubs" / "agent_stub.py"), "--port", str(port), *flags],
+        )
+        processes.append(process)
+        base = f"http://127.0.0.1:{port}"
+        _wait_until_up(base, process)
+        return base
+
+    try:
+        yield start
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=10)
+
+
+@pytest.fixture
+def dead_url() -> str:
+    """An address nothing listens on: connections to it are refused."""
+    return f"http://127.0.0.1:{free_port()}"
+
+
+@pytest.fixture
+def make_client(monkeypatch):
+    """An AgentHTTPClient over the given URLs, built with settings overrides (health checks off)."""
+    def make(urls, **overrides) -> AgentHTTPClient:
+        overrides = {"AGENT_HEALTH_INTERVAL_SECONDS": 0, "AGENT_HTTP2": False, **overrides}
+        for name, value in overrides.items():
+            monkeypatch.setattr(settings, name, value)
+        return AgentHTTPClient(urls)
+
+    return make
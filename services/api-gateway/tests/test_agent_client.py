@@ -0,0 +1,180 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from src.http_client import NoUpstreamAvailable
+from src.upstreams import CLOSED, HALF_OPEN, OPEN, UpstreamPool
+
+ASK = {"query": "hello"}
+STATEFUL = {"query": "hello", "thread_id": "t1"}
+
+
+def calls(base: str, path: str = "/ask") -> int:
+    return httpx.get(f"{base}/stats").json().get(path, 0)
+
+
+def run(client, make_coro):
+    """Run make_coro() on a fresh loop with the client started, closing it afterwards."""
+    async def main():
+        await client.start()
+        try:
+            return await make_coro()
+        finally:
+            await client.close()
+
+    return asyncio.run(main())
+
+
+def concurrently(client, n: int, **kwargs):
+    """n POST /ask calls in flight at once, so least-outstanding spreads them evenly."""
+    async def posts():
+        return await asyncio.gather(*(client.post("/ask", **kwargs) for _ in range(n)), return_exceptions=True)
+
+    return run(client, posts)
+
+
+def hedges(winner: str) -> float:
+    return REGISTRY.get_sample_value("agent_upstream_hedges_total", {"winner": winner}) or 0.0
+
+
+def test_pick_prefers_least_outstanding_replica():
+    pool = UpstreamPool(["http://a", "http://b", "http://c"], 5, 15, 0, 1, 2)
+    a, b, c = pool.upstreams
+    a.outstanding, b.outstanding, c.outstanding = 3, 1, 2
+    assert {pool.pick() for _ in range(20)} == {b}
+    assert pool.pick(exclude=[b]) is c
+
+
+def test_concurrent_calls_spread_over_replicas(agent_stub, make_client):
+    first, second = agent_stub("--latency-ms", "200"), agent_stub("--latency-ms", "200")
+    results = concurrently(make_client([first, second]), 4, json=ASK)
+    assert [r.status_code for r in results] == [200] * 4
+    assert (calls(first), calls(second)) == (2, 2)
+
+
+def test_pick_skips_unhealthy_replicas_except_on_first_attempt():
+    pool = UpstreamPool(["http://a", "http://b"], 5, 15, 0, 1, 2)
+    a, b = pool.upstreams
+    b.healthy = False
+    assert pool.pick() is a
+    assert pool.pick(exclude=[a], healthy_only=True) is None
+    a.healthy = False
+    # Nothing healthy left: a first attempt still goes somewhere
+    assert pool.pick() in (a, b)
+
+
+def test_breaker_opens_half_opens_and_closes(agent_stub, make_client, dead_url):
+    client = make_client(
+        [dead_url],
+        AGENT_BREAKER_FAILURE_THRESHOLD=2, AGENT_BREAKER_RESET_SECONDS=0.5, AGENT_RETRY_MAX=0,
+    )
+    upstream = client.pool.upstreams[0]
+
+    async def failing():
+        for _ in range(2):
+            with pytest.raises(httpx.ConnectError):
+                await client.post("/ask", json=ASK)
+        assert upstream.state == OPEN
+        with pytest.raises(NoUpstreamAvailable) as e:
+            await client.post("/ask", json=ASK)
+        assert e.value.retry_after >= 1
+
+    run(client, failing)
+
+    # The replica comes back on the same address
+    agent_stub(port=int(dead_url.rsplit(":", 1)[1]))
+    time.sleep(0.5)
+    assert upstream.available(time.monotonic(), client.pool.reset_seconds)
+    assert upstream.state == HALF_OPEN
+
+    async def trial():
+        return await client.post("/ask", json=ASK)
+
+    assert run(client, trial).status_code == 200
+    assert upstream.state == CLOSED
+
+
+def test_retries_stop_when_budget_is_spent(agent_stub, make_client):
+    first, second = agent_stub("--busy-ratio", "1"), agent_stub("--busy-ratio", "1")
+    client = make_client([first, second], AGENT_RETRY_BUDGET_RATIO=0, AGENT_RETRY_BUDGET_RESERVE=2)
+
+    async def posts():
+        return [await client.post("/ask", json=ASK) for _ in range(3)]
+
+    assert [r.status_code for r in run(client, posts)] == [503] * 3
+    # Two retried calls, then the budget is empty and the third is not retried
+    assert calls(first) + calls(second) == 5
+    assert client.budget.balance == 0
+
+
+def test_stateful_call_is_not_retried_after_server_error(agent_stub, make_client):
+    failing, healthy = agent_stub("--error-ratio", "1", "--latency-ms", "200"), agent_stub("--latency-ms", "200")
+    results = concurrently(make_client([failing, healthy]), 4, json=STATEFUL, idempotent=False)
+    assert sorted(r.status_code for r in results) == [200, 200, 500, 500]
+    assert (calls(failing), calls(healthy)) == (2, 2)
+
+    # The same failure on a stateless call is retried on the other replica
+    results = concurrently(make_client([failing, healthy]), 4, json=ASK, idempotent=True)
+    assert [r.status_code for r in results] == [200] * 4
+
+
+def test_stateful_call_is_not_retried_after_timeout(agent_stub, make_client):
+    slow, fast = agent_stub("--latency-ms", "2000"), agent_stub("--latency-ms", "200")
+    client = make_client([slow, fast], AGENT_READ_TIMEOUT=0.5)
+    results = concurrently(client, 4, json=STATEFUL, idempotent=False)
+    assert sum(isinstance(r, httpx.ReadTimeout) for r in results) == 2
+    assert sum(isinstance(r, httpx.Response) and r.status_code == 200 for r in results) == 2
+    assert (calls(slow), calls(fast)) == (2, 2)
+
+
+def test_busy_replica_503_passes_through_when_retry_fails(agent_stub, make_client, dead_url):
+    busy = agent_stub("--busy-ratio", "1")
+
+    async def post():
+        return await client.post("/ask", json=STATEFUL)
+
+    async def stream():
+        async with client.stream("POST", "/ask/stream", json=STATEFUL) as resp:
+            await resp.aread()
+            return resp
+
+    # Whichever replica is tried first, the caller gets the agent's 503, not the connect error
+    for attempt in (post, stream, post, stream):
+        client = make_client([busy, dead_url])
+        resp = run(client, attempt)
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "1"
+
+
+def test_retry_skips_unhealthy_replicas(agent_stub, make_client, dead_url):
+    busy = agent_stub("--busy-ratio", "1")
+    client = make_client([busy, dead_url], AGENT_RETRY_BUDGET_RATIO=0)
+    client.pool.upstreams[1].healthy = False
+
+    async def post():
+        return await client.post("/ask", json=ASK)
+
+    assert run(client, post).status_code == 503
+    assert client.budget.balance == client.budget.reserve
+    assert client.pool.upstreams[1].requests == 0
+
+
+def test_hedge_answers_from_faster_replica(agent_stub, make_client):
+    slow, fast = agent_stub("--latency-ms", "3000"), agent_stub("--latency-ms", "10")
+    client = make_client([slow, fast], AGENT_HEDGE_AFTER_MS=100)
+    # Load on the fast replica, so the first attempt goes to the slow one
+    client.pool.upstreams[1].outstanding = 1
+    before = hedges("hedge")
+
+    async def post():
+        return await client.post("/ask", json=ASK, idempotent=True)
+
+    started = time.monotonic()
+    resp = run(client, post)
+    assert resp.status_code == 200
+    assert resp.json()["content"].startswith(f"stub {fast.rsplit(':', 1)[1]}:")
+    assert time.monotonic() - started < 2
+    assert hedges("hedge") - before == 1
@@ -0,0 +1,18 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.config import settings
+from src.middleware.auth import InternalKeyMiddleware
+
+
+def test_only_exact_public_paths_skip_the_key():
+    app = FastAPI()
+    for path in ("/health", "/health/pool", "/metrics"):
+        app.add_api_route(path, lambda: {"ok": True})
+    app.add_middleware(InternalKeyMiddleware)
+    client = TestClient(app)
+
+    assert client.get("/health").status_code == 200
+    assert client.get("/metrics").status_code == 200
+    assert client.get("/health/pool").status_code == 403
+    assert client.get("/health/pool", headers={"X-INTERNAL-KEY": settings.INTERNAL_API_KEY}).status_code == 200
@@ -0,0 +1,43 @@
+"""
+Multi-worker deployment of the agent:
+
+    WEB_CONCURRENCY=4 gunicorn -c gunicorn.conf.py src.main:app
+
+Set the worker count with WEB_CONCURRENCY rather than -w, so the admission
+limits (split per worker) see it too. State that must be shared between
+workers needs a shared backend: ANSWER_CACHE_DISK_PATH or
+ANSWER_CACHE_REDIS_URL for the answer cache, and MEMORY_BACKEND=sqlite or
+redis for conversations.
+"""
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8001')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Import the app (LangChain, LangGraph, pydantic models) once in the master.
+# Workers fork with it loaded and only run their startup hooks (MCP discovery,
+# checkpointer), so adding or restarting a worker is quick.
+preload_app = True
+
+# Agent runs are bounded by ADMISSION_RUN_TIMEOUT_SECONDS; leave room for them
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+# Prometheus multiprocess mode: workers write metrics to files in this
+# directory and /metrics merges them. Must be set before prometheus_client
+# is imported, which preload_app does right after this file is read.
+metrics_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "langgraph-agent-metrics")
+)
+shutil.rmtree(metrics_dir, ignore_errors=True)
+os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,228 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Optional
+
+from opentelemetry import trace
+
+from .config.settings import settings
+from .logger import setup_logger
+from .timing import record
+
+logger = setup_logger("admission")
+
+
+class AdmissionError(Exception):
+    """A request was not admitted (429/503) or ran past its deadline (504)."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: Optional[int] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Optional[Dict[str, str]]:
+        return {"Retry-After": str(self.retry_after)} if self.retry_after is not None else None
+
+
+class AdmissionController:
+    """
+    Bounds concurrent agent runs.
+
+    Up to `max_concurrency` runs execute at once; the rest wait in a bounded
+    queue. Waiters are grouped per client and freed slots are handed out
+    round-robin across clients, so one busy API key cannot starve the others.
+    Requests are rejected immediately when the queue (503) or the client's
+    share of it (429) is full, and fail when they wait longer than
+    `queue_timeout` (503) or run longer than `run_timeout` (504).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        max_queue_per_client: int,
+        queue_timeout: float,
+        run_timeout: float,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client
+        self.queue_timeout = queue_timeout
+        self.run_timeout = run_timeout
+
+        self._in_flight = 0
+        self._queued = 0
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._client_in_flight: Dict[str, int] = defaultdict(int)
+
+        # Metrics
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_client_limit = 0
+        self.queue_timeouts = 0
+        self.run_timeouts = 0
+        self.peak_queue_depth = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._recent_waits: Deque[float] = deque(maxlen=1000)
+        # EWMA of run duration, used for Retry-After estimates
+        self._avg_run_seconds = 5.0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up for a newly queued request."""
+        backlog = (self._queued + 1) / max(self.max_concurrency, 1)
+        return max(1, math.ceil(self._avg_run_seconds * backlog))
+
+    def check(self, client_id: str) -> None:
+        """Raise AdmissionError if a request from `client_id` would be rejected right now."""
+        if self._in_flight < self.max_concurrency and self._queued == 0:
+            return
+        if self._queued >= self.max_queue:
+            self.rejected_queue_full += 1
+            logger.warning("Admission queue full (%d waiting), rejecting %s", self._queued, client_id)
+            raise AdmissionError(503, "Server busy, try again later", self.retry_after())
+        if len(self._waiters.get(client_id, ())) >= self.max_queue_per_client:
+            self.rejected_client_limit += 1
+            logger.warning("Client %s has too many queued requests", client_id)
+            raise AdmissionError(429, "Too many concurrent requests for this client", self.retry_after())
+
+    async def acquire(self, client_id: str) -> None:
+        self.check(client_id)
+        started = time.monotonic()
+        if self._in_flight < self.max_concurrency and self._queued == 0:
+            self._grant(client_id)
+            self._record_wait(0.0)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(client_id, deque()).append(waiter)
+        self._queued += 1
+        self.peak_queue_depth = max(self.peak_queue_depth, self._queued)
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await waiter
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release(client_id)
+            else:
+                self._discard(client_id, waiter)
+            if isinstance(exc, asyncio.TimeoutError):
+                self.queue_timeouts += 1
+                raise AdmissionError(503, "Timed out waiting for capacity", self.retry_after()) from None
+            raise
+        self._record_wait(time.monotonic() - started)
+
+    def release(self, client_id: str) -> None:
+        self._in_flight -= 1
+        self._client_in_flight[client_id] -= 1
+        if self._client_in_flight[client_id] <= 0:
+            del self._client_in_flight[client_id]
+        self._dispatch()
+
+    @asynccontextmanager
+    async def admit(self, client_id: str):
+        """Hold a run slot for the body, which must finish within `run_timeout`."""
+        await self.acquire(client_id)
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(self.run_timeout):
+                yield
+        except asyncio.TimeoutError:
+            self.run_timeouts += 1
+            logger.warning("Run for %s exceeded %.0fs deadline", client_id, self.run_timeout)
+            raise AdmissionError(504, "Agent run exceeded its deadline") from None
+        finally:
+            elapsed = time.monotonic() - started
+            self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * elapsed
+            self.release(client_id)
+
+    def _grant(self, client_id: str) -> None:
+        self._in_flight += 1
+        self._client_in_flight[client_id] += 1
+        self.admitted += 1
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self.max_concurrency and self._waiters:
+            client_id, waiters = next(iter(self._waiters.items()))
+            waiter = waiters.popleft()
+            self._queued -= 1
+            if waiters:
+                self._waiters.move_to_end(client_id)
+            else:
+                del self._waiters[client_id]
+            if waiter.done():
+                continue
+            self._grant(client_id)
+            waiter.set_result(None)
+
+    def _discard(self, client_id: str, waiter: asyncio.Future) -> None:
+        waiters = self._waiters.get(client_id)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        self._queued -= 1
+        if not waiters:
+            del self._waiters[client_id]
+
+    def _record_wait(self, seconds: float) -> None:
+        record("queue", seconds)
+        trace.get_current_span().set_attribute("admission.wait_ms", round(seconds * 1000, 2))
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        self._recent_waits.append(seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._recent_waits)
+        p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "queue_depth": self._queued,
+            "peak_queue_depth": self.peak_queue_depth,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_client_limit": self.rejected_client_limit,
+            "queue_timeouts": self.queue_timeouts,
+            "run_timeouts": self.run_timeouts,
+            "wait_ms_avg": round(1000 * self.wait_seconds_total / self.admitted, 2) if self.admitted else 0.0,
+            "wait_ms_p95": round(1000 * p95, 2),
+            "wait_ms_max": round(1000 * self.wait_seconds_max, 2),
+            "avg_run_seconds": round(self._avg_run_seconds, 3),
+            "clients": {
+                client: {
+                    "in_flight": self._client_in_flight.get(client, 0),
+                    "queued": len(self._waiters.get(client, ())),
+                }
+                for client in set(self._client_in_flight) | set(self._waiters)
+            },
+        }
+
+
+def per_worker(limit: int) -> int:
+    """This worker's share of a service-wide limit (rounded up, so never 0 unless the limit is)."""
+    return math.ceil(limit / max(1, settings.WEB_CONCURRENCY))
+
+
+admission = AdmissionController(
+    max_concurrency=per_worker(settings.ADMISSION_MAX_CONCURRENCY),
+    # Queue bounds stay per worker: connections are not spread evenly, and a
+    # split queue turns a busy worker's burst into 429s while others idle
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    max_queue_per_client=settings.ADMISSION_MAX_QUEUE_PER_CLIENT,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    run_timeout=settings.ADMISSION_RUN_TIMEOUT_SECONDS,
+)
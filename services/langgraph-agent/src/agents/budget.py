@@ -0,0 +1,144 @@
+import asyncio
+import time
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage
+from langgraph.errors import GraphRecursionError
+
+from ..config.settings import settings
+from ..logger import setup_logger
+from ..schemas import BudgetOverrides, FinishReason
+from ..tracing import with_tracing
+
+logger = setup_logger("agent-budget")
+
+
+@dataclass(frozen=True)
+class RunBudget:
+    max_steps: int
+    max_tool_calls: int
+    max_tokens: int
+    timeout_seconds: float
+
+    @classmethod
+    def resolve(cls, overrides: Optional[BudgetOverrides] = None) -> "RunBudget":
+        """Configured defaults, tightened (never loosened) by per-request overrides."""
+        budget = cls(
+            max_steps=settings.AGENT_MAX_STEPS,
+            max_tool_calls=settings.AGENT_MAX_TOOL_CALLS,
+            max_tokens=settings.AGENT_MAX_TOKENS,
+            timeout_seconds=settings.AGENT_RUN_TIMEOUT_SECONDS,
+        )
+        if overrides is None:
+            return budget
+        return cls(
+            max_steps=min(overrides.max_steps or budget.max_steps, budget.max_steps),
+            max_tool_calls=min(
+                budget.max_tool_calls if overrides.max_tool_calls is None else overrides.max_tool_calls,
+                budget.max_tool_calls,
+            ),
+            max_tokens=min(overrides.max_tokens or budget.max_tokens, budget.max_tokens),
+            timeout_seconds=min(overrides.timeout_seconds or budget.timeout_seconds, budget.timeout_seconds),
+        )
+
+    def config(self) -> Dict[str, Any]:
+        # Headroom over max_steps so the tracker stops the run before LangGraph
+        # swaps in its own "need more steps" reply or raises GraphRecursionError
+        return {"recursion_limit": self.max_steps + 2}
+
+
+class BudgetTracker:
+    """Accumulates steps, tool calls and tokens for one run and reports the first exhausted budget."""
+
+    def __init__(self, budget: RunBudget):
+        self.budget = budget
+        self.steps = 0
+        self.tool_calls = 0
+        self.tokens = 0
+        self.deadline = time.monotonic() + budget.timeout_seconds
+
+    def remaining_seconds(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def observe_step(self, step: int) -> None:
+        """Record the graph superstep the run has reached."""
+        self.steps = max(self.steps, step)
+
+    def observe(self, message: BaseMessage) -> None:
+        if not isinstance(message, AIMessage):
+            return
+        self.tool_calls += len(message.tool_calls)
+        usage = message.usage_metadata or {}
+        self.tokens += usage.get("total_tokens", 0)
+
+    def exhausted(self) -> Optional[FinishReason]:
+        if self.tool_calls > self.budget.max_tool_calls:
+            return "max_tool_calls"
+        if self.tokens >= self.budget.max_tokens:
+            return "max_tokens"
+        if self.steps >= self.budget.max_steps:
+            return "max_steps"
+        if time.monotonic() >= self.deadline:
+            return "timeout"
+        return None
+
+
+async def _enumerate(iterator):
+    # The first "values" chunk is the input state, so graph steps start at 0
+    step = 0
+    async for item in iterator:
+        yield step, item
+        step += 1
+
+
+def _is_final(messages) -> bool:
+    return bool(messages) and isinstance(messages[-1], AIMessage) and not messages[-1].tool_calls
+
+
+async def run_with_budget(
+    agent,
+    inputs: Dict[str, Any],
+    budget: RunBudget,
+    config: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], FinishReason]:
+    """
+    Run the agent step by step, stopping as soon as a budget is exhausted.
+
+    Returns the last graph state reached and why the run ended. Tool calls
+    that would exceed the tool budget are dropped before they execute.
+    """
+    tracker = BudgetTracker(budget)
+    state: Dict[str, Any] = {"messages": []}
+    seen = set()
+    reason: Optional[FinishReason] = None
+    try:
+        async with asyncio.timeout(budget.timeout_seconds):
+            run_config = with_tracing({**(config or {}), **budget.config()})
+            async with aclosing(agent.astream(inputs, config=run_config, stream_mode="values")) as steps:
+                async for step, state in _enumerate(steps):
+                    tracker.observe_step(step)
+                    messages = state.get("messages", [])
+                    for message in messages:
+                        # Step 0 is the input plus any earlier turns of the thread
+                        if message.id not in seen and step > 0:
+                            tracker.observe(message)
+                        seen.add(message.id)
+                    if _is_final(messages):
+                        reason = None
+                        continue
+                    reason = tracker.exhausted()
+                    if reason is not None:
+                        break
+    except asyncio.TimeoutError:
+        reason = "timeout"
+    except GraphRecursionError:
+        reason = "max_steps"
+
+    if reason is not None:
+        logger.warning(
+            "Run stopped on %s budget (steps=%d, tool_calls=%d, tokens=%d)",
+            reason, tracker.steps, tracker.tool_calls, tracker.tokens,
+        )
+    return state, reason or "stop"
@@ -1,28 +1,31 @@
-from langchain_groq import ChatGroq
-from langchain_mcp_adapters.client import MultiServerMCPClient
+from typing import List
+
+from langchain_core.tools import BaseTool
 from langgraph.prebuilt import create_react_agent
+from ..cache.embedders import load_embedder
 from ..config.settings import settings
+from ..tools.tool_index import ToolIndex
+from .memory import HistoryCompactor
+from .model_router import get_model_router
+from .tool_executor import build_tool_node
 
-async def build_agent(mcp_client: MultiServerMCPClient):
-    # llm = OpenAI(temperature=0, openai_api_key=settings.GROQ_API_KEY)
-    # client=MultiServerMCPClient(
-    #     {
-    #         "math":{
-    #             "command":"python",
-    #             "args":["mathserver.py"], ## Ensure correct absolute path
-    #             "transport":"stdio",
-            
-    #         },
-    #         "weather": {
-    #             "url": "http://localhost:8002/mcp",  # Ensure server is running here
-    #             "transport": "streamable_http",
-    #         }
-
-    #     }
-    # )
-
-    #mcp_client=await client.get_tools()
-    tools = await mcp_client.get_tools()
-    print("MCP Client connections:", tools)
-    model=ChatGroq(model="qwen-qwq-32b", temperature=0.0, groq_api_key=settings.GROQ_API_KEY)
-    return create_react_agent(model=model, tools=tools)
+async def build_agent(tools: List[BaseTool]):
+    # Compiled without a checkpointer; conversation_memory.bind() attaches one for thread_id runs.
+    # The model is chosen per call by the router, from the run's model_tier,
+    # with only the tools the index selects for the query bound to it.
+    router = get_model_router()
+    index = None
+    if settings.TOOL_SELECTION_ENABLED:
+        index = ToolIndex(
+            tools,
+            settings.TOOL_SELECTION_TOP_K,
+            load_embedder(settings.TOOL_SELECTION_EMBEDDER),
+            settings.TOOL_SELECTION_MIN_SIMILARITY,
+        )
+    return create_react_agent(
+        model=router.selector(tools, index),
+        tools=build_tool_node(tools),
+        pre_model_hook=HistoryCompactor(
+            router.summary_model(), settings.MEMORY_MAX_TOKENS, settings.MEMORY_KEEP_TOKENS
+        ),
+    )
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import random
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from .response import message_text
+
+# Each rule turns every regex match in the user's message into one tool call.
+# Argument templates use str.format with {0} = whole match, {1}.. = groups.
+DEFAULT_SCRIPT: List[Dict[str, Any]] = [
+    {
+        "pattern": r"[Ww]eather (?:in|for) ([A-Z][\w'-]*(?: [A-Z][\w'-]*)*)",
+        "tool": "get_weather",
+        "args": {"city": "{1}"},
+    },
+    {
+        "pattern": r"(?i)(?:calculate|compute|evaluate)\s+([-+*/^%().\d\s]+\d\)?)",
+        "tool": "evaluate",
+        "args": {"expression": "{1}"},
+    },
+]
+
+
+class FakeRateLimitError(Exception):
+    """What a provider's 429 looks like to the model router."""
+
+    status_code = 429
+
+
+def load_script(path: Optional[str]) -> List[Dict[str, Any]]:
+    if not path:
+        return DEFAULT_SCRIPT
+    with open(path) as f:
+        return json.load(f)
+
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Deterministic stand-in for the LLM, for offline load tests and benchmarks.
+
+    On a new user message it emits the tool calls produced by the script rules
+    (only for tools that are actually bound); once those tools have answered,
+    it replies with their outputs. Messages matching no rule are echoed back.
+    Each call sleeps `latency_ms` to model provider latency and reports
+    approximate token usage so budgets and metrics behave realistically.
+    A `rate_limit_ratio` share of async calls fail with a simulated 429, to
+    exercise model failover.
+    """
+
+    script: List[Dict[str, Any]] = DEFAULT_SCRIPT
+    latency_ms: float = 50.0
+    rate_limit_ratio: float = 0.0
+    bound_tools: Sequence[str] = ()
+    # Prompt tokens the bound tool schemas would add with a real provider
+    tool_schema_tokens: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "ScriptedChatModel":
+        schemas = [convert_to_openai_tool(t) for t in tools]
+        return self.model_copy(update={
+            "bound_tools": tuple(s["function"]["name"] for s in schemas),
+            "tool_schema_tokens": sum(_approx_tokens(json.dumps(s)) for s in schemas),
+        })
+
+    def _tool_calls(self, query: str, turn: int) -> List[Dict[str, Any]]:
+        calls = []
+        for rule in self.script:
+            if self.bound_tools and rule["tool"] not in self.bound_tools:
+                continue
+            for match in re.finditer(rule["pattern"], query):
+                values = [match.group(0)] + [g or "" for g in match.groups()]
+                args = {k: v.format(*values).strip() for k, v in rule["args"].items()}
+                calls.append({"name": rule["tool"], "args": args, "id": f"call_{turn}_{len(calls)}"})
+        return calls
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        last_user = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=-1)
+        query = message_text(messages[last_user].content) if last_user >= 0 else ""
+        results = [m for m in messages[last_user + 1:] if isinstance(m, ToolMessage)]
+        if results:
+            content = "Here is what I found: " + "; ".join(message_text(m.content) for m in results)
+            return AIMessage(content=content)
+        calls = self._tool_calls(query, last_user)
+        if calls:
+            return AIMessage(content="", tool_calls=calls)
+        return AIMessage(content=f"You said: {query}")
+
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        message = self._respond(messages)
+        prompt = self.tool_schema_tokens + sum(_approx_tokens(message_text(m.content)) for m in messages)
+        completion = _approx_tokens(message_text(message.content) or json.dumps(message.tool_calls))
+        message.usage_metadata = {
+            "input_tokens": prompt,
+            "output_tokens": completion,
+            "total_tokens": prompt + completion,
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        return self._result(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency_ms / 1000)
+        if self.rate_limit_ratio and random.random() < self.rate_limit_ratio:
+            raise FakeRateLimitError("Rate limit reached (simulated)")
+        return self._result(messages)
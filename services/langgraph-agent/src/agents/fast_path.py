@@ -0,0 +1,229 @@
+import asyncio
+import json
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.tools import BaseTool
+
+from ..config.settings import settings
+from ..logger import setup_logger
+from ..metrics import FAST_PATH, TOOL_CALLS, TOOL_SECONDS
+from ..timing import record
+from .response import message_text
+
+logger = setup_logger("fast-path")
+
+
+@dataclass
+class ToolPlan:
+    """One tool call that answers a query, and how to phrase its result."""
+
+    rule: str
+    tool: str
+    args: Dict[str, Any]
+    template: str
+    values: Dict[str, Any]
+
+
+def format_number(text: str) -> str:
+    """"14.0" -> "14", "0.30000000000000004" -> "0.3"; anything else unchanged."""
+    try:
+        value = float(text)
+    except ValueError:
+        return text
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return f"{value:.12g}"
+
+
+class PatternRule:
+    """
+    A regex over the whole (stripped) query. Named groups fill the tool's
+    argument templates (str.format) and, with {result}, the answer template.
+    """
+
+    def __init__(self, name: str, patterns: Sequence[str], tool: str, args: Dict[str, str], template: str):
+        self.name = name
+        self.patterns = [re.compile(p, re.IGNORECASE) for p in patterns]
+        self.tool = tool
+        self.args = args
+        self.template = template
+
+    def match(self, query: str) -> Optional[ToolPlan]:
+        for pattern in self.patterns:
+            match = pattern.fullmatch(query)
+            if match:
+                values = {k: (v or "").strip() for k, v in match.groupdict().items()}
+                args = {k: v.format(**values) for k, v in self.args.items()}
+                return ToolPlan(self.name, self.tool, args, self.template, values)
+        return None
+
+
+_ARITHMETIC_PREFIX = re.compile(
+    r"^(?:what(?:'s| is)|how much is|calculate|compute|evaluate|solve)\s+", re.IGNORECASE
+)
+_ARITHMETIC_WORDS = [
+    (re.compile(r"\bto the power of\b|\braised to(?: the power of)?\b", re.IGNORECASE), "^"),
+    (re.compile(r"\bmultiplied by\b|\btimes\b|(?<=\d)\s*[x×]\s*(?=\d)", re.IGNORECASE), "*"),
+    (re.compile(r"\bdivided by\b|\bover\b|÷", re.IGNORECASE), "/"),
+    (re.compile(r"\bplus\b", re.IGNORECASE), "+"),
+    (re.compile(r"\bminus\b", re.IGNORECASE), "-"),
+    (re.compile(r"\bmod(?:ulo)?\b", re.IGNORECASE), "%"),
+]
+_EXPRESSION = re.compile(r"[-+*/^%().,\d\sa-z]+")
+# "1,000" -> "1000"; any other comma must separate a function's arguments
+_THOUSANDS = re.compile(r"(?<=\d),(?=\d{3}(?!\d))")
+_CALL = re.compile(r"[a-z]\d*\s*\(")
+_NAMES = re.compile(r"[a-z]+\d*")
+# Names the math server's evaluate tool understands
+_FUNCTIONS = frozenset(
+    "abs round min max sqrt exp log log10 log2 sin cos tan floor ceil pi e".split()
+)
+_BINARY = re.compile(r"(-?\d+(?:\.\d+)?)\s*([-+*/^%])\s*(-?\d+(?:\.\d+)?)")
+_OPERATIONS = {"+": "add", "-": "subtract", "*": "multiply", "/": "divide", "^": "power", "%": "mod"}
+
+
+class ArithmeticRule:
+    """
+    Pure arithmetic ("what is 17 * 23", "calculate (2 + 3)^2", "12 divided by
+    4"). A single binary operation calls `calculate`; any other expression
+    over numbers and the evaluator's functions calls `evaluate`.
+    """
+
+    name = "arithmetic"
+    template = "{expression} = {result}"
+
+    def match(self, query: str) -> Optional[ToolPlan]:
+        text = _ARITHMETIC_PREFIX.sub("", query).rstrip("?.!= ").lower()
+        for pattern, operator in _ARITHMETIC_WORDS:
+            text = pattern.sub(f" {operator} ", text)
+        expression = _THOUSANDS.sub("", " ".join(text.split()))
+        if not expression or not _EXPRESSION.fullmatch(expression) or not re.search(r"\d", expression):
+            return None
+        if "," in expression and not _CALL.search(expression):
+            # "1,2" would reach the evaluator as a tuple and fail
+            return None
+        if not re.search(r"[-+*/^%(]", expression.lstrip("-")):
+            return None
+        if any(name not in _FUNCTIONS for name in _NAMES.findall(expression)):
+            return None
+        values = {"expression": expression}
+        binary = _BINARY.fullmatch(expression)
+        if binary:
+            a, operator, b = binary.groups()
+            args = {"operation": _OPERATIONS[operator], "a": float(a), "b": float(b)}
+            return ToolPlan(self.name, "calculate", args, self.template, values)
+        return ToolPlan(self.name, "evaluate", {"expression": expression}, self.template, values)
+
+
+# Up to four words, none of which joins or compares two cities ("and", "vs"),
+# names a time ("tomorrow") or starts a question ("what is the weather")
+_WORD = (
+    r"(?!(?:and|or|today|now|right|tomorrow|yesterday|next|this|last|on|what|how|is|will"
+    r"|compared|compare|vs|versus|to|than|from|with|like)\b)[a-z][\w.'-]*"
+)
+_CITY = rf"(?P<city>{_WORD}(?: {_WORD}){{0,3}})"
+# Before a bare "<city> weather", these describe the weather rather than name
+# a place ("the weather", "current weather", "nice weather")
+_NOT_CITY = (
+    r"(?!(?:the|a|an|some|any|such|my|our|your|this|that|current|local|today's|tomorrow's"
+    r"|nice|good|bad|great|lovely|beautiful|fine|awful|terrible|horrible|nasty|perfect|weird|crazy|cold|hot|warm"
+    r"|wet|dry|sunny|rainy|cloudy|windy|stormy|snowy)\b)"
+)
+
+WEATHER_RULE = PatternRule(
+    "weather",
+    [
+        r"(?:what(?:'s| is) the |how is the |how's the )?(?:current )?weather(?: like)? (?:in|for|at) "
+        + _CITY + r"(?: (?:today|now|right now))?[?.!]*",
+        _NOT_CITY + _CITY + r" weather(?: (?:today|now|right now))?[?.!]*",
+    ],
+    tool="get_weather",
+    args={"city": "{city}"},
+    template="Current weather in {result}",
+)
+
+
+def load_rules(path: Optional[str]) -> List[Any]:
+    """
+    Built-in arithmetic and weather rules, then any from a JSON file: a list of
+    {"name", "patterns": [...], "tool", "args": {...}, "template"}.
+    """
+    rules: List[Any] = [ArithmeticRule(), WEATHER_RULE]
+    if path:
+        with open(path) as f:
+            rules += [PatternRule(**rule) for rule in json.load(f)]
+    return rules
+
+
+class FastPath:
+    """
+    Answers queries that need exactly one tool call and no reasoning
+    ("what is 17 * 23", "weather in Paris") without the LLM. The first
+    matching rule's tool is called directly and its result is formatted from
+    the rule's template. A query that matches no rule, whose tool is not
+    registered, or whose tool call fails falls through to the agent.
+    """
+
+    def __init__(self, rules: Sequence[Any], timeout: float, max_chars: int = 200):
+        self.rules = list(rules)
+        self.timeout = timeout
+        self.max_chars = max_chars
+
+    def plan(self, query: str) -> Optional[ToolPlan]:
+        query = " ".join(query.split())
+        if len(query) > self.max_chars:
+            return None
+        for rule in self.rules:
+            plan = rule.match(query)
+            if plan is not None:
+                return plan
+        return None
+
+    async def answer(self, query: str, tools: Mapping[str, BaseTool]) -> Optional[List[BaseMessage]]:
+        """The run's messages (question, tool call, tool result, answer), or None to fall through."""
+        plan = self.plan(query)
+        if plan is None:
+            return None
+        tool = tools.get(plan.tool)
+        if tool is None:
+            FAST_PATH.labels(plan.rule, "no_tool").inc()
+            return None
+
+        call = {"name": plan.tool, "args": plan.args, "id": f"fast_{uuid.uuid4().hex[:12]}", "type": "tool_call"}
+        started = time.perf_counter()
+        status = "error"
+        try:
+            result = await asyncio.wait_for(tool.ainvoke(call), self.timeout)
+            if getattr(result, "status", None) != "error":
+                status = "ok"
+        except asyncio.TimeoutError:
+            status = "timeout"
+        except Exception as e:
+            logger.warning("Fast path tool %s failed: %s", plan.tool, e)
+        finally:
+            elapsed = time.perf_counter() - started
+            record("tool", elapsed)
+            TOOL_SECONDS.labels(plan.tool).observe(elapsed)
+            TOOL_CALLS.labels(plan.tool, status).inc()
+        if status != "ok":
+            # Let the agent try; it can explain the failure or work around it
+            FAST_PATH.labels(plan.rule, "fallthrough").inc()
+            return None
+
+        output = message_text(result.content)
+        content = plan.template.format(**plan.values, result=format_number(output))
+        FAST_PATH.labels(plan.rule, "answered").inc()
+        return [
+            HumanMessage(content=query),
+            AIMessage(content="", tool_calls=[call]),
+            ToolMessage(content=output, name=plan.tool, tool_call_id=call["id"]),
+            AIMessage(content=content),
+        ]
+
+
+fast_path = FastPath(load_rules(settings.FAST_PATH_RULES), settings.TOOL_CALL_TIMEOUT_SECONDS)
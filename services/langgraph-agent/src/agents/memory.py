@@ -0,0 +1,270 @@
+import asyncio
+import importlib
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+from ..config.settings import settings
+from ..logger import setup_logger
+from .response import message_text
+
+logger = setup_logger("agent-memory")
+
+SUMMARY_NAME = "conversation_summary"
+# Model calls made while summarizing carry this tag so streams can skip them
+SUMMARY_TAG = "memory_summary"
+
+_SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an assistant. "
+    "Keep facts, names, numbers, tool results and open questions the assistant may need later. "
+    "Be concise.\n\nCurrent summary:\n{summary}\n\nNew messages to fold into the summary:\n{transcript}\n\n"
+    "Return only the updated summary."
+)
+
+
+def _is_summary(message: BaseMessage) -> bool:
+    return isinstance(message, SystemMessage) and message.name == SUMMARY_NAME
+
+
+def _transcript(messages: Sequence[BaseMessage]) -> str:
+    lines = []
+    for message in messages:
+        text = message_text(message.content).strip()
+        for call in getattr(message, "tool_calls", None) or []:
+            text += f" [called {call['name']}({call.get('args')})]"
+        if text:
+            lines.append(f"{message.type}: {text}")
+    return "\n".join(lines)
+
+
+def _split_point(messages: Sequence[BaseMessage], keep_tokens: int) -> int:
+    """
+    Index where the verbatim tail starts: the earliest user turn whose tail fits
+    in keep_tokens, and never later than the current turn. Cutting only at user
+    messages keeps tool calls and their results together.
+    """
+    turns = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+    if not turns:
+        return 0
+    split = turns[-1]
+    for i in reversed(turns[:-1]):
+        if count_tokens_approximately(messages[i:]) > keep_tokens:
+            break
+        split = i
+    return split
+
+
+class HistoryCompactor:
+    """
+    pre_model_hook that keeps the prompt bounded for long threads.
+
+    While a thread's history fits in `max_tokens` it is sent as is. Past that,
+    everything before the most recent turns (about `keep_tokens` worth) is
+    folded into a running summary message and removed from the thread state,
+    so each call's prompt stays roughly constant however long the thread gets.
+    """
+
+    def __init__(self, model, max_tokens: int, keep_tokens: int):
+        self.model = model.with_config(tags=[SUMMARY_TAG])
+        self.max_tokens = max_tokens
+        self.keep_tokens = keep_tokens
+
+    async def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        messages: List[BaseMessage] = list(state["messages"])
+        summary = messages[0] if messages and _is_summary(messages[0]) else None
+        history = messages[1:] if summary else messages
+        if count_tokens_approximately(history) <= self.max_tokens:
+            return {"llm_input_messages": messages}
+
+        split = _split_point(history, self.keep_tokens)
+        older, recent = history[:split], history[split:]
+        if not older:
+            return {"llm_input_messages": messages}
+
+        try:
+            reply = await self.model.ainvoke(_SUMMARY_PROMPT.format(
+                summary=message_text(summary.content) if summary else "(none)",
+                transcript=_transcript(older),
+            ))
+        except Exception:
+            # Still bound this call's prompt; the thread is summarized next time
+            logger.exception("Conversation summary failed, trimming history instead")
+            return {"llm_input_messages": ([summary] if summary else []) + recent}
+
+        new_summary = SystemMessage(
+            content=f"Summary of the earlier conversation:\n{message_text(reply.content)}",
+            name=SUMMARY_NAME,
+        )
+        logger.info("Folded %d messages into the conversation summary", len(older))
+        return {
+            # Rewrites the thread state, and sends the compacted list to the model
+            # on this call too (it would otherwise see the pre-hook history)
+            "messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), new_summary, *recent],
+            "llm_input_messages": [new_summary, *recent],
+        }
+
+
+def _load_backend(spec: str):
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+class ConversationMemory:
+    """
+    Owns the checkpointer that stores thread_id-keyed conversation state.
+
+    MEMORY_BACKEND selects it: "sqlite" (local file), "redis" (needs the
+    optional langgraph-checkpoint-redis package), "memory" (in-process),
+    "none" (stateless), or "package.module:factory" returning a LangGraph
+    checkpointer or an async context manager that yields one. Threads idle
+    for MEMORY_THREAD_TTL_SECONDS are pruned in the background. Every backend
+    but "memory" can be shared by several workers.
+    """
+
+    def __init__(self):
+        self.checkpointer: Optional[BaseCheckpointSaver] = None
+        self._stack: Optional[AsyncExitStack] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_seen: Dict[str, float] = {}
+        self._bound: Optional[tuple] = None
+        self.pruned = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.checkpointer is not None
+
+    async def start(self) -> None:
+        if self._stack is not None:
+            return
+        self._stack = AsyncExitStack()
+        backend = settings.MEMORY_BACKEND
+        if backend == "none":
+            logger.info("Conversation memory disabled")
+            return
+        if backend == "memory":
+            from langgraph.checkpoint.memory import InMemorySaver
+            if settings.WEB_CONCURRENCY > 1:
+                logger.warning("MEMORY_BACKEND=memory is per worker; threads will not follow requests across workers")
+            self.checkpointer = InMemorySaver()
+        elif backend == "sqlite":
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+            self.checkpointer = await self._stack.enter_async_context(
+                AsyncSqliteSaver.from_conn_string(settings.MEMORY_SQLITE_PATH)
+            )
+        elif backend == "redis":
+            from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+            self.checkpointer = await self._stack.enter_async_context(
+                AsyncRedisSaver.from_conn_string(settings.MEMORY_REDIS_URL)
+            )
+            await self.checkpointer.asetup()
+        else:
+            saver = _load_backend(backend)
+            if hasattr(saver, "__aenter__"):
+                saver = await self._stack.enter_async_context(saver)
+            self.checkpointer = saver
+        self._task = asyncio.create_task(self._prune_loop())
+        logger.info("Conversation memory using %s backend", backend)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._stack is not None:
+            await self._stack.aclose()
+            self._stack = None
+        self.checkpointer = None
+
+    def bind(self, agent):
+        """The agent graph with the checkpointer attached (cached per agent)."""
+        if self._bound is None or self._bound[0] is not agent:
+            self._bound = (agent, agent.copy(update={"checkpointer": self.checkpointer}))
+        return self._bound[1]
+
+    def config(self, thread_id: str) -> Dict[str, Any]:
+        self._last_seen[thread_id] = time.time()
+        return {"configurable": {"thread_id": thread_id}}
+
+    async def settle(self, agent, config: Dict[str, Any], answer: str) -> None:
+        """
+        Close out a thread whose run was stopped early: answer its dangling tool
+        calls and record the partial answer, so the next turn sees a valid history.
+        """
+        state = await agent.aget_state(config)
+        messages = state.values.get("messages", [])
+        answered = {m.tool_call_id for m in messages if isinstance(m, ToolMessage)}
+        updates: List[BaseMessage] = [
+            ToolMessage(
+                content="Not run: the request's budget was exhausted",
+                tool_call_id=call["id"],
+                name=call["name"],
+                status="error",
+            )
+            for message in messages if isinstance(message, AIMessage)
+            for call in message.tool_calls if call["id"] not in answered
+        ]
+        updates.append(AIMessage(content=answer))
+        await agent.aupdate_state(config, {"messages": updates}, as_node="agent")
+
+    async def _seed_last_seen(self) -> None:
+        """Pick up threads persisted by earlier runs so they can be pruned too."""
+        now = time.time()
+        async for checkpoint in self.checkpointer.alist(None):
+            thread_id = checkpoint.config["configurable"]["thread_id"]
+            self._last_seen.setdefault(thread_id, now)
+
+    async def _last_written(self, thread_id: str) -> float:
+        checkpoint = await self.checkpointer.aget_tuple({"configurable": {"thread_id": thread_id}})
+        if checkpoint is None:
+            return 0.0
+        return datetime.fromisoformat(checkpoint.checkpoint["ts"]).timestamp()
+
+    async def prune(self) -> int:
+        cutoff = time.time() - settings.MEMORY_THREAD_TTL_SECONDS
+        idle = []
+        for thread_id, seen in list(self._last_seen.items()):
+            if seen >= cutoff:
+                continue
+            # Another worker may have served the thread since this one last did
+            written = await self._last_written(thread_id)
+            if written >= cutoff:
+                self._last_seen[thread_id] = written
+                continue
+            await self.checkpointer.adelete_thread(thread_id)
+            del self._last_seen[thread_id]
+            idle.append(thread_id)
+        if idle:
+            self.pruned += len(idle)
+            logger.info("Pruned %d idle conversation threads", len(idle))
+        return len(idle)
+
+    async def _prune_loop(self) -> None:
+        # The store is scanned here rather than in start(), so a long history
+        # does not slow down every worker's startup
+        seeded = False
+        while True:
+            await asyncio.sleep(settings.MEMORY_PRUNE_INTERVAL_SECONDS)
+            try:
+                if not seeded:
+                    await self._seed_last_seen()
+                    seeded = True
+                await self.prune()
+            except Exception:
+                logger.exception("Thread pruning failed")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": settings.MEMORY_BACKEND,
+            "enabled": self.enabled,
+            "threads": len(self._last_seen),
+            "pruned": self.pruned,
+        }
+
+
+conversation_memory = ConversationMemory()
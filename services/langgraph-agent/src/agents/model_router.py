@@ -0,0 +1,297 @@
+import asyncio
+import importlib
+import json
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langgraph.config import get_config
+
+from ..config.settings import settings
+from ..logger import setup_logger
+from ..metrics import MODEL_COOLDOWNS, MODEL_ROUTED_RUNS, TOOLS_BOUND, llm_metrics
+from ..timing import llm_timing
+from ..tools.tool_index import ToolIndex
+from .response import message_text
+
+logger = setup_logger("model-router")
+
+TIERS = ("small", "large")
+
+
+@dataclass
+class ModelRoute:
+    name: str
+    tier: str
+    model: BaseChatModel
+    latency_ewma: Optional[float] = None
+    cooldown_until: float = 0.0
+    calls: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+
+    def available(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def observe_latency(self, seconds: float) -> None:
+        self.calls += 1
+        self.latency_ewma = seconds if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * seconds
+
+
+def default_routes() -> List[Dict[str, Any]]:
+    """One small and one large model for LLM_PROVIDER, used when MODEL_ROUTES is empty."""
+    if settings.LLM_PROVIDER == "fake":
+        return [
+            {"name": "fake-small", "tier": "small", "provider": "fake"},
+            {"name": "fake-large", "tier": "large", "provider": "fake"},
+        ]
+    return [
+        {"name": "groq-small", "tier": "small", "provider": "groq", "model": "llama-3.1-8b-instant",
+         "params": {"max_retries": 1}},
+        {"name": "groq-large", "tier": "large", "provider": "groq", "model": "qwen-qwq-32b",
+         "params": {"max_retries": 1}},
+    ]
+
+
+def build_model(spec: Dict[str, Any], callbacks: List[Any]) -> BaseChatModel:
+    """
+    Chat model for one route. Providers: "groq", "fake" (scripted, offline) or
+    "package.module:ChatClass" constructed with model=..., plus the route's params.
+    """
+    provider = spec.get("provider", "groq")
+    params = dict(spec.get("params") or {})
+    # Callbacks see which route a call belongs to through this metadata
+    common = {"callbacks": callbacks, "metadata": {"model_route": spec["name"]}}
+    if provider == "groq":
+        from langchain_groq import ChatGroq
+        return ChatGroq(
+            model=spec["model"], groq_api_key=settings.GROQ_API_KEY, **{"temperature": 0.0, **params}, **common
+        )
+    if provider == "fake":
+        from .fake_model import ScriptedChatModel, load_script
+        return ScriptedChatModel(
+            script=load_script(settings.FAKE_LLM_SCRIPT),
+            **{
+                "latency_ms": settings.FAKE_LLM_LATENCY_MS,
+                "rate_limit_ratio": settings.FAKE_LLM_RATE_LIMIT_RATIO,
+                **params,
+            },
+            **common,
+        )
+    module_name, _, class_name = provider.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)(model=spec["model"], **params, **common)
+
+
+class HeuristicClassifier:
+    """
+    Sends short single-question lookups to the small tier. Long queries,
+    several questions, or wording that asks for reasoning go to the large one.
+    """
+
+    def __init__(self, max_chars: int, complex_pattern: str):
+        self.max_chars = max_chars
+        self.complex = re.compile(complex_pattern, re.IGNORECASE)
+
+    def classify(self, query: str) -> str:
+        text = query.strip()
+        if len(text) > self.max_chars or text.count("?") > 1 or self.complex.search(text):
+            return "large"
+        return "small"
+
+
+def load_classifier(spec: Optional[str]):
+    """None for the heuristics, or "package.module:ClassName" with a classify(query) -> tier method."""
+    if not spec:
+        return HeuristicClassifier(settings.MODEL_ROUTER_SIMPLE_MAX_CHARS, settings.MODEL_ROUTER_COMPLEX_PATTERN)
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def _is_rate_limit(error: BaseException) -> bool:
+    return getattr(error, "status_code", None) == 429 or "RateLimit" in type(error).__name__
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _tool_selection(messages: List[Any], index: ToolIndex) -> Tuple[str, ...]:
+    """
+    Tools for the current turn: the index's pick for the latest user message,
+    plus tools the conversation has already called, so that a follow-up such
+    as "and in Rome?" can call them again.
+    """
+    query = next((message_text(m.content) for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+    selected = set(index.select(query))
+    for message in messages:
+        if isinstance(message, AIMessage):
+            selected.update(call["name"] for call in message.tool_calls)
+    return tuple(name for name in index.names if name in selected)
+
+
+def with_model_tier(config: Dict[str, Any], tier: str) -> Dict[str, Any]:
+    """Run config that makes the agent's model selector use `tier`."""
+    return {**config, "configurable": {**config.get("configurable", {}), "model_tier": tier}}
+
+
+class ModelRouter(AsyncCallbackHandler):
+    """
+    Chooses the chat model for each model call of an agent run.
+
+    Each run is classified once as "small" or "large" (see with_model_tier).
+    Every model call then tries the routes of that tier first, fastest
+    first by EWMA latency, and then the other tier's routes as fallbacks.
+    So a failing small model escalates to the large one, and a failing
+    large model degrades to a small one rather than erroring.
+
+    As a callback handler on every routed model, the router records call
+    latency. It also takes a route out of rotation after an error, for the
+    provider's Retry-After (or MODEL_ROUTER_COOLDOWN_SECONDS) on a 429 and
+    for MODEL_ROUTER_ERROR_COOLDOWN_SECONDS otherwise. A route that is
+    cooling down is still tried, but only after all the others.
+    """
+
+    def __init__(self, specs: List[Dict[str, Any]], classifier, enabled: bool = True):
+        self.classifier = classifier
+        self.enabled = enabled
+        callbacks = [llm_timing, llm_metrics, self]
+        self.routes = [ModelRoute(spec["name"], spec["tier"], build_model(spec, callbacks)) for spec in specs]
+        unknown = {r.tier for r in self.routes} - set(TIERS)
+        if unknown or not self.routes:
+            raise ValueError(f"MODEL_ROUTES needs at least one route, with tiers in {TIERS}")
+        self._by_name = {r.name: r for r in self.routes}
+        self._started: Dict[UUID, Tuple[ModelRoute, float]] = {}
+
+    @classmethod
+    def from_settings(cls) -> "ModelRouter":
+        specs = json.loads(settings.MODEL_ROUTES) if settings.MODEL_ROUTES else default_routes()
+        return cls(specs, load_classifier(settings.MODEL_ROUTER_CLASSIFIER), settings.MODEL_ROUTER_ENABLED)
+
+    def has_tier(self, tier: str) -> bool:
+        return any(r.tier == tier for r in self.routes)
+
+    def classify(self, query: str) -> str:
+        """Tier for a run; "large" when routing is disabled or the tier has no routes."""
+        tier = self.classifier.classify(query) if self.enabled else "large"
+        if not self.has_tier(tier):
+            tier = "large" if self.has_tier("large") else "small"
+        MODEL_ROUTED_RUNS.labels(tier).inc()
+        return tier
+
+    def should_escalate(self, tier: str, finish_reason: str) -> bool:
+        """Whether a small-tier run that ran out of steps deserves a large-tier retry."""
+        return (
+            settings.MODEL_ROUTER_ESCALATE
+            and tier == "small"
+            and finish_reason in ("max_steps", "max_tool_calls")
+            and self.has_tier("large")
+        )
+
+    def candidates(self, tier: str) -> List[ModelRoute]:
+        now = time.monotonic()
+        return sorted(self.routes, key=lambda r: (not r.available(now), r.tier != tier, r.latency_ewma or 0.0))
+
+    def summary_model(self) -> BaseChatModel:
+        """Model for housekeeping calls such as conversation summaries: the preferred small one."""
+        return self.candidates("small")[0].model
+
+    def selector(
+        self, tools: Sequence[BaseTool], index: Optional[ToolIndex] = None, cache_size: int = 256
+    ) -> Callable[..., Runnable]:
+        """
+        Dynamic model for create_react_agent. With an index, each call binds
+        only the tools it selects for the conversation. Tool schemas are
+        converted once here. Each (candidate order, tool selection) pair gets
+        its fallback chain of bound models built once, kept in an LRU.
+        """
+        schemas = {t.name: convert_to_openai_tool(t) for t in tools}
+        everything = tuple(schemas)
+        chains: "OrderedDict[Tuple[Tuple[str, ...], Tuple[str, ...]], Runnable]" = OrderedDict()
+
+        def bind(route: ModelRoute, selection: Tuple[str, ...]) -> Runnable:
+            return route.model.bind_tools([schemas[name] for name in selection]) if selection else route.model
+
+        def select(state: Any, runtime: Any) -> Runnable:
+            tier = get_config().get("configurable", {}).get("model_tier", "large")
+            candidates = self.candidates(tier)
+            selection = _tool_selection(state["messages"], index) if index is not None and index.active else everything
+            TOOLS_BOUND.observe(len(selection))
+            key = (tuple(r.name for r in candidates), selection)
+            chain = chains.get(key)
+            if chain is None:
+                first, *rest = (bind(route, selection) for route in candidates)
+                chain = chains[key] = first.with_fallbacks(rest) if rest else first
+                while len(chains) > cache_size:
+                    chains.popitem(last=False)
+            else:
+                chains.move_to_end(key)
+            return chain
+
+        return select
+
+    async def on_chat_model_start(
+        self, serialized: Any, messages: Any, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> None:
+        route = self._by_name.get((metadata or {}).get("model_route"))
+        if route is not None:
+            self._started[run_id] = (route, time.perf_counter())
+
+    async def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            route, at = started
+            route.observe_latency(time.perf_counter() - at)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        # A cancelled call (run deadline, client gone) says nothing about the model
+        if started is None or isinstance(error, asyncio.CancelledError):
+            return
+        route = started[0]
+        route.errors += 1
+        if _is_rate_limit(error):
+            route.rate_limited += 1
+            reason, cooldown = "rate_limited", _retry_after(error) or settings.MODEL_ROUTER_COOLDOWN_SECONDS
+        else:
+            reason, cooldown = "error", settings.MODEL_ROUTER_ERROR_COOLDOWN_SECONDS
+        route.cooldown_until = time.monotonic() + cooldown
+        MODEL_COOLDOWNS.labels(route.name, reason).inc()
+        logger.warning("Model route %s failed (%s); deprioritized for %.0fs", route.name, type(error).__name__, cooldown)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "enabled": self.enabled,
+            "routes": [
+                {
+                    "name": r.name,
+                    "tier": r.tier,
+                    "available": r.available(now),
+                    "cooldown_seconds": round(max(0.0, r.cooldown_until - now), 1),
+                    "latency_ewma_ms": round(r.latency_ewma * 1000, 1) if r.latency_ewma is not None else None,
+                    "calls": r.calls,
+                    "errors": r.errors,
+                    "rate_limited": r.rate_limited,
+                }
+                for r in self.routes
+            ],
+        }
+
+
+@lru_cache(maxsize=1)
+def get_model_router() -> ModelRouter:
+    return ModelRouter.from_settings()
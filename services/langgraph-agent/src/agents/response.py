@@ -0,0 +1,83 @@
+from typing import Any, Dict, List, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from ..serialization import message_to_dict
+from ..schemas import AskResponse, FinishReason, ResponseMode, ToolTraceEntry
+
+
+def message_text(content: Any) -> str:
+    """Flatten LangChain message content (str or content blocks) to text."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+        )
+    return str(content or "")
+
+
+def final_answer(messages: Sequence[BaseMessage]) -> str:
+    for message in reversed(messages):
+        if isinstance(message, AIMessage):
+            return message_text(message.content)
+    return "No AI response found"
+
+
+def partial_answer(messages: Sequence[BaseMessage]) -> str:
+    """Best answer available when a run was stopped before the model finished."""
+    for message in reversed(messages):
+        if isinstance(message, AIMessage) and message_text(message.content).strip():
+            return message_text(message.content)
+    results = [m for m in messages if isinstance(m, ToolMessage)]
+    if not results:
+        return "The run was stopped before an answer was produced."
+    lines = [f"- {m.name}: {message_text(m.content)}" for m in results]
+    return "The run was stopped before a final answer. Tool results so far:\n" + "\n".join(lines)
+
+
+def current_run(messages: Sequence[BaseMessage]) -> Sequence[BaseMessage]:
+    """Messages produced after the latest user turn."""
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            return messages[i + 1:]
+    return messages
+
+
+def tool_trace(messages: Sequence[BaseMessage]) -> List[ToolTraceEntry]:
+    results = {m.tool_call_id: m for m in messages if isinstance(m, ToolMessage)}
+    trace = []
+    for message in messages:
+        if not isinstance(message, AIMessage):
+            continue
+        for call in message.tool_calls:
+            result = results.get(call.get("id"))
+            trace.append(ToolTraceEntry(
+                id=call.get("id"),
+                name=call["name"],
+                args=call.get("args") or {},
+                output=message_text(result.content) if result is not None else None,
+                status=getattr(result, "status", None) if result is not None else None,
+            ))
+    return trace
+
+
+def tools_used(messages: Sequence[BaseMessage]) -> List[str]:
+    return [m.name for m in current_run(messages) if isinstance(m, ToolMessage) and m.name]
+
+
+def serialize_messages(messages: Sequence[BaseMessage]) -> List[Dict[str, Any]]:
+    return [message_to_dict(m) for m in messages]
+
+
+def shape_response(state: Dict[str, Any], mode: ResponseMode, finish_reason: FinishReason = "stop") -> AskResponse:
+    """Reduce the final graph state to the requested response shape."""
+    messages = state.get("messages", [])
+    content = final_answer(messages) if finish_reason == "stop" else partial_answer(current_run(messages))
+    response = AskResponse(content=content, response_mode=mode, finish_reason=finish_reason)
+    if mode in ("with_tool_trace", "full"):
+        response.tool_trace = tool_trace(current_run(messages))
+    if mode == "full":
+        response.messages = serialize_messages(messages)
+    return response
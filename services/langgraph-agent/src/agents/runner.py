@@ -0,0 +1,94 @@
+import dataclasses
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from langchain_core.tools import BaseTool
+
+from ..admission import admission
+from ..cache.answer_cache import answer_cache
+from ..config.settings import settings
+from ..logger import SAMPLED, setup_logger
+from ..metrics import AGENT_RUNS, MODEL_ESCALATIONS
+from ..schemas import AskResponse, FinishReason, ResponseMode
+from .budget import RunBudget, run_with_budget
+from .fast_path import fast_path
+from .memory import conversation_memory
+from .model_router import get_model_router, with_model_tier
+from .response import shape_response, tools_used
+
+logger = setup_logger("agent-runner")
+
+
+async def run_query(
+    agent,
+    query: str,
+    mode: ResponseMode,
+    client_id: str = "anonymous",
+    budget: Optional[RunBudget] = None,
+    thread_id: Optional[str] = None,
+    tools: Optional[Mapping[str, BaseTool]] = None,
+) -> AskResponse:
+    """
+    Answer one query: answer cache first, then a full agent run. Only the agent
+    run goes through admission control, so cache hits never queue. With a
+    thread_id the run continues that conversation and skips the cache, since
+    the answer depends on earlier turns.
+
+    Stateless queries the fast path can answer with a single call from
+    `tools` (e.g. "what is 17 * 23") skip the agent and admission entirely.
+    """
+    config = {}
+    if thread_id and conversation_memory.enabled:
+        agent = conversation_memory.bind(agent)
+        config = conversation_memory.config(thread_id)
+
+    # "full" returns per-run message state, which is never worth caching
+    cacheable = settings.ANSWER_CACHE_ENABLED and mode != "full" and not config
+    if cacheable:
+        cached = await answer_cache.get(query, mode)
+        if cached is not None:
+            logger.info("Answer cache hit", extra=SAMPLED)
+            return AskResponse(**cached)
+
+    state = None
+    if settings.FAST_PATH_ENABLED and tools and not config:
+        messages = await fast_path.answer(query, tools)
+        if messages is not None:
+            state, finish_reason = {"messages": messages}, "stop"
+
+    if state is None:
+        state, finish_reason = await _run_agent(agent, query, client_id, budget or RunBudget.resolve(), config)
+    response = shape_response(state, mode, finish_reason)
+    response.thread_id = thread_id
+    if config and finish_reason != "stop":
+        await conversation_memory.settle(agent, config, response.content)
+    # Partial answers from exhausted budgets are not worth serving again
+    if cacheable and finish_reason == "stop":
+        await answer_cache.put(query, mode, response.model_dump(exclude_none=True), tools_used(state["messages"]))
+    return response
+
+
+async def _run_agent(
+    agent, query: str, client_id: str, budget: RunBudget, config: Dict[str, Any]
+) -> Tuple[Dict[str, Any], FinishReason]:
+    """
+    One agent run under admission control, on the tier the model router picks.
+    A stateless small-tier run that runs out of steps or tool calls is re-run
+    on the large tier within what is left of the timeout; thread runs are
+    not, as the first attempt is already part of the conversation.
+    """
+    router = get_model_router()
+    tier = router.classify(query)
+    inputs = {"messages": [{"role": "user", "content": query}]}
+    async with admission.admit(client_id):
+        started = time.monotonic()
+        state, finish_reason = await run_with_budget(agent, inputs, budget, with_model_tier(config, tier))
+        remaining = budget.timeout_seconds - (time.monotonic() - started)
+        if not config and router.should_escalate(tier, finish_reason) and remaining > 0:
+            logger.info("Escalating run to the large model after %s", finish_reason, extra=SAMPLED)
+            MODEL_ESCALATIONS.inc()
+            state, finish_reason = await run_with_budget(
+                agent, inputs, dataclasses.replace(budget, timeout_seconds=remaining), with_model_tier(config, "large")
+            )
+    AGENT_RUNS.labels(finish_reason).inc()
+    return state, finish_reason
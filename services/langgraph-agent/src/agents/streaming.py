@@ -0,0 +1,115 @@
+import asyncio
+from contextlib import aclosing
+from typing import Any, AsyncIterator, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langgraph.errors import GraphRecursionError
+
+from ..logger import setup_logger
+from ..metrics import AGENT_RUNS
+from ..serialization import dumps
+from ..tracing import with_tracing
+from .budget import BudgetTracker, RunBudget
+from .memory import SUMMARY_TAG, conversation_memory
+from .model_router import get_model_router, with_model_tier
+from .response import message_text, partial_answer
+
+logger = setup_logger("agent-stream")
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format a single Server-Sent Event frame."""
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+
+def _tool_output(output: Any) -> Any:
+    if isinstance(output, BaseMessage):
+        return message_text(output.content)
+    return output
+
+
+async def stream_agent_events(
+    agent, query: str, budget: Optional[RunBudget] = None, thread_id: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Run the agent and yield SSE frames as the run progresses.
+
+    Events:
+      token       - incremental model output ({"content": str})
+      tool_call   - a tool is about to run ({"id", "name", "input"})
+      tool_result - a tool finished ({"id", "name", "output"})
+      done        - the run finished ({"content": final or partial answer, "finish_reason"})
+      error       - the run failed ({"detail": str})
+    """
+    budget = budget or RunBudget.resolve()
+    tracker = BudgetTracker(budget)
+    run_messages: List[BaseMessage] = []
+    final_content = ""
+    finish_reason = "stop"
+    # No escalation here: the small tier's tokens have already been streamed
+    config = with_model_tier(budget.config(), get_model_router().classify(query))
+    threaded = bool(thread_id) and conversation_memory.enabled
+    if threaded:
+        agent = conversation_memory.bind(agent)
+        config.update(conversation_memory.config(thread_id))
+    events = agent.astream_events(
+        {"messages": [{"role": "user", "content": query}]}, config=with_tracing(config), version="v2"
+    )
+    try:
+        async with aclosing(events):
+            while True:
+                try:
+                    event = await asyncio.wait_for(events.__anext__(), tracker.remaining_seconds())
+                except StopAsyncIteration:
+                    break
+                if SUMMARY_TAG in event.get("tags", ()):
+                    continue
+                kind = event["event"]
+                tracker.observe_step(event.get("metadata", {}).get("langgraph_step", 0))
+                if kind == "on_chat_model_stream":
+                    text = message_text(event["data"]["chunk"].content)
+                    if text:
+                        yield sse_event("token", {"content": text})
+                elif kind == "on_chat_model_end":
+                    output = event["data"].get("output")
+                    if isinstance(output, AIMessage):
+                        run_messages.append(output)
+                        tracker.observe(output)
+                        if not output.tool_calls:
+                            final_content = message_text(output.content)
+                        else:
+                            exhausted = tracker.exhausted()
+                            if exhausted is not None:
+                                finish_reason = exhausted
+                                break
+                elif kind == "on_tool_start":
+                    yield sse_event("tool_call", {
+                        "id": event["run_id"],
+                        "name": event["name"],
+                        "input": event["data"].get("input"),
+                    })
+                elif kind == "on_tool_end":
+                    output = event["data"].get("output")
+                    if isinstance(output, ToolMessage):
+                        run_messages.append(output)
+                    yield sse_event("tool_result", {
+                        "id": event["run_id"],
+                        "name": event["name"],
+                        "output": _tool_output(output),
+                    })
+    except asyncio.TimeoutError:
+        finish_reason = "timeout"
+    except GraphRecursionError:
+        finish_reason = "max_steps"
+    except Exception:
+        logger.exception("Agent stream error")
+        yield sse_event("error", {"detail": "Agent execution failed"})
+        return
+
+    AGENT_RUNS.labels(finish_reason).inc()
+    if finish_reason != "stop":
+        logger.warning("Streaming run stopped on %s budget", finish_reason)
+        final_content = partial_answer(run_messages)
+        if threaded:
+            await conversation_memory.settle(agent, config, final_content)
+    yield sse_event("done", {"content": final_content, "finish_reason": finish_reason})
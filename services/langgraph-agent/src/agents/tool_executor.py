@@ -0,0 +1,102 @@
+import asyncio
+import time
+import weakref
+from typing import Awaitable, Callable, List, Tuple, Union
+
+from langchain_core.messages import ToolMessage
+from langchain_core.tools import BaseTool
+from langgraph.errors import GraphBubbleUp
+from langgraph.prebuilt import ToolNode
+from langgraph.prebuilt.tool_node import ToolCallRequest
+from langgraph.types import Command
+
+from ..config.settings import settings
+from ..logger import setup_logger
+from ..metrics import TOOL_CALLS, TOOL_SECONDS
+from ..timing import record
+
+logger = setup_logger("tool-executor")
+
+ToolResult = Union[ToolMessage, Command]
+
+
+class ParallelToolExecutor:
+    """
+    Tool-call hook for the agent's ToolNode.
+
+    ToolNode already starts every call from one model turn with asyncio.gather;
+    this caps how many of a turn's calls run at once, gives each call its own
+    timeout, and turns any failure into an error ToolMessage for that call so
+    one slow or broken MCP server cannot fail or stall the whole step.
+    """
+
+    def __init__(self, max_parallel: int, timeout: float):
+        self.max_parallel = max_parallel
+        self.timeout = timeout
+        # One semaphore per model turn, keyed by the ids of the turn's tool calls.
+        # Each running call holds its turn's semaphore, so the entry goes away
+        # with the last of them however the others ended (or never started).
+        self._steps: "weakref.WeakValueDictionary[Tuple[str, ...], asyncio.Semaphore]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    def _step_semaphore(self, key: Tuple[str, ...]) -> asyncio.Semaphore:
+        semaphore = self._steps.get(key)
+        if semaphore is None:
+            semaphore = self._steps[key] = asyncio.Semaphore(self.max_parallel)
+        return semaphore
+
+    @staticmethod
+    def _step_key(request: ToolCallRequest) -> Tuple[str, ...]:
+        call_id = request.tool_call.get("id")
+        messages: List = request.state.get("messages", []) if isinstance(request.state, dict) else []
+        for message in reversed(messages):
+            calls = getattr(message, "tool_calls", None)
+            if calls and any(c.get("id") == call_id for c in calls):
+                return tuple(str(c.get("id")) for c in calls)
+        # Not found (e.g. a Send-dispatched call): the call gets a turn of its own
+        return (str(call_id),)
+
+    def _error(self, request: ToolCallRequest, content: str) -> ToolMessage:
+        return ToolMessage(
+            content=content,
+            name=request.tool_call["name"],
+            tool_call_id=request.tool_call["id"],
+            status="error",
+        )
+
+    async def __call__(
+        self,
+        request: ToolCallRequest,
+        execute: Callable[[ToolCallRequest], Awaitable[ToolResult]],
+    ) -> ToolResult:
+        name = request.tool_call["name"]
+        semaphore = self._step_semaphore(self._step_key(request))
+        started = time.perf_counter()
+        status = "error"
+        try:
+            async with semaphore:
+                result = await asyncio.wait_for(execute(request), self.timeout)
+            status = "error" if getattr(result, "status", None) == "error" else "ok"
+            return result
+        except asyncio.TimeoutError:
+            status = "timeout"
+            logger.warning("Tool %s timed out after %.1fs", name, self.timeout)
+            return self._error(request, f"Error: tool {name} timed out after {self.timeout:g}s")
+        except GraphBubbleUp:
+            status = "interrupted"
+            raise
+        except Exception as e:
+            logger.warning("Tool %s failed: %s", name, e)
+            return self._error(request, f"Error: {e}")
+        finally:
+            elapsed = time.perf_counter() - started
+            record("tool", elapsed)
+            TOOL_SECONDS.labels(name).observe(elapsed)
+            TOOL_CALLS.labels(name, status).inc()
+
+
+def build_tool_node(tools: List[BaseTool]) -> ToolNode:
+    """ToolNode that runs a turn's tool calls concurrently with a cap and per-call timeouts."""
+    executor = ParallelToolExecutor(settings.TOOL_MAX_PARALLEL, settings.TOOL_CALL_TIMEOUT_SECONDS)
+    return ToolNode(tools, awrap_tool_call=executor)
@@ -0,0 +1,63 @@
+import hashlib
+import hmac
+import json
+from typing import List
+
+from .config.settings import settings
+from .logger import setup_logger
+
+logger = setup_logger("auth")
+
+# Liveness checks, Prometheus scrapes and API docs need no key. Exact paths:
+# the detailed /health/* routes expose tools and routing state and stay keyed.
+PUBLIC_PATHS = frozenset({"/health", "/metrics", "/docs", "/docs/oauth2-redirect", "/redoc", "/openapi.json"})
+
+_FORBIDDEN_BODY = json.dumps({"detail": "Unauthorized"}).encode()
+_FORBIDDEN_START = {
+    "type": "http.response.start",
+    "status": 403,
+    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(_FORBIDDEN_BODY)).encode())],
+}
+_FORBIDDEN = {"type": "http.response.body", "body": _FORBIDDEN_BODY}
+
+
+def accepted_keys() -> List[bytes]:
+    """SHA-256 digests of INTERNAL_API_KEY plus any keys still valid during a rotation."""
+    keys = [settings.INTERNAL_API_KEY, *settings.INTERNAL_API_KEYS.split(",")]
+    return [hashlib.sha256(k.strip().encode()).digest() for k in keys if k.strip()]
+
+
+class InternalKeyMiddleware:
+    """
+    Pure ASGI check of the gateway's X-INTERNAL-KEY: one constant-time compare
+    per accepted key, done once per request before routing. Rejections are sent
+    from prebuilt messages.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.keys = accepted_keys()
+
+    def _valid(self, key: bytes) -> bool:
+        presented = hashlib.sha256(key).digest()
+        valid = False
+        for digest in self.keys:
+            valid |= hmac.compare_digest(presented, digest)
+        return valid
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in PUBLIC_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        key = b""
+        for name, value in scope["headers"]:
+            if name == b"x-internal-key":
+                key = value
+                break
+        if not self._valid(key):
+            logger.debug("Unauthorized request to %s", scope["path"])
+            await send(_FORBIDDEN_START)
+            await send(_FORBIDDEN)
+            return
+        await self.app(scope, receive, send)
@@ -0,0 +1,332 @@
+import asyncio
+import json
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from ..config.settings import settings
+from ..logger import setup_logger
+from .embedders import Embedder, cosine_similarity, load_embedder
+
+logger = setup_logger("answer-cache")
+
+_TRAILING_PUNCTUATION = re.compile(r"[\s?.!]+$")
+
+
+def normalize_query(query: str) -> str:
+    return _TRAILING_PUNCTUATION.sub("", " ".join(query.split()).casefold())
+
+
+@dataclass
+class CachedAnswer:
+    key: str
+    mode: str
+    response: Dict[str, Any]
+    tools: List[str]
+    expires_at: float
+    embedding: Optional[List[float]] = None
+    # When this worker stops serving the entry from memory (ANSWER_CACHE_LOCAL_TTL_SECONDS)
+    local_expires_at: Optional[float] = None
+
+
+def _expired(entry: CachedAnswer, now: float) -> bool:
+    return (entry.local_expires_at or entry.expires_at) <= now
+
+
+class _DiskTier:
+    """
+    SQLite-backed second tier; calls run in a worker thread. The file can be
+    shared by several worker processes: it is opened in WAL mode on first use,
+    i.e. in the worker, never in a process that forks afterwards.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = asyncio.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                " key TEXT PRIMARY KEY, mode TEXT, response TEXT, tools TEXT, expires_at REAL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, fn, *args):
+        async with self._lock:
+            return await asyncio.to_thread(fn, *args)
+
+    def _get(self, key: str) -> Optional[CachedAnswer]:
+        row = self._connect().execute(
+            "SELECT mode, response, tools, expires_at FROM answers WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        mode, response, tools, expires_at = row
+        return CachedAnswer(key, mode, json.loads(response), json.loads(tools), expires_at)
+
+    def _write(self, sql: str, params: tuple = ()) -> int:
+        conn = self._connect()
+        cursor = conn.execute(sql, params)
+        conn.commit()
+        return cursor.rowcount
+
+    def _put(self, entry: CachedAnswer) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?)",
+            (entry.key, entry.mode, json.dumps(entry.response), json.dumps(entry.tools), entry.expires_at),
+        )
+
+    def _delete(self, key: str) -> None:
+        self._write("DELETE FROM answers WHERE key = ?", (key,))
+
+    def _invalidate_tool(self, tool: str) -> int:
+        return self._write(
+            "DELETE FROM answers WHERE EXISTS (SELECT 1 FROM json_each(answers.tools) WHERE value = ?)",
+            (tool,),
+        )
+
+    def _clear(self) -> None:
+        self._write("DELETE FROM answers")
+
+    async def get(self, key: str) -> Optional[CachedAnswer]:
+        return await self._run(self._get, key)
+
+    async def put(self, entry: CachedAnswer) -> None:
+        await self._run(self._put, entry)
+
+    async def delete(self, key: str) -> None:
+        await self._run(self._delete, key)
+
+    async def invalidate_tool(self, tool: str) -> int:
+        return await self._run(self._invalidate_tool, tool)
+
+    async def clear(self) -> None:
+        await self._run(self._clear)
+
+
+class _RedisTier:
+    """
+    Redis-backed second tier, shared by every worker and replica. Entries
+    expire server-side; a set per tool lists the keys of answers that used it,
+    for invalidation. Needs the optional `redis` package.
+    """
+
+    name = "redis"
+    _PREFIX = "answer-cache:"
+    _TOOL_PREFIX = "answer-cache-tool:"
+
+    def __init__(self, url: str, max_ttl: float):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        # Tool sets outlive every answer they list: no answer's TTL exceeds the default
+        self.max_ttl = max_ttl
+
+    async def get(self, key: str) -> Optional[CachedAnswer]:
+        raw = await self._redis.get(self._PREFIX + key)
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return CachedAnswer(key, data["mode"], data["response"], data["tools"], data["expires_at"])
+
+    async def put(self, entry: CachedAnswer) -> None:
+        ttl_ms = int((entry.expires_at - time.time()) * 1000)
+        if ttl_ms <= 0:
+            return
+        data = {"mode": entry.mode, "response": entry.response, "tools": entry.tools, "expires_at": entry.expires_at}
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.set(self._PREFIX + entry.key, json.dumps(data), px=ttl_ms)
+            for tool in entry.tools:
+                pipe.sadd(self._TOOL_PREFIX + tool, entry.key)
+                pipe.expire(self._TOOL_PREFIX + tool, int(self.max_ttl) + 1)
+            await pipe.execute()
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(self._PREFIX + key)
+
+    async def invalidate_tool(self, tool: str) -> int:
+        keys = await self._redis.smembers(self._TOOL_PREFIX + tool)
+        removed = 0
+        if keys:
+            removed = await self._redis.delete(*(self._PREFIX + k.decode() for k in keys))
+        await self._redis.delete(self._TOOL_PREFIX + tool)
+        return removed
+
+    async def clear(self) -> None:
+        batch = []
+        async for key in self._redis.scan_iter(match="answer-cache*", count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                await self._redis.delete(*batch)
+                batch = []
+        if batch:
+            await self._redis.delete(*batch)
+
+
+class AnswerCache:
+    """
+    Caches shaped agent answers by normalized query.
+
+    Lookup order: exact match in the LRU memory tier, then the optional shared
+    tier (SQLite or Redis, common to all workers), then (if an embedder is configured) the most similar cached query in
+    memory above ANSWER_CACHE_SIMILARITY_THRESHOLD. An answer's TTL is capped by
+    the TTLs configured for the tools it used, so weather answers expire quickly.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        default_ttl: float,
+        tool_ttls: Dict[str, float],
+        shared: Optional[Union[_DiskTier, _RedisTier]] = None,
+        embedder: Optional[Embedder] = None,
+        similarity_threshold: float = 0.92,
+        local_ttl: float = 0.0,
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.tool_ttls = tool_ttls
+        self.similarity_threshold = similarity_threshold
+        self.local_ttl = local_ttl
+        self._embedder = embedder
+        self._memory: "OrderedDict[str, CachedAnswer]" = OrderedDict()
+        self._shared = shared
+
+        self.hits_exact = 0
+        self.hits_shared = 0
+        self.hits_semantic = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(query: str, mode: str) -> str:
+        return f"{mode}:{normalize_query(query)}"
+
+    def ttl_for(self, tools: Iterable[str]) -> float:
+        return min([self.default_ttl] + [self.tool_ttls[t] for t in tools if t in self.tool_ttls])
+
+    def _remember(self, entry: CachedAnswer) -> None:
+        if self.local_ttl > 0:
+            entry.local_expires_at = min(entry.expires_at, time.time() + self.local_ttl)
+        self._memory[entry.key] = entry
+        self._memory.move_to_end(entry.key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, query: str, mode: str) -> Optional[Dict[str, Any]]:
+        key = self._key(query, mode)
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None and _expired(entry, now):
+            del self._memory[key]
+            entry = None
+        if entry is not None:
+            self._memory.move_to_end(key)
+            self.hits_exact += 1
+            return entry.response
+
+        if self._shared is not None:
+            entry = await self._shared.get(key)
+            if entry is not None and entry.expires_at <= now:
+                await self._shared.delete(key)
+                entry = None
+            if entry is not None:
+                if self._embedder is not None:
+                    entry.embedding = self._embedder.embed(normalize_query(query))
+                self._remember(entry)
+                self.hits_shared += 1
+                return entry.response
+
+        if self._embedder is not None:
+            match = self._most_similar(query, mode, now)
+            if match is not None:
+                self._memory.move_to_end(match.key)
+                self.hits_semantic += 1
+                return match.response
+
+        self.misses += 1
+        return None
+
+    def _most_similar(self, query: str, mode: str, now: float) -> Optional[CachedAnswer]:
+        vector = self._embedder.embed(normalize_query(query))
+        best, best_score = None, self.similarity_threshold
+        for entry in self._memory.values():
+            if entry.mode != mode or entry.embedding is None or _expired(entry, now):
+                continue
+            score = cosine_similarity(vector, entry.embedding)
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+    async def put(self, query: str, mode: str, response: Dict[str, Any], tools: Iterable[str]) -> None:
+        tools = sorted(set(tools))
+        ttl = self.ttl_for(tools)
+        if ttl <= 0:
+            return
+        key = self._key(query, mode)
+        embedding = self._embedder.embed(normalize_query(query)) if self._embedder else None
+        entry = CachedAnswer(key, mode, response, tools, time.time() + ttl, embedding)
+        self._remember(entry)
+        if self._shared is not None:
+            await self._shared.put(entry)
+
+    async def invalidate_tool(self, tool: str) -> int:
+        """Drop every cached answer that was produced using `tool`."""
+        keys = [k for k, e in self._memory.items() if tool in e.tools]
+        for key in keys:
+            del self._memory[key]
+        removed = len(keys)
+        if self._shared is not None:
+            removed = max(removed, await self._shared.invalidate_tool(tool))
+        logger.info("Invalidated %d cached answers that used %s", removed, tool)
+        return removed
+
+    async def clear(self) -> None:
+        self._memory.clear()
+        if self._shared is not None:
+            await self._shared.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.hits_exact + self.hits_shared + self.hits_semantic
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "shared_tier": self._shared.name if self._shared is not None else None,
+            "semantic": self._embedder is not None,
+            "hits_exact": self.hits_exact,
+            "hits_shared": self.hits_shared,
+            "hits_semantic": self.hits_semantic,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _shared_tier() -> Optional[Union[_DiskTier, _RedisTier]]:
+    if settings.ANSWER_CACHE_REDIS_URL:
+        return _RedisTier(settings.ANSWER_CACHE_REDIS_URL, settings.ANSWER_CACHE_TTL_SECONDS)
+    if settings.ANSWER_CACHE_DISK_PATH:
+        return _DiskTier(settings.ANSWER_CACHE_DISK_PATH)
+    return None
+
+
+answer_cache = AnswerCache(
+    max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+    default_ttl=settings.ANSWER_CACHE_TTL_SECONDS,
+    tool_ttls=settings.answer_cache_tool_ttls,
+    shared=_shared_tier(),
+    embedder=load_embedder(settings.ANSWER_CACHE_EMBEDDER),
+    similarity_threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+    local_ttl=settings.ANSWER_CACHE_LOCAL_TTL_SECONDS,
+)
@@ -0,0 +1,53 @@
+import hashlib
+import importlib
+import math
+import re
+from typing import List, Optional, Protocol
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class Embedder(Protocol):
+    """Local text embedder used for similarity lookups. Vectors should be L2-normalized."""
+
+    def embed(self, text: str) -> List[float]:
+        ...
+
+
+class HashingEmbedder:
+    """
+    Dependency-free bag-of-words embedder (feature hashing over unigrams and
+    bigrams). Good at catching rephrasings that reuse the same words; swap in a
+    real sentence-embedding model for paraphrase-level matching.
+    """
+
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+
+    def _index(self, feature: str) -> int:
+        digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") % self.dimensions
+
+    def embed(self, text: str) -> List[float]:
+        tokens = _TOKEN_RE.findall(text.casefold())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        vector = [0.0] * self.dimensions
+        for feature in features:
+            vector[self._index(feature)] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector))
+        return [v / norm for v in vector] if norm else vector
+
+
+def cosine_similarity(a: List[float], b: List[float]) -> float:
+    # Embedders return normalized vectors, so the dot product is the cosine
+    return sum(x * y for x, y in zip(a, b))
+
+
+def load_embedder(spec: Optional[str]) -> Optional[Embedder]:
+    """Resolve an embedder from config: None, "hashing" or "package.module:ClassName"."""
+    if not spec:
+        return None
+    if spec == "hashing":
+        return HashingEmbedder()
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
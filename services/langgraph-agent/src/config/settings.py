@@ -1,18 +1,144 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 class Settings(BaseSettings):
     INTERNAL_API_KEY: str
+    # Comma-separated keys also accepted, e.g. the previous key during a rotation
+    INTERNAL_API_KEYS: str = ""
     GROQ_API_KEY: str
     LOG_LEVEL: str = "INFO"
+    # Logging: "text" or "json"; SAMPLED per-request lines are kept at LOG_SAMPLE_RATIO
+    LOG_FORMAT: str = "text"
+    LOG_SAMPLE_RATIO: float = 1.0
+    LOG_QUEUE_SIZE: int = 10000
     MCP_TOOL_CONFIG: str = Field(..., env="MCP_TOOL_CONFIG")
 
+    # "groq", or "fake" for a scripted offline model (benchmarks and load tests)
+    LLM_PROVIDER: str = "groq"
+    FAKE_LLM_LATENCY_MS: float = 50.0
+    # JSON file of tool-call rules; defaults to agents/fake_model.py::DEFAULT_SCRIPT
+    FAKE_LLM_SCRIPT: Optional[str] = None
+    # Share of fake model calls failing with a simulated 429 (model failover tests)
+    FAKE_LLM_RATE_LIMIT_RATIO: float = 0.0
+
+    # Model routing: each run is classified "small" or "large" and served by
+    # that tier's routes, with the other tier as fallback. MODEL_ROUTES is a
+    # JSON list of {"name", "tier", "provider": "groq" | "fake" |
+    # "package.module:ChatClass", "model", "params": {...}}; empty means a
+    # small and a large model for LLM_PROVIDER.
+    MODEL_ROUTES: str = ""
+    MODEL_ROUTER_ENABLED: bool = True
+    # None for the heuristics below, or "package.module:Class" with classify(query)
+    MODEL_ROUTER_CLASSIFIER: Optional[str] = None
+    MODEL_ROUTER_SIMPLE_MAX_CHARS: int = 160
+    MODEL_ROUTER_COMPLEX_PATTERN: str = (
+        r"\b(why|explain|compare|analy[sz]e|plan|step[- ]by[- ]step|prove|derive|"
+        r"summari[sz]e|pros and cons|trade-?offs?|recommend)\b"
+    )
+    # Re-run small-tier runs that hit max_steps/max_tool_calls on the large tier
+    MODEL_ROUTER_ESCALATE: bool = True
+    # How long a failing route is tried last: after a 429 without Retry-After, and after other errors
+    MODEL_ROUTER_COOLDOWN_SECONDS: float = 30.0
+    MODEL_ROUTER_ERROR_COOLDOWN_SECONDS: float = 5.0
+
+    # Tool registry: background MCP tool discovery
+    MCP_REFRESH_INTERVAL_SECONDS: float = 30.0
+    MCP_DISCOVERY_TIMEOUT: float = 10.0
+    MCP_UNHEALTHY_THRESHOLD: int = 2
+
+    # Persistent MCP sessions (stdio servers always use a single session)
+    MCP_PERSISTENT_SESSIONS: bool = True
+    MCP_SESSION_POOL_SIZE: int = 4
+    MCP_SESSION_RETRIES: int = 1
+
+    # Answer cache in front of the agent
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_TTL_SECONDS: float = 3600.0
+    ANSWER_CACHE_MAX_ENTRIES: int = 1000
+    # Per-tool TTL caps for answers that used time-sensitive tools; 0 disables caching
+    ANSWER_CACHE_TOOL_TTLS: str = '{"get_weather": 300, "get_weather_many": 300}'
+    # Optional second tier shared by all workers: SQLite file or Redis (URL wins)
+    ANSWER_CACHE_DISK_PATH: Optional[str] = None
+    ANSWER_CACHE_REDIS_URL: Optional[str] = None
+    # Caps how long a worker serves an answer from its own memory tier (0 = full
+    # TTL), bounding staleness after another worker handles DELETE /cache
+    ANSWER_CACHE_LOCAL_TTL_SECONDS: float = 0.0
+    # Optional similarity lookup: "hashing" or "package.module:EmbedderClass"
+    ANSWER_CACHE_EMBEDDER: Optional[str] = None
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.92
+
+    # Batched /ask/batch
+    BATCH_MAX_QUERIES: int = 100
+    BATCH_MAX_CONCURRENCY: int = 4
+
+    # Tool calls from one model turn run concurrently, at most TOOL_MAX_PARALLEL at a time
+    TOOL_MAX_PARALLEL: int = 4
+    TOOL_CALL_TIMEOUT_SECONDS: float = 20.0
+
+    # Answer pure arithmetic and "weather in <city>" queries with a direct tool
+    # call and a templated answer, skipping the LLM. FAST_PATH_RULES adds rules
+    # from a JSON file (see agents/fast_path.py::load_rules)
+    FAST_PATH_ENABLED: bool = True
+    FAST_PATH_RULES: Optional[str] = None
+
+    # Bind only the TOOL_SELECTION_TOP_K tools most relevant to the query (plus
+    # any the conversation already used) instead of every discovered tool.
+    # Keyword scoring by default; TOOL_SELECTION_EMBEDDER takes "hashing" or
+    # "package.module:Class" like ANSWER_CACHE_EMBEDDER
+    TOOL_SELECTION_ENABLED: bool = True
+    TOOL_SELECTION_TOP_K: int = 6
+    TOOL_SELECTION_EMBEDDER: Optional[str] = None
+    TOOL_SELECTION_MIN_SIMILARITY: float = 0.1
+
+    # Conversation memory for thread_id requests: "sqlite", "redis", "memory"
+    # (single worker only), "none" or "package.module:factory" returning a
+    # LangGraph checkpointer
+    MEMORY_BACKEND: str = "sqlite"
+    MEMORY_SQLITE_PATH: str = "checkpoints.sqlite"
+    MEMORY_REDIS_URL: str = "redis://localhost:6379"
+    # History past MEMORY_MAX_TOKENS is folded into a summary, keeping about
+    # MEMORY_KEEP_TOKENS of recent turns verbatim
+    MEMORY_MAX_TOKENS: int = 3000
+    MEMORY_KEEP_TOKENS: int = 1000
+    MEMORY_THREAD_TTL_SECONDS: float = 86400.0
+    MEMORY_PRUNE_INTERVAL_SECONDS: float = 600.0
+
+    # Per-run budgets (requests may tighten these, never raise them). Keep the
+    # timeout below ADMISSION_RUN_TIMEOUT_SECONDS so runs end with a partial answer.
+    # Each model turn takes two graph steps plus one per tool round
+    AGENT_MAX_STEPS: int = 18
+    AGENT_MAX_TOOL_CALLS: int = 8
+    AGENT_MAX_TOKENS: int = 20000
+    AGENT_RUN_TIMEOUT_SECONDS: float = 60.0
+
+    # Worker processes serving the agent (gunicorn -c gunicorn.conf.py and
+    # uvicorn --workers read it too). ADMISSION_MAX_CONCURRENCY is for the
+    # whole service and is split evenly across workers; queue limits are per worker.
+    WEB_CONCURRENCY: int = 1
+
+    # Admission control for agent runs
+    ADMISSION_MAX_CONCURRENCY: int = 8
+    ADMISSION_MAX_QUEUE: int = 32
+    ADMISSION_MAX_QUEUE_PER_CLIENT: int = 8
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 15.0
+    ADMISSION_RUN_TIMEOUT_SECONDS: float = 90.0
+
+    # Tracing (OpenTelemetry). Exporters: console | file (JSON lines) | otlp
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "console"
+    TRACING_FILE: str = "traces.jsonl"
+    TRACING_SAMPLE_RATIO: float = 1.0
+
     @property
     def mcp_tool_config(self) -> Dict[str, Any]:
         return json.loads(self.MCP_TOOL_CONFIG)
 
+    @property
+    def answer_cache_tool_ttls(self) -> Dict[str, float]:
+        return json.loads(self.ANSWER_CACHE_TOOL_TTLS)
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,6 @@
+from fastapi import Request
+
+
+def client_id(req: Request) -> str:
+    """Caller identity used for fair-share admission, forwarded by the gateway."""
+    return req.headers.get("X-Client-Id") or "anonymous"
@@ -2,6 +2,7 @@ from fastapi import Request
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from .admission import AdmissionError
 from .logger import setup_logger
 
 logger = setup_logger("exceptions")
@@ -9,12 +10,16 @@ logger = setup_logger("exceptions")
 def register_exception_handlers(app):
     @app.exception_handler(StarletteHTTPException)
     async def http_exc(request: Request, exc: StarletteHTTPException):
-        logger.error(f"HTTP error: {exc.detail}")
-        return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+        logger.error("HTTP error: %s", exc.detail)
+        return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers=exc.headers)
+
+    @app.exception_handler(AdmissionError)
+    async def admission_exc(request: Request, exc: AdmissionError):
+        return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers=exc.headers)
 
     @app.exception_handler(RequestValidationError)
     async def validation_exc(request: Request, exc: RequestValidationError):
-        logger.error(f"Validation error: {exc.errors()}")
+        logger.error("Validation error: %s", exc.errors())
         return JSONResponse(status_code=422, content={"detail": exc.errors()})
 
     @app.exception_handler(Exception)
@@ -1,12 +1,163 @@
+import atexit
+import json
 import logging
+import os
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
 from .config.settings import settings
 
+# Correlation id of the request being handled, added to every log line
+request_id: ContextVar[str] = ContextVar("request_id", default="-")
+
+# Pass as extra= on high-volume lines; only LOG_SAMPLE_RATIO of them are kept
+SAMPLED = {"sampled": True}
+
+TEXT_FORMAT = "[%(asctime)s] %(levelname)s %(name)s [%(request_id)s]: %(message)s"
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": record.request_id,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Runs in the logging thread before a record is queued: drops the unsampled
+    share of SAMPLED records and captures the request id, which the writer
+    thread cannot see.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "sampled", False) and random.random() >= settings.LOG_SAMPLE_RATIO:
+            return False
+        record.request_id = request_id.get()
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread without formatting them. Only the
+    message arguments are merged here, so objects mutated after the call are
+    logged as they were; JSON encoding, tracebacks and the write itself happen
+    off the event loop. When the queue is full records are dropped and counted.
+    """
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
+
+
+_handler: Optional[NonBlockingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def _queue_handler() -> NonBlockingQueueHandler:
+    """The process-wide handler, started on first use with one writer thread."""
+    global _handler, _listener
+    if _handler is None:
+        records: queue.Queue = queue.Queue(settings.LOG_QUEUE_SIZE)
+        stream = logging.StreamHandler(sys.stderr)
+        if settings.LOG_FORMAT.lower() == "json":
+            stream.setFormatter(JSONFormatter())
+        else:
+            stream.setFormatter(logging.Formatter(TEXT_FORMAT))
+        _handler = NonBlockingQueueHandler(records)
+        _handler.addFilter(ContextFilter())
+        _listener = QueueListener(records, stream, respect_handler_level=False)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        os.register_at_fork(after_in_child=_restart_in_child)
+    return _handler
+
+
+def _restart_in_child() -> None:
+    """
+    A forked worker (e.g. gunicorn with preload_app) inherits the handler but
+    not the writer thread; give it a fresh queue and writer of its own.
+    """
+    global _listener
+    if _listener is None:
+        return
+    records: queue.Queue = queue.Queue(settings.LOG_QUEUE_SIZE)
+    _handler.queue = records
+    _listener = QueueListener(records, *_listener.handlers, respect_handler_level=False)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        listener, _listener = _listener, None
+        listener.stop()
+
+
 def setup_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
-    logger.setLevel(settings.LOG_LEVEL.upper())
+    level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
+    logger.setLevel(level)
+
     if not logger.handlers:
-        h = logging.StreamHandler()
-        fmt = logging.Formatter('[%(asctime)s] %(levelname)s %(name)s: %(message)s')
-        h.setFormatter(fmt)
-        logger.addHandler(h)
+        logger.addHandler(_queue_handler())
+
     return logger
+
+
+class RequestIdMiddleware:
+    """
+    Pure ASGI middleware binding `request_id` for each HTTP request: the
+    caller's X-Request-ID if sent, otherwise a new one. It is echoed in the
+    response so clients can quote it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rid = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                rid = value.decode("latin-1")[:128]
+                break
+        rid = rid or uuid.uuid4().hex
+        token = request_id.set(rid)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-request-id", rid.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id.reset(token)
@@ -1,15 +1,35 @@
 from fastapi import FastAPI
 from .routes.ask import router as ask_router
+from .routes.cache import router as cache_router
+from .routes.metrics import router as metrics_router
+from .auth import InternalKeyMiddleware
 from .exceptions import register_exception_handlers
-from .logger import setup_logger
+from .logger import SAMPLED, RequestIdMiddleware, setup_logger, shutdown_logging
+from .metrics import MetricsMiddleware
+from .timing import ServerTimingMiddleware
+from .tracing import TracingMiddleware, setup_tracing, shutdown_tracing
 
 logger = setup_logger("langgraph-agent")
+setup_tracing("langgraph-agent")
 app = FastAPI(title="LangGraph Agent")
+app.add_middleware(InternalKeyMiddleware)
+app.add_middleware(ServerTimingMiddleware, name="agent")
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+# Outermost, so every log line of a request carries the gateway's request id
+app.add_middleware(RequestIdMiddleware)
 
 app.include_router(ask_router)
+app.include_router(cache_router)
+app.include_router(metrics_router)
 register_exception_handlers(app)
 
+@app.on_event("shutdown")
+async def shutdown():
+    shutdown_tracing()
+    shutdown_logging()
+
 @app.get("/health")
 async def health():
-    logger.info("Health check OK")
+    logger.info("Health check OK", extra=SAMPLED)
     return {"status": "ok"}
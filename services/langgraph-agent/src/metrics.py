@@ -0,0 +1,156 @@
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import REGISTRY, CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+# Agent runs take seconds, not milliseconds; buckets reach the admission deadline
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+# Summed over live workers when running under gunicorn (PROMETHEUS_MULTIPROC_DIR)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being handled", multiprocess_mode="livesum")
+LLM_SECONDS = Histogram("llm_request_duration_seconds", "Chat model call latency", ["model"], buckets=LATENCY_BUCKETS)
+LLM_TOKENS = Counter("llm_tokens", "Tokens used by chat model calls", ["model", "type"])
+LLM_ERRORS = Counter("llm_errors", "Failed chat model calls", ["model"])
+TOOL_SECONDS = Histogram("tool_call_duration_seconds", "Tool call latency", ["tool"], buckets=LATENCY_BUCKETS)
+TOOL_CALLS = Counter("tool_calls", "Tool calls by outcome (ok, error, timeout)", ["tool", "status"])
+AGENT_RUNS = Counter("agent_runs", "Agent runs by finish reason", ["finish_reason"])
+TOOLS_BOUND = Histogram(
+    "agent_tools_bound", "Tools offered to the model per call after tool selection",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+FAST_PATH = Counter(
+    "agent_fast_path", "Queries matched by a fast-path rule, by outcome (answered, fallthrough, no_tool)",
+    ["rule", "outcome"],
+)
+MODEL_ROUTED_RUNS = Counter("model_router_runs", "Agent runs by routed model tier", ["tier"])
+MODEL_ESCALATIONS = Counter(
+    "model_router_escalations", "Small-tier runs retried on the large tier after running out of steps"
+)
+MODEL_COOLDOWNS = Counter("model_router_cooldowns", "Model routes deprioritized after an error", ["route", "reason"])
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency (labelled with the route
+    template, not the raw path, to keep cardinality bounded) and in-flight count.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(time.perf_counter() - started)
+
+
+class LLMMetricsHandler(AsyncCallbackHandler):
+    """Callback handler recording chat model latency, token usage and errors per model."""
+
+    def __init__(self):
+        self._started: Dict[UUID, tuple] = {}
+
+    async def on_chat_model_start(
+        self, serialized: Any, messages: Any, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> None:
+        metadata = metadata or {}
+        model = (
+            metadata.get("ls_model_name") or metadata.get("model_route") or (serialized or {}).get("name") or "unknown"
+        )
+        self._started[run_id] = (model, time.perf_counter())
+
+    async def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        model, started = self._started.pop(run_id, ("unknown", None))
+        if started is not None:
+            LLM_SECONDS.labels(model).observe(time.perf_counter() - started)
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                if usage:
+                    LLM_TOKENS.labels(model, "input").inc(usage.get("input_tokens", 0))
+                    LLM_TOKENS.labels(model, "output").inc(usage.get("output_tokens", 0))
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        model, _ = self._started.pop(run_id, ("unknown", None))
+        LLM_ERRORS.labels(model).inc()
+
+
+llm_metrics = LLMMetricsHandler()
+
+
+class StatsCollector(Collector):
+    """
+    Exposes the numeric fields of a component's stats() dict, read only at
+    scrape time. Fields named in `counters` become counters, the rest gauges;
+    nested and non-numeric fields are skipped.
+    """
+
+    def __init__(self, prefix: str, stats: Callable[[], Dict[str, Any]], counters: Iterable[str] = ()):
+        self.prefix = prefix
+        self.stats = stats
+        self.counters = set(counters)
+
+    def collect(self):
+        for name, value in self.stats().items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            metric = f"{self.prefix}_{name}"
+            if name in self.counters:
+                yield CounterMetricFamily(metric, f"{self.prefix} {name}", value=value)
+            else:
+                yield GaugeMetricFamily(metric, f"{self.prefix} {name}", value=value)
+
+
+# Collectors reading in-process state; never merged across workers
+_local_collectors: List[Collector] = []
+
+
+def register_collector(collector: Collector) -> None:
+    REGISTRY.register(collector)
+    _local_collectors.append(collector)
+
+
+def register_stats(prefix: str, stats: Callable[[], Dict[str, Any]], counters: Iterable[str] = ()) -> None:
+    register_collector(StatsCollector(prefix, stats, counters))
+
+
+def latest() -> bytes:
+    """
+    Exposition for /metrics. With several workers (PROMETHEUS_MULTIPROC_DIR
+    set, see gunicorn.conf.py) the metrics above are merged across all
+    workers, while stats collectors report the worker that took the scrape.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return generate_latest()
+    from prometheus_client import multiprocess
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    for collector in _local_collectors:
+        registry.register(collector)
+    return generate_latest(registry)
@@ -1,34 +1,163 @@
-from fastapi import APIRouter, Request, HTTPException, Depends
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from ..config.settings import settings
 from ..tools.mcp_client import MCPClient
+from ..tools.registry import ToolRegistry
 from ..agents.chain_agent import build_agent
-from ..logger import setup_logger
+from ..agents.streaming import sse_event, stream_agent_events
+from ..agents.runner import run_query
+from ..agents.budget import RunBudget
+from ..agents.memory import conversation_memory
+from ..agents.model_router import get_model_router
+from ..schemas import AskRequest, AskResponse, BatchAskRequest, BatchAskResponse, BatchItemResult
+from ..admission import AdmissionError, admission
+from ..dependencies import client_id
+from ..logger import SAMPLED, setup_logger
+from ..serialization import ORJSONResponse, dumps
 
 router = APIRouter()
 logger = setup_logger("ask-route")
 mcp_client = MCPClient()
-agent = None
+registry = ToolRegistry(mcp_client, build_agent)
 
 @router.on_event("startup")
 async def startup():
-    await mcp_client.init()
-    global agent
-    agent = await build_agent(mcp_client.client)
-    logger.info("LangGraph agent initialized with tools %s", settings.mcp_tool_config)
-
-@router.post("/ask")
-async def ask(req: Request):
-    if req.headers.get("X-INTERNAL-KEY") != settings.INTERNAL_API_KEY:
-        logger.warning("Unauthorized attempt")
-        raise HTTPException(status_code=403, detail="Unauthorized")
-
-    payload = await req.json()
-    query = payload.get("query")
-    logger.info("Received query: %s", query)
+    await conversation_memory.start()
+    await registry.start()
+    logger.info("LangGraph agent initialized with tools %s", [t.name for t in registry.tools])
+
+@router.on_event("shutdown")
+async def shutdown():
+    await registry.stop()
+    await mcp_client.close()
+    await conversation_memory.stop()
+
+@router.post(
+    "/ask",
+    response_model=AskResponse,
+    response_model_exclude_none=True,
+)
+async def ask(payload: AskRequest, client: str = Depends(client_id)):
+    logger.info("Received query (%d chars)", len(payload.query), extra=SAMPLED)
     try:
-        resp = await agent.ainvoke({"messages": [{"role": "user", "content": query}]})
-        logger.info("Agent responded")
-        return {"response": resp}
+        response = await run_query(
+            registry.agent,
+            payload.query,
+            payload.response_mode,
+            client,
+            RunBudget.resolve(payload.budget),
+            payload.thread_id,
+            registry.tools_by_name,
+        )
+        logger.info("Agent responded", extra=SAMPLED)
+        return ORJSONResponse(response)
+    except AdmissionError:
+        raise
     except Exception as e:
         logger.exception("Agent error")
         raise HTTPException(status_code=500, detail="Agent execution failed")
+
+@router.post("/ask/stream")
+async def ask_stream(payload: AskRequest, client: str = Depends(client_id)):
+    logger.info("Received streaming query (%d chars)", len(payload.query), extra=SAMPLED)
+    # Reject with a real status code while we still can; the slot itself is
+    # taken inside the stream so it is always released with the generator
+    admission.check(client)
+    return StreamingResponse(
+        admitted_stream(registry.agent, payload.query, client, RunBudget.resolve(payload.budget), payload.thread_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post(
+    "/ask/batch",
+    response_model=BatchAskResponse,
+    response_model_exclude_none=True,
+)
+async def ask_batch(payload: BatchAskRequest, client: str = Depends(client_id)):
+    """
+    Run N queries through the agent with bounded concurrency.
+
+    Results come back in request order, or with stream=true as NDJSON lines
+    in completion order (each line carries its request index).
+    """
+    if len(payload.queries) > settings.BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BATCH_MAX_QUERIES} queries per batch")
+
+    concurrency = min(payload.max_concurrency or settings.BATCH_MAX_CONCURRENCY, settings.BATCH_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(concurrency)
+    agent, tools = registry.agent, registry.tools_by_name
+    budget = RunBudget.resolve(payload.budget)
+    logger.info("Received batch of %d queries (concurrency %d)", len(payload.queries), concurrency, extra=SAMPLED)
+
+    async def run_one(index: int, query: str) -> BatchItemResult:
+        async with semaphore:
+            try:
+                return BatchItemResult(index=index, response=await run_query(
+                    agent, query, payload.response_mode, client, budget, tools=tools
+                ))
+            except AdmissionError as e:
+                return BatchItemResult(index=index, error=e.detail)
+            except Exception:
+                logger.exception("Agent error in batch item %d", index)
+                return BatchItemResult(index=index, error="Agent execution failed")
+
+    tasks = [asyncio.create_task(run_one(i, q)) for i, q in enumerate(payload.queries)]
+
+    if not payload.stream:
+        return ORJSONResponse(BatchAskResponse(results=await asyncio.gather(*tasks)))
+
+    async def stream_results():
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                yield dumps(item) + b"\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+async def admitted_stream(agent, query: str, client: str, budget: RunBudget, thread_id: Optional[str] = None):
+    """stream_agent_events under an admission slot and the run deadline."""
+    try:
+        await admission.acquire(client)
+    except AdmissionError as e:
+        yield sse_event("error", {"detail": e.detail})
+        return
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + admission.run_timeout
+    events = stream_agent_events(agent, query, budget, thread_id)
+    try:
+        while True:
+            try:
+                frame = await asyncio.wait_for(events.__anext__(), deadline - loop.time())
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                admission.run_timeouts += 1
+                logger.warning("Streaming run for %s exceeded its deadline", client)
+                yield sse_event("error", {"detail": "Agent run exceeded its deadline"})
+                break
+            yield frame
+    finally:
+        await events.aclose()
+        admission.release(client)
+
+@router.get("/health/tools")
+async def tools_health():
+    return registry.status()
+
+@router.get("/health/admission")
+async def admission_health():
+    return admission.stats()
+
+@router.get("/health/models")
+async def models_health():
+    return get_model_router().stats()
+
+@router.get("/health/memory")
+async def memory_health():
+    return conversation_memory.stats()
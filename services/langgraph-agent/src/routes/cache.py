@@ -0,0 +1,17 @@
+from typing import Optional
+from fastapi import APIRouter
+from ..cache.answer_cache import answer_cache
+
+router = APIRouter(prefix="/cache")
+
+@router.get("/stats")
+async def cache_stats():
+    return answer_cache.stats()
+
+@router.delete("")
+async def invalidate_cache(tool: Optional[str] = None):
+    """Drop answers that used `tool`, or everything when no tool is given."""
+    if tool is None:
+        await answer_cache.clear()
+        return {"invalidated": "all"}
+    return {"invalidated": await answer_cache.invalidate_tool(tool)}
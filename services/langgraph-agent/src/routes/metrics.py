@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from ..admission import admission
+from ..agents.memory import conversation_memory
+from ..cache.answer_cache import answer_cache
+from ..metrics import latest, register_collector, register_stats
+from ..tools.registry import ToolRegistry
+from .ask import registry
+
+router = APIRouter()
+
+
+class ToolServerCollector(Collector):
+    """Per-MCP-server health and tool counts from the tool registry."""
+
+    def __init__(self, tool_registry: ToolRegistry):
+        self.tool_registry = tool_registry
+
+    def collect(self):
+        up = GaugeMetricFamily("mcp_server_up", "1 if the MCP server is serving tools", labels=["server"])
+        tools = GaugeMetricFamily("mcp_server_tools", "Tools offered by the MCP server", labels=["server"])
+        for name, health in self.tool_registry.health.items():
+            up.add_metric([name], 1 if health.status in ("healthy", "degraded") else 0)
+            tools.add_metric([name], len(health.tools))
+        yield up
+        yield tools
+
+
+register_stats(
+    "agent_admission", admission.stats,
+    counters=["admitted", "rejected_queue_full", "rejected_client_limit", "queue_timeouts", "run_timeouts"],
+)
+register_stats("agent_answer_cache", answer_cache.stats, counters=["hits_exact", "hits_shared", "hits_semantic", "misses"])
+register_stats("agent_memory", conversation_memory.stats, counters=["pruned"])
+register_collector(ToolServerCollector(registry))
+
+
+@router.get("/metrics")
+async def metrics():
+    return Response(latest(), media_type=CONTENT_TYPE_LATEST)
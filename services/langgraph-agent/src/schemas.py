@@ -0,0 +1,65 @@
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+# final_only      - just the final AI answer
+# with_tool_trace - final answer plus the tool calls (and their outputs) made for it
+# full            - final answer plus the complete serialized message state
+ResponseMode = Literal["final_only", "with_tool_trace", "full"]
+
+# Why a run ended: "stop" is a normal final answer, the rest are exhausted budgets
+FinishReason = Literal["stop", "max_steps", "max_tool_calls", "max_tokens", "timeout"]
+
+
+class BudgetOverrides(BaseModel):
+    """Per-request run budgets; each can only tighten the configured default."""
+    max_steps: Optional[int] = Field(default=None, ge=1)
+    max_tool_calls: Optional[int] = Field(default=None, ge=0)
+    max_tokens: Optional[int] = Field(default=None, ge=1)
+    timeout_seconds: Optional[float] = Field(default=None, gt=0)
+
+
+class AskRequest(BaseModel):
+    query: str
+    response_mode: ResponseMode = "final_only"
+    budget: Optional[BudgetOverrides] = None
+    # Continue this conversation; omit for a stateless one-off query
+    thread_id: Optional[str] = Field(default=None, min_length=1, max_length=128)
+
+
+class ToolTraceEntry(BaseModel):
+    id: Optional[str] = None
+    name: str
+    args: Dict[str, Any] = Field(default_factory=dict)
+    output: Optional[str] = None
+    status: Optional[str] = None
+
+
+class AskResponse(BaseModel):
+    content: str
+    response_mode: ResponseMode
+    finish_reason: FinishReason = "stop"
+    thread_id: Optional[str] = None
+    tool_trace: Optional[List[ToolTraceEntry]] = None
+    messages: Optional[List[Dict[str, Any]]] = None
+
+
+class BatchAskRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1)
+    response_mode: ResponseMode = "final_only"
+    # Applied to every query in the batch
+    budget: Optional[BudgetOverrides] = None
+    # Capped at BATCH_MAX_CONCURRENCY
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+    # Stream NDJSON results as they complete instead of returning them in order
+    stream: bool = False
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    response: Optional[AskResponse] = None
+    error: Optional[str] = None
+
+
+class BatchAskResponse(BaseModel):
+    results: List[BatchItemResult]
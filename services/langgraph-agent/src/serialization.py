@@ -0,0 +1,42 @@
+from typing import Any, Dict
+
+import orjson
+from fastapi.responses import JSONResponse
+from langchain_core.messages import BaseMessage
+from pydantic import BaseModel
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        # Field values straight off the instance: no model_dump() copy and no
+        # jsonable_encoder walk. None fields are left out, as with
+        # response_model_exclude_none, and orjson recurses into the rest.
+        return {k: v for k, v in obj.__dict__.items() if v is not None}
+    return str(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """JSON-encode plain data and pydantic models (None fields omitted) in one pass."""
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def message_to_dict(message: BaseMessage) -> Dict[str, Any]:
+    """
+    Same dict as message.model_dump(), built directly. Message fields are
+    already plain str/list/dict values, so a shallow copy is enough.
+    """
+    data = dict(message.__dict__)
+    if message.__pydantic_extra__:
+        data.update(message.__pydantic_extra__)
+    return data
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with dumps(). Routes return it directly, so FastAPI
+    skips re-validating and re-serializing the response model, which the
+    route declares only for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
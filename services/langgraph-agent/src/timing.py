@@ -0,0 +1,75 @@
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+# Per-request phase durations (seconds), reported in the Server-Timing header
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("server_timings", default=None)
+
+
+def record(name: str, seconds: float) -> None:
+    """Add to a phase of the current request; concurrent phases (e.g. parallel tools) are summed."""
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def server_timing(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
+
+
+class LLMTimingHandler(AsyncCallbackHandler):
+    """Callback handler that records time spent in chat model calls as the "llm" phase."""
+
+    def __init__(self):
+        self._started: Dict[UUID, float] = {}
+
+    async def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    async def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            record("llm", time.perf_counter() - started)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started.pop(run_id, None)
+
+
+llm_timing = LLMTimingHandler()
+
+
+class ServerTimingMiddleware:
+    """
+    Pure ASGI middleware that times each HTTP request and adds a Server-Timing
+    header with the total (as `name`) plus any phases recorded while handling it.
+    For streamed responses the header only covers time until the first byte.
+    """
+
+    def __init__(self, app, name: str):
+        self.app = app
+        self.name = name
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _timings.set(timings)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                phases = {self.name: time.perf_counter() - started, **timings}
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(phases).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
@@ -1,13 +1,47 @@
+import asyncio
+from typing import Dict, List
+
+from langchain_core.tools import BaseTool
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.interceptors import MCPToolCallRequest
 from ..config.settings import settings
+from ..tracing import trace_headers
+from .session_pool import MCPSessionPool
+
+
+async def propagate_trace(request: MCPToolCallRequest, handler):
+    """Send the trace context as HTTP headers on per-call sessions (no-op for stdio)."""
+    headers = trace_headers()
+    if headers:
+        request = request.override(headers={**(request.headers or {}), **headers})
+    return await handler(request)
+
 
 class MCPClient:
     def __init__(self):
-        self.client = MultiServerMCPClient(settings.mcp_tool_config)
-
-    async def init(self):
-        print("Initializing MCP Client with tools:", settings.mcp_tool_config)
-        # print("MCP Client initialized with tools:", self.client)
-        # print("Fetching tools from MCP Client...")
-        # print(self.client.connections)
-        await self.client.get_tools()
+        self.connections = settings.mcp_tool_config
+        self.client = MultiServerMCPClient(self.connections, tool_interceptors=[propagate_trace])
+        self._pools: Dict[str, MCPSessionPool] = {}
+
+    @property
+    def server_names(self) -> List[str]:
+        return list(self.connections)
+
+    def _pool(self, server_name: str) -> MCPSessionPool:
+        pool = self._pools.get(server_name)
+        if pool is None:
+            transport = self.connections[server_name].get("transport")
+            size = 1 if transport == "stdio" else settings.MCP_SESSION_POOL_SIZE
+            pool = self._pools[server_name] = MCPSessionPool(server_name, self.client, size)
+        return pool
+
+    async def get_server_tools(self, server_name: str) -> List[BaseTool]:
+        """Discover the tools exposed by a single MCP server."""
+        if not settings.MCP_PERSISTENT_SESSIONS:
+            # Adapter default: every tool call opens (and closes) its own session
+            return await self.client.get_tools(server_name=server_name)
+        return await self._pool(server_name).list_tools()
+
+    async def close(self) -> None:
+        await asyncio.gather(*(pool.close() for pool in self._pools.values()))
+        self._pools.clear()
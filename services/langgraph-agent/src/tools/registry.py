@@ -0,0 +1,138 @@
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.tools import BaseTool
+
+from ..config.settings import settings
+from ..logger import setup_logger
+from .mcp_client import MCPClient
+
+logger = setup_logger("tool-registry")
+
+AgentFactory = Callable[[List[BaseTool]], Awaitable[Any]]
+
+
+@dataclass
+class ServerHealth:
+    name: str
+    status: str = "unknown"  # unknown | healthy | degraded | unhealthy
+    tools: List[str] = field(default_factory=list)
+    consecutive_failures: int = 0
+    last_success: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+def _describe_error(exc: BaseException) -> str:
+    # anyio task groups wrap transport failures; report the underlying cause
+    while isinstance(exc, BaseExceptionGroup) and exc.exceptions:
+        exc = exc.exceptions[0]
+    return f"{type(exc).__name__}: {exc}"
+
+
+def _fingerprint(tools: List[BaseTool]) -> Tuple:
+    return tuple(sorted(
+        (t.name, t.description or "", json.dumps(t.args, sort_keys=True, default=str))
+        for t in tools
+    ))
+
+
+class ToolRegistry:
+    """
+    Discovers MCP tools once per server and keeps them fresh in the background.
+
+    The compiled agent is rebuilt only when the combined tool set changes and is
+    swapped in with a single reference assignment, so request handlers never wait
+    on discovery and always see a consistent (agent, tools) pair.
+    """
+
+    def __init__(self, mcp_client: MCPClient, agent_factory: AgentFactory):
+        self._mcp_client = mcp_client
+        self._agent_factory = agent_factory
+        self._server_tools: Dict[str, List[BaseTool]] = {}
+        self._fingerprint: Optional[Tuple] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        self.health = {name: ServerHealth(name) for name in mcp_client.server_names}
+        self.agent = None
+        self.tools: List[BaseTool] = []
+        self.tools_by_name: Dict[str, BaseTool] = {}
+        self.version = 0
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        await self.refresh()
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.MCP_REFRESH_INTERVAL_SECONDS)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Tool registry refresh failed")
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            await asyncio.gather(*(self._discover(name) for name in self.health))
+            tools = [t for name in self.health for t in self._server_tools.get(name, [])]
+            fingerprint = _fingerprint(tools)
+            if self.agent is not None and fingerprint == self._fingerprint:
+                return
+
+            agent = await self._agent_factory(tools)
+            self.agent, self.tools, self._fingerprint = agent, tools, fingerprint
+            self.tools_by_name = {t.name: t for t in tools}
+            self.version += 1
+            logger.info(
+                "Agent rebuilt (version %d) with tools %s", self.version, [t.name for t in tools]
+            )
+
+    async def _discover(self, name: str) -> None:
+        health = self.health[name]
+        try:
+            tools = await asyncio.wait_for(
+                self._mcp_client.get_server_tools(name), settings.MCP_DISCOVERY_TIMEOUT
+            )
+        except Exception as e:
+            health.consecutive_failures += 1
+            health.last_error = _describe_error(e)
+            if name not in self._server_tools or health.consecutive_failures >= settings.MCP_UNHEALTHY_THRESHOLD:
+                # Stop offering tools from a server that keeps failing
+                health.status = "unhealthy"
+                health.tools = []
+                self._server_tools.pop(name, None)
+            else:
+                health.status = "degraded"
+            logger.warning("MCP server %s discovery failed (%d in a row): %s",
+                           name, health.consecutive_failures, health.last_error)
+            return
+
+        if health.status != "healthy":
+            logger.info("MCP server %s is healthy with %d tools", name, len(tools))
+        health.status = "healthy"
+        health.tools = [t.name for t in tools]
+        health.consecutive_failures = 0
+        health.last_success = time.time()
+        health.last_error = None
+        self._server_tools[name] = tools
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "agent_version": self.version,
+            "tools": [t.name for t in self.tools],
+            "servers": {name: asdict(h) for name, h in self.health.items()},
+        }
@@ -0,0 +1,195 @@
+import asyncio
+from typing import Any, List, Optional, Tuple, Union
+
+import anyio
+import httpx
+from langchain_core.tools import BaseTool, StructuredTool, ToolException
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+from mcp.types import INVALID_PARAMS, METHOD_NOT_FOUND, CallToolResult, TextContent, Tool as MCPTool
+
+from ..config.settings import settings
+from ..logger import setup_logger
+from ..tracing import trace_headers
+
+logger = setup_logger("mcp-session-pool")
+
+# JSON-RPC errors about the request itself; anything else (e.g. "Session
+# terminated" after a server restart) means the session should be reopened.
+_REQUEST_ERRORS = {INVALID_PARAMS, METHOD_NOT_FOUND}
+# The streamable HTTP transport's answer to a 404 for an unknown session id:
+# the server dropped the session without running the request
+_SESSION_TERMINATED = 32600
+# Failures before the request left the client: the session's streams were
+# already closed, or no connection could be made
+_NOT_SENT = (anyio.ClosedResourceError, anyio.BrokenResourceError, httpx.ConnectError, httpx.ConnectTimeout,
+             ConnectionRefusedError)
+
+
+def _not_sent(error: BaseException) -> bool:
+    """The call cannot have reached the server, so replaying it cannot run a tool twice."""
+    if isinstance(error, McpError):
+        return error.error.code == _SESSION_TERMINATED
+    return isinstance(error, _NOT_SENT)
+
+
+class _SessionSlot:
+    """
+    One long-lived MCP session.
+
+    The session context is entered and exited by a dedicated task: the MCP
+    transports use anyio task groups, whose cancel scopes must be closed by the
+    task that opened them.
+    """
+
+    def __init__(self, server_name: str, client: MultiServerMCPClient):
+        self.server_name = server_name
+        self._client = client
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Event] = None
+        self.session: Optional[ClientSession] = None
+        self.generation = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def ensure_open(self) -> ClientSession:
+        if self.alive:
+            return self.session
+        async with self._lock:
+            if self.alive:
+                return self.session
+            await self._close()
+            ready = asyncio.get_running_loop().create_future()
+            self._closing = asyncio.Event()
+            self._task = asyncio.create_task(self._run(ready, self._closing))
+            await asyncio.wait_for(asyncio.shield(ready), settings.MCP_DISCOVERY_TIMEOUT)
+            self.generation += 1
+            logger.info("Opened MCP session to %s (generation %d)", self.server_name, self.generation)
+            return self.session
+
+    async def _run(self, ready: asyncio.Future, closing: asyncio.Event) -> None:
+        try:
+            async with self._client.session(self.server_name) as session:
+                self.session = session
+                ready.set_result(None)
+                await closing.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning("MCP session to %s ended: %s", self.server_name, e)
+        finally:
+            self.session = None
+
+    async def reset(self, generation: int) -> None:
+        """Drop the session if it is still the one the caller saw fail."""
+        async with self._lock:
+            if generation == self.generation:
+                await self._close()
+
+    async def _close(self) -> None:
+        task, self._task = self._task, None
+        self.session = None
+        if task is None:
+            return
+        self._closing.set()
+        try:
+            await asyncio.wait_for(task, 5)
+        except (asyncio.TimeoutError, asyncio.CancelledError, Exception):
+            task.cancel()
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._close()
+
+
+def _convert_result(result: CallToolResult) -> Tuple[Union[str, List[str]], Any]:
+    texts = [c.text for c in result.content if isinstance(c, TextContent)]
+    artifacts = [c for c in result.content if not isinstance(c, TextContent)]
+    content: Union[str, List[str]] = texts[0] if len(texts) == 1 else texts
+    if result.isError:
+        raise ToolException(content)
+    return content, (artifacts or None)
+
+
+class MCPSessionPool:
+    """
+    Keeps persistent sessions to one MCP server and spreads tool calls across them.
+
+    HTTP transports get MCP_SESSION_POOL_SIZE sessions; stdio transports get a
+    single session, i.e. one long-lived subprocess instead of one per call.
+    Broken sessions are reopened. A tool call is retried on the new session (up
+    to MCP_SESSION_RETRIES times) only if it cannot have reached the server,
+    e.g. not after a read timeout, so a tool never runs twice for one call.
+    """
+
+    def __init__(self, server_name: str, client: MultiServerMCPClient, size: int):
+        self.server_name = server_name
+        self._slots = [_SessionSlot(server_name, client) for _ in range(max(1, size))]
+        self._cursor = 0
+
+    @property
+    def size(self) -> int:
+        return len(self._slots)
+
+    def _next_slot(self) -> _SessionSlot:
+        # Round-robin; each slot opens its session lazily on first use
+        slot = self._slots[self._cursor % len(self._slots)]
+        self._cursor += 1
+        return slot
+
+    async def _with_session(self, operation, idempotent: bool = False):
+        attempts = settings.MCP_SESSION_RETRIES + 1
+        slot = self._next_slot()
+        for attempt in range(1, attempts + 1):
+            session = await slot.ensure_open()
+            generation = slot.generation
+            try:
+                return await operation(session)
+            except McpError as e:
+                if e.error.code in _REQUEST_ERRORS:
+                    raise
+                error: Exception = e
+            except Exception as e:
+                error = e
+            logger.warning("MCP call to %s failed on attempt %d/%d: %s", self.server_name, attempt, attempts, error)
+            await slot.reset(generation)
+            if attempt == attempts or not (idempotent or _not_sent(error)):
+                raise error
+
+    async def list_tools(self) -> List[BaseTool]:
+        async def _list(session: ClientSession) -> List[MCPTool]:
+            tools, cursor = [], None
+            while True:
+                page = await session.list_tools(cursor=cursor)
+                tools.extend(page.tools)
+                cursor = page.nextCursor
+                if not cursor:
+                    return tools
+
+        return [self._to_langchain_tool(t) for t in await self._with_session(_list, idempotent=True)]
+
+    async def call_tool(self, name: str, arguments: dict) -> CallToolResult:
+        # Sessions outlive requests, so the trace context travels in the call's _meta
+        meta = trace_headers() or None
+        return await self._with_session(lambda session: session.call_tool(name, arguments, meta=meta))
+
+    def _to_langchain_tool(self, tool: MCPTool) -> BaseTool:
+        async def call(**arguments: Any) -> Tuple[Union[str, List[str]], Any]:
+            return _convert_result(await self.call_tool(tool.name, arguments))
+
+        return StructuredTool(
+            name=tool.name,
+            description=tool.description or "",
+            args_schema=tool.inputSchema,
+            coroutine=call,
+            response_format="content_and_artifact",
+            metadata={"mcp_server": self.server_name},
+        )
+
+    async def close(self) -> None:
+        await asyncio.gather(*(slot.close() for slot in self._slots))
@@ -0,0 +1,125 @@
+import math
+import re
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.tools import BaseTool
+
+from ..cache.embedders import Embedder, cosine_similarity
+
+# Words only: numbers in a query ("what is 2 + 3") say nothing about which tool fits
+_WORD_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from get give how i in is it me my of on or please set "
+    "show tell that the this to use using what when where which who will with you your".split()
+)
+
+
+def _stem(word: str) -> str:
+    # Just enough folding for "cities"/"city" or "converting"/"convert" to meet
+    for suffix, replacement in (("ies", "y"), ("ing", ""), ("ed", ""), ("s", "")):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: len(word) - len(suffix)] + replacement
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, lightly stemmed words; snake_case and camelCase names are split."""
+    words = (w.casefold() for w in _WORD_RE.findall(text))
+    return [_stem(w) for w in words if w not in _STOPWORDS]
+
+
+def _document(tool: BaseTool) -> Tuple[List[str], List[str]]:
+    """Name words and body words (description plus argument names and descriptions)."""
+    parts = [tool.description or ""]
+    for arg, schema in (tool.args or {}).items():
+        parts += [arg, str(schema.get("description", "")) if isinstance(schema, dict) else ""]
+    return tokenize(tool.name), tokenize(" ".join(parts))
+
+
+class ToolIndex:
+    """
+    Picks the tools worth offering the model for a query, so the prompt
+    carries the schemas of a few relevant tools rather than of every tool
+    of every MCP server.
+
+    Built once per tool set. By default tools are scored by keyword overlap:
+    IDF-weighted query words found in the tool's name (counted twice) or
+    its description and arguments. With an embedder the score is the
+    cosine similarity to the tool's embedded text. Tools scoring above zero
+    (above min_similarity for embeddings) come first, best first; the rest
+    of the top_k are filled with tools from the same MCP server as those,
+    then in registry order, so a query naming one tool ("calculate ...")
+    still gets its siblings (evaluate). A query that matches no tool gets
+    all of them, so nothing the model might need is withheld on a miss.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[BaseTool],
+        top_k: int,
+        embedder: Optional[Embedder] = None,
+        min_similarity: float = 0.0,
+        cache_size: int = 1024,
+    ):
+        self.names = tuple(t.name for t in tools)
+        self._servers = [(t.metadata or {}).get("mcp_server") for t in tools]
+        self.top_k = top_k
+        self.min_similarity = min_similarity
+        self._embedder = embedder
+        self._cache: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+        self._cache_size = cache_size
+
+        documents = [_document(t) for t in tools]
+        self._names = [set(name) for name, _ in documents]
+        self._bodies = [set(body) for _, body in documents]
+        frequency = Counter(w for name, body in zip(self._names, self._bodies) for w in name | body)
+        self._idf = {w: math.log(1 + len(tools) / n) for w, n in frequency.items()}
+        self._vectors: List[List[float]] = []
+        if embedder is not None:
+            self._vectors = [
+                embedder.embed(" ".join([t.name.replace("_", " "), t.description or ""])) for t in tools
+            ]
+
+    @property
+    def active(self) -> bool:
+        """False when every tool would be selected anyway."""
+        return len(self.names) > self.top_k
+
+    def _scores(self, query: str) -> List[float]:
+        if self._embedder is not None:
+            vector = self._embedder.embed(query)
+            return [
+                score if score > self.min_similarity else 0.0
+                for score in (cosine_similarity(vector, v) for v in self._vectors)
+            ]
+        words = set(tokenize(query))
+        return [
+            sum(self._idf.get(w, 0.0) * ((2.0 if w in name else 0.0) + (1.0 if w in body else 0.0)) for w in words)
+            for name, body in zip(self._names, self._bodies)
+        ]
+
+    def select(self, query: str) -> Tuple[str, ...]:
+        """Names of the tools to bind for `query`, in registry order."""
+        if not self.active:
+            return self.names
+        selected = self._cache.get(query)
+        if selected is not None:
+            self._cache.move_to_end(query)
+            return selected
+        scores = self._scores(query)
+        ranked = sorted((i for i, s in enumerate(scores) if s > 0), key=lambda i: -scores[i])[: self.top_k]
+        if ranked:
+            servers = {self._servers[i] for i in ranked} - {None}
+            rest = sorted(
+                (i for i in range(len(self.names)) if i not in ranked), key=lambda i: self._servers[i] not in servers
+            )
+            ranked += rest[: self.top_k - len(ranked)]
+        selected = tuple(self.names[i] for i in sorted(ranked)) or self.names
+        self._cache[query] = selected
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return selected
+
+    def stats(self) -> Dict[str, int]:
+        return {"tools": len(self.names), "top_k": self.top_k, "cached_queries": len(self._cache)}
@@ -0,0 +1,263 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.runnables.config import var_child_runnable_config
+from opentelemetry import context, propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor, ConsoleSpanExporter, SimpleSpanProcessor, SpanExporter, SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import Span, SpanKind, Status, StatusCode
+
+from .config.settings import settings
+from .logger import request_id, setup_logger
+
+logger = setup_logger("tracing")
+
+# Until setup_tracing() installs a provider this hands out no-op spans
+tracer = trace.get_tracer("langgraph-agent")
+
+_configured = False
+
+
+class JSONLinesSpanExporter(SpanExporter):
+    """Appends one JSON object per finished span to a local file."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", buffering=1)
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        for span in spans:
+            self._file.write(span.to_json(indent=None) + "\n")
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        self._file.close()
+
+
+def _span_processor():
+    kind = settings.TRACING_EXPORTER.lower()
+    if kind == "otlp":
+        # Optional: pip install opentelemetry-exporter-otlp-proto-http; reads OTEL_EXPORTER_OTLP_*
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return BatchSpanProcessor(OTLPSpanExporter())
+    # Local exporters write each span as it ends: uvicorn exits on SIGTERM
+    # without running atexit hooks, which would drop a batch still in memory
+    if kind == "file":
+        return SimpleSpanProcessor(JSONLinesSpanExporter(settings.TRACING_FILE))
+    return SimpleSpanProcessor(ConsoleSpanExporter())
+
+
+def setup_tracing(service_name: str) -> None:
+    """Install the global tracer provider when TRACING_ENABLED is set."""
+    global _configured
+    if _configured or not settings.TRACING_ENABLED:
+        return
+    _configured = True
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    provider.add_span_processor(_span_processor())
+    trace.set_tracer_provider(provider)
+    logger.info("Tracing enabled (%s exporter)", settings.TRACING_EXPORTER)
+
+
+def shutdown_tracing() -> None:
+    """Flush spans still buffered for export (OTLP batches)."""
+    global _configured
+    if _configured:
+        _configured = False
+        trace.get_tracer_provider().shutdown()
+
+
+@dataclass
+class _Run:
+    root: UUID
+    parent: Optional[UUID]
+    span: Optional[Span]
+
+
+class LangChainTracingHandler(AsyncCallbackHandler):
+    """
+    Turns LangChain/LangGraph callbacks into spans: one for the graph run, one
+    per graph node (agent, tools, pre_model_hook), and one per chat model call
+    (with token usage) and tool call. Internal runnables are not traced; their
+    children attach to the nearest traced ancestor.
+    """
+
+    def __init__(self):
+        self._runs: Dict[UUID, _Run] = {}
+
+    def context_for(self, run_id: Optional[UUID]) -> Optional[context.Context]:
+        """Context of the nearest traced run at or above `run_id`, if any."""
+        while run_id is not None and run_id in self._runs:
+            run = self._runs[run_id]
+            if run.span is not None:
+                return trace.set_span_in_context(run.span)
+            run_id = run.parent
+        return None
+
+    def _start(
+        self,
+        run_id: UUID,
+        parent_run_id: Optional[UUID],
+        name: Optional[str],
+        kind: SpanKind = SpanKind.INTERNAL,
+        **attributes: Any,
+    ) -> None:
+        parent = self._runs.get(parent_run_id) if parent_run_id else None
+        root = parent.root if parent else run_id
+        span = None
+        if name is not None:
+            attributes = {k: v for k, v in attributes.items() if v is not None}
+            # Root runs have no parent run; they join the current request's span
+            span = tracer.start_span(name, context=self.context_for(parent_run_id), kind=kind, attributes=attributes)
+        self._runs[run_id] = _Run(root, parent_run_id, span)
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None) -> Optional[Span]:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return None
+        if run.span is not None:
+            if error is not None:
+                run.span.record_exception(error)
+                run.span.set_status(Status(StatusCode.ERROR, type(error).__name__))
+            run.span.end()
+        if run.root == run_id:
+            # Children of a cancelled run may never report back; close them with the root
+            for child_id in [k for k, r in self._runs.items() if r.root == run_id]:
+                self._end(child_id)
+        return run.span
+
+    async def on_chain_start(
+        self, serialized: Any, inputs: Any, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None, **kwargs: Any,
+    ) -> None:
+        metadata = metadata or {}
+        name = kwargs.get("name")
+        if parent_run_id is None:
+            self._start(run_id, None, "agent.run", **{"langgraph.graph": name})
+        elif name and metadata.get("langgraph_node") == name:
+            self._start(run_id, parent_run_id, f"node {name}",
+                        **{"langgraph.node": name, "langgraph.step": metadata.get("langgraph_step")})
+        else:
+            self._start(run_id, parent_run_id, None)
+
+    async def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    async def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+    async def on_chat_model_start(
+        self, serialized: Any, messages: Any, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None, **kwargs: Any,
+    ) -> None:
+        metadata = metadata or {}
+        model = metadata.get("ls_model_name") or (serialized or {}).get("name")
+        self._start(
+            run_id, parent_run_id, f"llm {model or 'chat'}", SpanKind.CLIENT,
+            **{"gen_ai.system": metadata.get("ls_provider"), "gen_ai.request.model": model},
+        )
+
+    async def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.get(run_id)
+        if run is not None and run.span is not None:
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    usage = getattr(message, "usage_metadata", None) or {}
+                    if usage:
+                        run.span.set_attribute("gen_ai.usage.input_tokens", usage.get("input_tokens", 0))
+                        run.span.set_attribute("gen_ai.usage.output_tokens", usage.get("output_tokens", 0))
+                    calls = getattr(message, "tool_calls", None)
+                    if calls:
+                        run.span.set_attribute("gen_ai.response.tool_calls", [c["name"] for c in calls])
+        self._end(run_id)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+    async def on_tool_start(
+        self, serialized: Any, input_str: str, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None, **kwargs: Any,
+    ) -> None:
+        metadata = metadata or {}
+        name = kwargs.get("name") or (serialized or {}).get("name", "tool")
+        self._start(
+            run_id, parent_run_id, f"tool {name}",
+            **{"tool.name": name, "mcp.server": metadata.get("mcp_server")},
+        )
+
+    async def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.get(run_id)
+        if run is not None and run.span is not None and getattr(output, "status", None) == "error":
+            run.span.set_status(Status(StatusCode.ERROR))
+        self._end(run_id)
+
+    async def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error)
+
+
+langchain_tracing = LangChainTracingHandler()
+
+
+def with_tracing(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the span handler to an agent run config when tracing is on."""
+    if not _configured:
+        return config
+    return {**config, "callbacks": [*config.get("callbacks", []), langchain_tracing]}
+
+
+def trace_headers() -> Dict[str, str]:
+    """
+    W3C trace context (traceparent) for an outgoing call made from inside a
+    LangChain run, e.g. an MCP tool call, parented to the innermost traced run,
+    plus the request id so the callee's logs can be correlated.
+    """
+    carrier: Dict[str, str] = {}
+    rid = request_id.get()
+    if rid != "-":
+        carrier["x-request-id"] = rid
+    if _configured:
+        config = var_child_runnable_config.get() or {}
+        run_id = getattr(config.get("callbacks"), "parent_run_id", None)
+        propagate.inject(carrier, context=langchain_tracing.context_for(run_id))
+    return carrier
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware that opens a server span per HTTP request, continuing
+    the gateway's trace when a traceparent header is present.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _configured:
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        name = f"{scope['method']} {scope['path']}"
+        attributes = {"http.request.method": scope["method"], "url.path": scope["path"]}
+
+        with tracer.start_as_current_span(
+            name, context=propagate.extract(carrier), kind=SpanKind.SERVER, attributes=attributes
+        ) as span:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    span.set_attribute("http.response.status_code", status)
+                    if status >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
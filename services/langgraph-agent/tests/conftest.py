@@ -0,0 +1,12 @@
+import os
+import sys
+from pathlib import Path
+
+SERVICE = Path(__file__).resolve().parent.parent
+
+# The agent is imported as the src package, as when run from its service directory
+sys.path.insert(0, str(SERVICE))
+# Required settings; no test talks to Groq or an MCP server
+os.environ.setdefault("INTERNAL_API_KEY", "test-key")
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("MCP_TOOL_CONFIG", "{}")
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.admission import AdmissionController, AdmissionError
+from src.exceptions import register_exception_handlers
+
+
+def controller(**overrides) -> AdmissionController:
+    options = dict(max_concurrency=1, max_queue=2, max_queue_per_client=2, queue_timeout=5, run_timeout=5)
+    return AdmissionController(**{**options, **overrides})
+
+
+async def queued(admission: AdmissionController, client_id: str) -> asyncio.Task:
+    """A task waiting in the queue for `client_id`."""
+    task = asyncio.create_task(admission.acquire(client_id))
+    await asyncio.sleep(0)
+    return task
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    admission = controller()
+    app = FastAPI()
+    register_exception_handlers(app)
+
+    @app.post("/ask")
+    async def ask():
+        admission.check("c")
+
+    async def fill():
+        await admission.acquire("a")
+        return [await queued(admission, "a"), await queued(admission, "b")]
+
+    loop = asyncio.new_event_loop()
+    try:
+        waiters = loop.run_until_complete(fill())
+        resp = TestClient(app).post("/ask")
+        for waiter in waiters:
+            waiter.cancel()
+        loop.run_until_complete(asyncio.gather(*waiters, return_exceptions=True))
+    finally:
+        loop.close()
+
+    assert resp.status_code == 503
+    assert resp.json() == {"detail": "Server busy, try again later"}
+    assert int(resp.headers["Retry-After"]) >= 1
+    assert admission.stats()["rejected_queue_full"] == 1
+
+
+def test_client_over_its_share_gets_429_while_others_queue():
+    admission = controller(max_queue=4, max_queue_per_client=1)
+
+    async def scenario():
+        await admission.acquire("a")
+        first = await queued(admission, "a")
+        with pytest.raises(AdmissionError) as e:
+            admission.check("a")
+        # Another client still has room in the queue
+        admission.check("b")
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        return e.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 429
+    assert error.headers["Retry-After"]
+    assert admission.queue_depth == 0
+
+
+def test_freed_slots_alternate_between_clients():
+    admission = controller(max_queue=8, max_queue_per_client=4)
+    order = []
+
+    async def run(client_id: str):
+        await admission.acquire(client_id)
+        order.append(client_id)
+        admission.release(client_id)
+
+    async def scenario():
+        await admission.acquire("busy")
+        tasks = [asyncio.create_task(run("busy")) for _ in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(run("quiet")))
+        await asyncio.sleep(0)
+        admission.release("busy")
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    # "quiet" queued last but is served second, not after all of "busy"'s requests
+    assert order == ["busy", "quiet", "busy", "busy"]
+
+
+def test_queue_wait_past_the_timeout_is_a_503():
+    admission = controller(queue_timeout=0.05)
+
+    async def scenario():
+        await admission.acquire("a")
+        with pytest.raises(AdmissionError) as e:
+            await admission.acquire("b")
+        admission.release("a")
+        return e.value
+
+    error = asyncio.run(scenario())
+    assert (error.status_code, error.detail) == (503, "Timed out waiting for capacity")
+    assert error.retry_after >= 1
+    assert admission.queue_depth == 0 and admission.in_flight == 0
+
+
+def test_run_past_its_deadline_is_a_504_and_frees_the_slot():
+    admission = controller(run_timeout=0.05)
+
+    async def scenario():
+        with pytest.raises(AdmissionError) as e:
+            async with admission.admit("a"):
+                await asyncio.sleep(1)
+        return e.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 504
+    assert error.headers is None
+    assert admission.in_flight == 0 and admission.stats()["run_timeouts"] == 1
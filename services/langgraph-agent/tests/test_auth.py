@@ -0,0 +1,31 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.auth import InternalKeyMiddleware
+from src.config.settings import settings
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    for path in ("/health", "/health/tools", "/health/models", "/ask"):
+        app.add_api_route(path, lambda: {"ok": True})
+    app.add_middleware(InternalKeyMiddleware)
+    return TestClient(app)
+
+
+def test_liveness_and_docs_need_no_key(client):
+    assert client.get("/health").status_code == 200
+    assert client.get("/openapi.json").status_code == 200
+
+
+@pytest.mark.parametrize("path", ["/health/tools", "/health/models", "/healthz", "/ask"])
+def test_everything_else_needs_the_key(client, path):
+    assert client.get(path).status_code == 403
+    assert client.get(path, headers={"X-INTERNAL-KEY": "wrong"}).status_code == 403
+
+
+def test_detailed_health_is_served_with_the_key(client):
+    resp = client.get("/health/tools", headers={"X-INTERNAL-KEY": settings.INTERNAL_API_KEY})
+    assert resp.status_code == 200
@@ -0,0 +1,76 @@
+import asyncio
+from typing import List
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.prebuilt import create_react_agent
+
+from src.agents.budget import RunBudget, run_with_budget
+from src.agents.fake_model import ScriptedChatModel
+from src.config.settings import settings
+from src.schemas import BudgetOverrides
+
+
+@tool
+def ping(n: int = 0) -> str:
+    """Answer pong."""
+    return "pong"
+
+
+class RunawayModel(ScriptedChatModel):
+    """Calls ping on every turn and never gives a final answer."""
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        turn = len(messages)
+        return AIMessage(content="", tool_calls=[{"name": "ping", "args": {"n": turn}, "id": f"call_{turn}"}])
+
+
+def run(model, budget: RunBudget):
+    agent = create_react_agent(model=model, tools=[ping])
+    inputs = {"messages": [{"role": "user", "content": "ping until told to stop"}]}
+    return asyncio.run(run_with_budget(agent, inputs, budget))
+
+
+def budget(**overrides) -> RunBudget:
+    return RunBudget(**{**dict(max_steps=50, max_tool_calls=50, max_tokens=100_000, timeout_seconds=10), **overrides})
+
+
+def tool_results(state) -> int:
+    return sum(isinstance(m, ToolMessage) for m in state["messages"])
+
+
+def test_run_within_budget_finishes_normally():
+    script = [{"pattern": r"ping", "tool": "ping", "args": {}}]
+    state, reason = run(ScriptedChatModel(script=script, latency_ms=0), budget())
+    assert reason == "stop"
+    assert state["messages"][-1].content == "Here is what I found: pong"
+
+
+def test_tool_call_past_the_budget_is_never_run():
+    state, reason = run(RunawayModel(latency_ms=0), budget(max_tool_calls=2))
+    assert reason == "max_tool_calls"
+    # The third call is dropped before the tool node sees it
+    assert tool_results(state) == 2
+
+
+def test_step_budget_stops_a_looping_run():
+    state, reason = run(RunawayModel(latency_ms=0), budget(max_steps=4))
+    assert reason == "max_steps"
+    assert tool_results(state) <= 2
+
+
+def test_token_budget_stops_the_run():
+    state, reason = run(RunawayModel(latency_ms=0), budget(max_tokens=30))
+    assert reason == "max_tokens"
+
+
+def test_slow_run_is_stopped_at_its_timeout():
+    state, reason = run(RunawayModel(latency_ms=100), budget(timeout_seconds=0.25))
+    assert reason == "timeout"
+
+
+def test_request_overrides_only_tighten_the_budget(monkeypatch):
+    monkeypatch.setattr(settings, "AGENT_MAX_STEPS", 10)
+    monkeypatch.setattr(settings, "AGENT_MAX_TOOL_CALLS", 5)
+    resolved = RunBudget.resolve(BudgetOverrides(max_steps=100, max_tool_calls=0))
+    assert (resolved.max_steps, resolved.max_tool_calls) == (10, 0)
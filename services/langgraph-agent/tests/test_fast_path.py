@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from langchain_core.tools import StructuredTool
+
+from src.agents.fast_path import WEATHER_RULE, ArithmeticRule, FastPath
+
+fast_path = FastPath([ArithmeticRule(), WEATHER_RULE], timeout=1)
+
+
+@pytest.mark.parametrize(
+    "query, city",
+    [
+        ("weather in Paris", "Paris"),
+        ("What's the weather in New York today?", "New York"),
+        ("Paris weather", "Paris"),
+        ("New York weather", "New York"),
+        ("weather in Nice", "Nice"),
+        ("weather in Toronto", "Toronto"),
+    ],
+)
+def test_weather_queries_plan_get_weather(query, city):
+    plan = fast_path.plan(query)
+    assert (plan.tool, plan.args) == ("get_weather", {"city": city})
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "weather in Paris compared to London",
+        "weather in Paris vs London",
+        "weather in Paris versus London",
+        "weather in Paris and London",
+        "weather in Paris tomorrow",
+        "is it warmer in Paris than London",
+        "the weather",
+        "current weather",
+        "Nice weather",
+        "should I bring an umbrella to Paris",
+    ],
+)
+def test_other_weather_questions_fall_through(query):
+    assert fast_path.plan(query) is None
+
+
+@pytest.mark.parametrize(
+    "query, tool, args",
+    [
+        ("what is 2+2", "calculate", {"operation": "add", "a": 2.0, "b": 2.0}),
+        ("what is 1,000 + 2", "calculate", {"operation": "add", "a": 1000.0, "b": 2.0}),
+        ("17 * 23", "calculate", {"operation": "multiply", "a": 17.0, "b": 23.0}),
+        ("max(1, 2) + 3", "evaluate", {"expression": "max(1, 2) + 3"}),
+    ],
+)
+def test_arithmetic_plans(query, tool, args):
+    plan = fast_path.plan(query)
+    assert (plan.tool, plan.args) == (tool, args)
+
+
+@pytest.mark.parametrize("query", ["1,2", "what is love", "explain 2 + 2 to a child", "x" * 201])
+def test_other_queries_fall_through(query):
+    assert fast_path.plan(query) is None
+
+
+def _weather_tool(result: str = "Paris: 14.0°C, clear sky", fail: bool = False) -> StructuredTool:
+    async def get_weather(city: str) -> str:
+        if fail:
+            raise RuntimeError("upstream down")
+        return result
+
+    return StructuredTool.from_function(coroutine=get_weather, name="get_weather", description="Weather.")
+
+
+def test_answer_calls_the_tool_and_formats_its_result():
+    messages = asyncio.run(fast_path.answer("weather in Paris", {"get_weather": _weather_tool()}))
+    assert [m.type for m in messages] == ["human", "ai", "tool", "ai"]
+    assert messages[1].tool_calls[0]["args"] == {"city": "Paris"}
+    assert messages[2].content == "Paris: 14.0°C, clear sky"
+    assert messages[3].content == "Current weather in Paris: 14.0°C, clear sky"
+
+
+def test_answer_falls_through_without_the_tool_or_on_failure():
+    assert asyncio.run(fast_path.answer("weather in Paris", {})) is None
+    assert asyncio.run(fast_path.answer("weather in Paris", {"get_weather": _weather_tool(fail=True)})) is None
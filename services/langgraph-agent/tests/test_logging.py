@@ -0,0 +1,25 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.logger import RequestIdMiddleware
+from src.tracing import trace_headers
+
+
+def client() -> TestClient:
+    app = FastAPI()
+    # What an MCP tool call made while handling the request would carry
+    app.add_api_route("/call", lambda: trace_headers())
+    app.add_middleware(RequestIdMiddleware)
+    return TestClient(app)
+
+
+def test_callers_request_id_is_echoed_and_passed_to_tool_calls():
+    resp = client().get("/call", headers={"X-Request-ID": "req-42"})
+    assert resp.headers["X-Request-ID"] == "req-42"
+    assert resp.json()["x-request-id"] == "req-42"
+
+
+def test_request_without_an_id_gets_a_new_one():
+    resp = client().get("/call")
+    assert len(resp.headers["X-Request-ID"]) == 32
+    assert resp.json()["x-request-id"] == resp.headers["X-Request-ID"]
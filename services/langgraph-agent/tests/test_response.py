@@ -0,0 +1,52 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.agents.response import shape_response
+
+EARLIER_TURN = [
+    HumanMessage(content="weather in Oslo"),
+    AIMessage(content="", tool_calls=[{"name": "get_weather", "args": {"city": "Oslo"}, "id": "c0"}]),
+    ToolMessage(content="Oslo: 4°C", tool_call_id="c0", name="get_weather"),
+    AIMessage(content="It is 4°C in Oslo."),
+]
+TURN = [
+    HumanMessage(content="what is 6 * 7 and 2 + 2"),
+    AIMessage(content="", tool_calls=[
+        {"name": "calculate", "args": {"operation": "multiply", "a": 6, "b": 7}, "id": "c1"},
+        {"name": "calculate", "args": {"operation": "add", "a": 2, "b": 2}, "id": "c2"},
+    ]),
+    ToolMessage(content="42", tool_call_id="c1", name="calculate"),
+    ToolMessage(content="Error: math server unavailable", tool_call_id="c2", name="calculate", status="error"),
+]
+STATE = {"messages": EARLIER_TURN + TURN + [AIMessage(content="6 * 7 is 42.")]}
+
+
+def test_final_only_returns_just_the_answer():
+    response = shape_response(STATE, "final_only")
+    assert response.content == "6 * 7 is 42."
+    assert response.finish_reason == "stop"
+    assert response.tool_trace is None and response.messages is None
+
+
+def test_tool_trace_covers_the_current_turn_only():
+    trace = shape_response(STATE, "with_tool_trace").tool_trace
+    assert [(t.id, t.name, t.output, t.status) for t in trace] == [
+        ("c1", "calculate", "42", "success"),
+        ("c2", "calculate", "Error: math server unavailable", "error"),
+    ]
+    assert trace[0].args == {"operation": "multiply", "a": 6, "b": 7}
+
+
+def test_full_includes_the_whole_thread():
+    response = shape_response(STATE, "full")
+    assert len(response.tool_trace) == 2
+    assert len(response.messages) == len(STATE["messages"])
+    assert response.messages[-1]["content"] == "6 * 7 is 42."
+
+
+def test_stopped_run_answers_from_tool_results():
+    response = shape_response({"messages": EARLIER_TURN + TURN}, "final_only", finish_reason="max_tool_calls")
+    assert response.finish_reason == "max_tool_calls"
+    assert response.content.startswith("The run was stopped before a final answer.")
+    assert "- calculate: 42" in response.content
+    # The earlier turn's answer is not passed off as this turn's
+    assert "Oslo" not in response.content
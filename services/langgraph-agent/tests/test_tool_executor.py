@@ -0,0 +1,69 @@
+import asyncio
+import gc
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.prebuilt import ToolNode
+from langgraph.prebuilt.tool_node import ToolCallRequest
+
+from src.agents.tool_executor import ParallelToolExecutor
+
+running = {"now": 0, "peak": 0}
+
+
+@tool
+async def slow(city: str) -> str:
+    """Look a city up slowly."""
+    running["now"] += 1
+    running["peak"] = max(running["peak"], running["now"])
+    try:
+        await asyncio.sleep(0.05 if city != "stuck" else 10)
+    finally:
+        running["now"] -= 1
+    return city
+
+
+def call(city: str, i: int, name: str = "slow") -> dict:
+    return {"name": name, "args": {"city": city}, "id": f"call_{i}"}
+
+
+def run_turn(executor: ParallelToolExecutor, calls):
+    """The tool messages for one model turn issuing `calls`."""
+    graph = StateGraph(MessagesState)
+    graph.add_node("tools", ToolNode([slow], awrap_tool_call=executor))
+    graph.add_edge(START, "tools")
+    graph.add_edge("tools", END)
+    state = asyncio.run(graph.compile().ainvoke({"messages": [AIMessage(content="", tool_calls=calls)]}))
+    return [m for m in state["messages"] if isinstance(m, ToolMessage)]
+
+
+def test_turn_runs_at_most_max_parallel_calls_at_once():
+    running["peak"] = 0
+    results = run_turn(ParallelToolExecutor(2, 5), [call(c, i) for i, c in enumerate(["a", "b", "c", "d", "e"])])
+    assert [m.content for m in results] == ["a", "b", "c", "d", "e"]
+    assert running["peak"] == 2
+
+
+def test_timed_out_call_becomes_an_error_message():
+    first, second = run_turn(ParallelToolExecutor(2, 0.2), [call("a", 0), call("stuck", 1)])
+    assert (first.content, first.status) == ("a", "success")
+    assert second.status == "error" and "timed out" in second.content
+
+
+def test_no_turn_state_outlives_the_turn():
+    executor = ParallelToolExecutor(1, 5)
+    calls = [call("a", 0), call("b", 1), call("c", 2)]
+    state = {"messages": [AIMessage(content="", tool_calls=calls)]}
+
+    async def execute(request):
+        return ToolMessage(content="ok", tool_call_id=request.tool_call["id"])
+
+    async def turn():
+        # Only one of the turn's calls reaches the hook, as when the others are
+        # cancelled or answered before they run
+        return await executor(ToolCallRequest(calls[0], slow, state, None), execute)
+
+    assert asyncio.run(turn()).content == "ok"
+    gc.collect()
+    assert len(executor._steps) == 0
@@ -0,0 +1,74 @@
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import BaseTool, StructuredTool
+
+from src.agents.model_router import _tool_selection
+from src.tools.tool_index import ToolIndex
+
+MATH = {
+    "calculate": "Apply add, subtract, multiply, divide, power or mod to two numbers.",
+    "evaluate": "Evaluate an arithmetic expression in one call, e.g. (3.5 * 4 + 2) / sqrt(16).",
+    "evaluate_many": "Evaluate several independent expressions in one call.",
+    "batch_calculate": "Apply an operation element-wise over lists (vectorized).",
+    "statistics": "Summary statistics over a list of numbers: count, sum, mean, median.",
+}
+WEATHER = {
+    "get_weather": "Return the current weather for a city.",
+    "get_weather_many": "Return the current weather for several cities in one call.",
+}
+TICKETS = {f"ticket_{action}": f"{action.capitalize()} support tickets" for action in ("search", "open", "close")}
+
+
+def _tool(server: str, name: str, description: str) -> BaseTool:
+    async def run(**kwargs):
+        return ""
+
+    return StructuredTool.from_function(
+        coroutine=run, name=name, description=description,
+        args_schema={"type": "object", "properties": {}}, metadata={"mcp_server": server},
+    )
+
+
+TOOLS = [
+    *(_tool("weather", n, d) for n, d in WEATHER.items()),
+    *(_tool("tickets", n, d) for n, d in TICKETS.items()),
+    *(_tool("math", n, d) for n, d in MATH.items()),
+]
+
+
+def test_query_naming_one_tool_also_binds_its_server_siblings():
+    selected = ToolIndex(TOOLS, top_k=4).select("calculate (a + b) * c")
+    assert "calculate" in selected and "evaluate" in selected
+    assert len(selected) == 4
+    assert set(selected) <= set(MATH)
+
+
+def test_selection_is_filled_to_top_k_in_registry_order():
+    selected = ToolIndex(TOOLS, top_k=5).select("weather in Paris")
+    # Both weather tools, then the first registered tools of other servers
+    assert selected == ("get_weather", "get_weather_many", "ticket_search", "ticket_open", "ticket_close")
+
+
+def test_best_matches_win_when_more_than_top_k_match():
+    # ticket_close matches on "close" too; the others tie and keep registry order
+    assert ToolIndex(TOOLS, top_k=2).select("close the support ticket") == ("ticket_search", "ticket_close")
+
+
+def test_query_matching_nothing_gets_every_tool():
+    index = ToolIndex(TOOLS, top_k=3)
+    assert index.select("hello there") == index.names
+
+
+def test_small_tool_set_is_not_filtered():
+    index = ToolIndex(TOOLS[:2], top_k=3)
+    assert not index.active
+    assert index.select("calculate 1 + 1") == ("get_weather", "get_weather_many")
+
+
+def test_follow_up_keeps_tools_the_thread_already_called():
+    index = ToolIndex(TOOLS, top_k=2)
+    messages = [
+        HumanMessage(content="weather in Paris"),
+        AIMessage(content="", tool_calls=[{"name": "get_weather", "args": {"city": "Paris"}, "id": "c1"}]),
+        HumanMessage(content="and what is 3 * 4?"),
+    ]
+    assert "get_weather" in _tool_selection(messages, index)
@@ -0,0 +1 @@
+# Math MCP server package
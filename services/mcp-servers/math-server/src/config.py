@@ -0,0 +1,25 @@
+from pydantic_settings import BaseSettings
+
+class Settings(BaseSettings):
+    LOG_LEVEL: str = "INFO"
+    # Logging: "text" or "json"; SAMPLED per-request lines are kept at LOG_SAMPLE_RATIO
+    LOG_FORMAT: str = "text"
+    LOG_SAMPLE_RATIO: float = 1.0
+    LOG_QUEUE_SIZE: int = 10000
+
+    # "streamable-http" (served on MATH_HOST:MATH_PORT/mcp) or "stdio"
+    MATH_TRANSPORT: str = "streamable-http"
+    MATH_HOST: str = "0.0.0.0"
+    MATH_PORT: int = 8003
+
+    # Guards for the expression evaluator
+    MATH_MAX_EXPRESSION_LENGTH: int = 2000
+    MATH_MAX_EXPONENT: float = 1000.0
+    # Deepest syntax tree evaluated; a chain like 1+2+...+n nests one level per operator
+    MATH_MAX_DEPTH: int = 200
+    MATH_MAX_BATCH_SIZE: int = 100000
+
+    class Config:
+        env_file = ".env"
+
+settings = Settings()
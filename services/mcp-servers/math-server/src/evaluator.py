@@ -0,0 +1,129 @@
+import ast
+import math
+import operator
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from config import settings
+from exceptions import MathError
+
+_BINARY_OPS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+_UNARY_OPS: Dict[type, Callable[[Any], Any]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+FUNCTIONS: Dict[str, Callable[..., float]] = {
+    "abs": abs,
+    "round": round,
+    "min": min,
+    "max": max,
+    "sqrt": math.sqrt,
+    "exp": math.exp,
+    "log": math.log,
+    "log10": math.log10,
+    "log2": math.log2,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "asin": math.asin,
+    "acos": math.acos,
+    "atan": math.atan,
+    "floor": math.floor,
+    "ceil": math.ceil,
+    "factorial": math.factorial,
+}
+
+CONSTANTS: Dict[str, float] = {"pi": math.pi, "e": math.e, "tau": math.tau}
+
+
+def ensure_finite(value: Any) -> Any:
+    """
+    `value` if it is a finite number a float can hold. Infinity and NaN are
+    not valid JSON, and an int past the float range fails the tools' float
+    output schema.
+    """
+    try:
+        as_float = float(value)
+    except OverflowError:
+        raise MathError("Result out of range")
+    if math.isnan(as_float):
+        raise MathError("Result is not a number")
+    if math.isinf(as_float):
+        raise MathError("Result out of range")
+    return value
+
+
+class SafeEvaluator:
+    """
+    Evaluates arithmetic expressions by walking their AST.
+
+    Only numeric literals, the operators in _BINARY_OPS/_UNARY_OPS, calls to
+    FUNCTIONS, CONSTANTS and caller-supplied variables are accepted; anything
+    else (attributes, subscripts, comprehensions, strings...) is rejected
+    before evaluation, so input can never reach eval() or Python builtins.
+    """
+
+    def __init__(self, variables: Optional[Mapping[str, float]] = None):
+        self.names = {**CONSTANTS, **(variables or {})}
+
+    def evaluate(self, expression: str) -> float:
+        if len(expression) > settings.MATH_MAX_EXPRESSION_LENGTH:
+            raise MathError(f"Expression longer than {settings.MATH_MAX_EXPRESSION_LENGTH} characters")
+        try:
+            tree = ast.parse(expression.replace("^", "**"), mode="eval")
+        except SyntaxError as e:
+            raise MathError(f"Invalid expression: {e.msg}")
+        except RecursionError:
+            raise MathError("Expression too deeply nested")
+        try:
+            result = self._eval(tree.body)
+        except (ZeroDivisionError, OverflowError, ValueError, TypeError) as e:
+            raise MathError(f"Cannot evaluate {expression!r}: {e}")
+        except RecursionError:
+            # MATH_MAX_DEPTH set higher than the interpreter's stack allows
+            raise MathError("Expression too deeply nested")
+        return ensure_finite(result)
+
+    def _eval(self, node: ast.AST, depth: int = 0) -> Any:
+        if depth > settings.MATH_MAX_DEPTH:
+            raise MathError("Expression too deeply nested")
+        depth += 1
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            return node.value
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+            left, right = self._eval(node.left, depth), self._eval(node.right, depth)
+            if isinstance(node.op, ast.Pow) and abs(right) > settings.MATH_MAX_EXPONENT:
+                raise MathError(f"Exponent larger than {settings.MATH_MAX_EXPONENT:g}")
+            if isinstance(node.op, ast.Pow) and isinstance(left, int) and isinstance(right, int) \
+                    and abs(left) > 1 and right * math.log2(abs(left)) > 4096:
+                # Keep huge integer powers out of bignum arithmetic; floats overflow cleanly instead
+                left = float(left)
+            return _BINARY_OPS[type(node.op)](left, right)
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+            return _UNARY_OPS[type(node.op)](self._eval(node.operand, depth))
+        if isinstance(node, ast.Name):
+            if node.id not in self.names:
+                raise MathError(f"Unknown name: {node.id}")
+            return self.names[node.id]
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            func = FUNCTIONS.get(node.func.id)
+            if func is None:
+                raise MathError(f"Unknown function: {node.func.id}")
+            args = [self._eval(arg, depth) for arg in node.args]
+            if func is math.factorial and (not args or args[0] > 1000):
+                raise MathError("factorial() is limited to arguments up to 1000")
+            return func(*args)
+        raise MathError(f"Unsupported syntax: {type(node).__name__}")
+
+
+def evaluate(expression: str, variables: Optional[Mapping[str, float]] = None) -> float:
+    return SafeEvaluator(variables).evaluate(expression)
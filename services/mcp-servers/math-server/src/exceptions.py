@@ -0,0 +1,2 @@
+class MathError(Exception):
+    """Custom exception for invalid math tool input."""
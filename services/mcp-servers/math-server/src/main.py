@@ -0,0 +1,138 @@
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+from mcp.server.fastmcp import Context, FastMCP
+from config import settings
+from logger import SAMPLED, request_id, setup_logger
+from exceptions import MathError
+from evaluator import ensure_finite, evaluate as evaluate_expression
+
+logger = setup_logger("math-tool")
+
+mcp = FastMCP(name="math", port=settings.MATH_PORT, host=settings.MATH_HOST)
+
+_OPERATIONS = {
+    "add": np.add,
+    "subtract": np.subtract,
+    "multiply": np.multiply,
+    "divide": np.divide,
+    "power": np.power,
+    "mod": np.mod,
+}
+
+
+def _as_array(values: Union[float, List[float]], name: str) -> np.ndarray:
+    array = np.asarray(values, dtype=float)
+    if array.ndim > 1:
+        raise MathError(f"{name} must be a number or a flat list of numbers")
+    if array.size > settings.MATH_MAX_BATCH_SIZE:
+        raise MathError(f"{name} has more than {settings.MATH_MAX_BATCH_SIZE} values")
+    return array
+
+
+def _bind_request_id(ctx: Context) -> None:
+    """Log under the request id the agent sends in the tool call's _meta."""
+    meta = ctx.request_context.meta
+    extra = (meta.model_extra or {}) if meta is not None else {}
+    request_id.set(str(extra.get("x-request-id", "-")))
+
+
+def _to_python(array: np.ndarray) -> List[Optional[float]]:
+    # NaN/inf are not valid JSON; report them as null
+    return [float(v) if np.isfinite(v) else None for v in array]
+
+
+@mcp.tool()
+def calculate(operation: str, a: float, b: float) -> float:
+    """Apply add, subtract, multiply, divide, power or mod to two numbers."""
+    if operation not in _OPERATIONS:
+        raise MathError(f"Unsupported operation: {operation}")
+    if operation in ("divide", "mod") and b == 0:
+        raise MathError("Division by zero")
+    with np.errstate(over="ignore", invalid="ignore"):
+        return ensure_finite(float(_OPERATIONS[operation](a, b)))
+
+
+@mcp.tool()
+def evaluate(expression: str, ctx: Context, variables: Optional[Dict[str, float]] = None) -> float:
+    """
+    Evaluate an arithmetic expression in one call, e.g. "(3.5 * 4 + 2) / sqrt(16)".
+    Supports + - * / // % ** (or ^), parentheses, pi, e, named variables and
+    abs, round, min, max, sqrt, exp, log, log10, log2, sin, cos, tan, floor, ceil.
+    """
+    _bind_request_id(ctx)
+    result = evaluate_expression(expression, variables)
+    logger.info("Evaluated expression of length %d", len(expression), extra=SAMPLED)
+    return result
+
+
+@mcp.tool()
+def evaluate_many(
+    expressions: List[str], variables: Optional[Dict[str, float]] = None
+) -> Dict[str, List[Union[float, str]]]:
+    """
+    Evaluate several independent expressions in one call. Returns {"results": [...]}
+    where each entry is a number, or an "error: ..." string for an expression that failed.
+    """
+    if len(expressions) > settings.MATH_MAX_BATCH_SIZE:
+        raise MathError(f"More than {settings.MATH_MAX_BATCH_SIZE} expressions")
+    results: List[Union[float, str]] = []
+    for expression in expressions:
+        try:
+            results.append(evaluate_expression(expression, variables))
+        except MathError as e:
+            results.append(f"error: {e}")
+    return {"results": results}
+
+
+@mcp.tool()
+def batch_calculate(
+    operation: str, a: List[float], b: Union[float, List[float]]
+) -> Dict[str, List[Optional[float]]]:
+    """
+    Apply an operation element-wise over lists (vectorized): a[i] op b[i], or
+    a[i] op b when b is a single number. Returns {"results": [...]}; division
+    by zero yields null.
+    """
+    if operation not in _OPERATIONS:
+        raise MathError(f"Unsupported operation: {operation}")
+    left, right = _as_array(a, "a"), _as_array(b, "b")
+    if right.ndim == 1 and right.shape != left.shape:
+        raise MathError(f"a and b have different lengths ({left.size} and {right.size})")
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        return {"results": _to_python(_OPERATIONS[operation](left, right))}
+
+
+@mcp.tool()
+def statistics(
+    values: List[float], percentiles: Optional[List[float]] = None
+) -> Dict[str, Union[float, int, Dict[str, float]]]:
+    """
+    Summary statistics over a list of numbers: count, sum, mean, median,
+    std (population), min, max and percentiles (default 25, 50, 75, 90, 95, 99).
+    """
+    data = _as_array(values, "values")
+    if data.size == 0:
+        raise MathError("values must not be empty")
+    if not np.all(np.isfinite(data)):
+        raise MathError("values must be finite numbers")
+    points = [25, 50, 75, 90, 95, 99] if percentiles is None else percentiles
+    if any(p < 0 or p > 100 for p in points):
+        raise MathError("percentiles must be between 0 and 100")
+    computed = np.percentile(data, points) if points else []
+    return {
+        "count": int(data.size),
+        "sum": float(data.sum()),
+        "mean": float(data.mean()),
+        "median": float(np.median(data)),
+        "std": float(data.std()),
+        "min": float(data.min()),
+        "max": float(data.max()),
+        "percentiles": {f"p{p:g}": float(v) for p, v in zip(points, computed)},
+    }
+
+
+if __name__ == "__main__":
+    # streamable-http for the compose stack, stdio when launched by the agent as a subprocess
+    logger.info("Starting math server (%s)", settings.MATH_TRANSPORT)
+    mcp.run(transport=settings.MATH_TRANSPORT)
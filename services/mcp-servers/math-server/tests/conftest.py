@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+SERVICE = Path(__file__).resolve().parent.parent
+
+# The server's modules import each other by bare name, as when run from src/
+sys.path.insert(0, str(SERVICE / "src"))
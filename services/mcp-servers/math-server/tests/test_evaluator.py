@@ -0,0 +1,40 @@
+import pytest
+
+import main
+from evaluator import evaluate
+from exceptions import MathError
+
+
+def test_expression_is_evaluated_in_one_call():
+    assert evaluate("(12.5 * 4 + 3) / 7") == pytest.approx(53 / 7)
+    assert evaluate("2 ^ 10 + sqrt(16) - abs(-1)") == 1027
+    assert evaluate("x * pi", {"x": 2}) == pytest.approx(6.283185307179586)
+
+
+@pytest.mark.parametrize("expression", [
+    "-" * 1998 + "1",
+    "abs(" * 250 + "1" + ")" * 250,
+    "(" * 250 + "1" + ")" * 250,
+    "+".join(["1"] * 999),
+])
+def test_deeply_nested_expression_is_a_math_error(expression):
+    # The parser itself refuses very deep parentheses
+    with pytest.raises(MathError, match="nested"):
+        evaluate(expression)
+
+
+@pytest.mark.parametrize("expression, message", [
+    ("__import__('os')", "Unknown function"),
+    ("(1).real", "Unsupported syntax"),
+    ("10 ** 5000", "Exponent larger than"),
+    ("9.9 ** 999", "out of range"),
+    ("1 / 0", "Cannot evaluate"),
+])
+def test_unsafe_or_invalid_expression_is_a_math_error(expression, message):
+    with pytest.raises(MathError, match=message):
+        evaluate(expression)
+
+
+def test_evaluate_many_reports_each_failure_in_place():
+    results = main.evaluate_many(["1 + 1", "-" * 1998 + "1", "2 * 3"])["results"]
+    assert results == [2, "error: Expression too deeply nested", 6]
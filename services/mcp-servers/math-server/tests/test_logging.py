@@ -0,0 +1,42 @@
+import asyncio
+import logging
+
+from mcp.shared.memory import create_connected_server_and_client_session
+
+import main
+from logger import TEXT_FORMAT, ContextFilter
+
+
+class Records(logging.Handler):
+    """Collects records with the request id the queue handler would capture."""
+
+    def __init__(self):
+        super().__init__()
+        self.addFilter(ContextFilter())
+        self.records = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def test_tool_call_logs_under_the_callers_request_id():
+    records = Records()
+    main.logger.addHandler(records)
+
+    async def call():
+        async with create_connected_server_and_client_session(main.mcp._mcp_server) as session:
+            tools = {t.name: t for t in (await session.list_tools()).tools}
+            assert "ctx" not in tools["evaluate"].inputSchema["properties"]
+            # The agent's session pool sends the request id in the call's _meta
+            return await session.call_tool("evaluate", {"expression": "6 * 7"}, meta={"x-request-id": "req-42"})
+
+    try:
+        result = asyncio.run(call())
+    finally:
+        main.logger.removeHandler(records)
+
+    assert not result.isError
+    assert result.structuredContent == {"result": 42}
+    [record] = [r for r in records.records if r.getMessage().startswith("Evaluated expression")]
+    assert record.request_id == "req-42"
+    assert "[req-42]" in logging.Formatter(TEXT_FORMAT).format(record)
@@ -4,6 +4,29 @@ class Settings(BaseSettings):
     INTERNAL_API_KEY: str = "supersecretkey"
     WEATHER_API_KEY: str
     LOG_LEVEL: str = "INFO"
+    # Logging: "text" or "json"; SAMPLED per-request lines are kept at LOG_SAMPLE_RATIO
+    LOG_FORMAT: str = "text"
+    LOG_SAMPLE_RATIO: float = 1.0
+    LOG_QUEUE_SIZE: int = 10000
+
+    # Upstream (override to point at a local stub in tests/benchmarks)
+    WEATHER_BASE_URL: str = "https://api.openweathermap.org/data/2.5/weather"
+    WEATHER_HTTP_MAX_CONNECTIONS: int = 20
+    WEATHER_HTTP_TIMEOUT: float = 10.0
+
+    # get_weather_many: cities per call and concurrent upstream fetches per call
+    WEATHER_MANY_MAX_CITIES: int = 25
+    WEATHER_MANY_CONCURRENCY: int = 8
+
+    # Response cache keyed on normalized city name
+    WEATHER_CACHE_TTL_SECONDS: float = 300.0
+    WEATHER_CACHE_MAX_ENTRIES: int = 1024
+
+    # Tracing (OpenTelemetry). Exporters: console | file (JSON lines) | otlp
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "console"
+    TRACING_FILE: str = "traces.jsonl"
+    TRACING_SAMPLE_RATIO: float = 1.0
 
     class Config:
         env_file = ".env"
@@ -1,42 +1,211 @@
+import asyncio
+import json
 import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import anyio
 import httpx
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.types import CallToolResult, TextContent
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from starlette.requests import Request
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from starlette.responses import JSONResponse, Response
 from config import settings
-from logger import setup_logger
+from logger import SAMPLED, request_id, setup_logger
 from exceptions import WeatherError
+from cache import SingleFlight, TTLCache
+from tracing import caller_carrier, caller_context, setup_tracing, tracer
+from metrics import BULK_CITIES, TOOL_CALLS, TOOL_IN_FLIGHT, TOOL_SECONDS, UPSTREAM_SECONDS, register_stats
 
 logger = setup_logger("weather-tool")
-BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
 
 mcp = FastMCP(name="weather", port=8002, host= "0.0.0.0")
 
-@mcp.tool()
-async def get_weather(city: str) -> str:
-    """Return the current weather for a city."""
+cache = TTLCache(settings.WEATHER_CACHE_MAX_ENTRIES, settings.WEATHER_CACHE_TTL_SECONDS)
+single_flight = SingleFlight()
+register_stats("weather_cache", cache.stats, counters=["hits", "misses", "evictions"])
+register_stats("weather_single_flight", single_flight.stats, counters=["calls", "coalesced"])
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """App-scoped pooled client for the upstream weather API, created on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.WEATHER_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.WEATHER_HTTP_MAX_CONNECTIONS,
+            ),
+            timeout=settings.WEATHER_HTTP_TIMEOUT,
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def normalize_city(city: str) -> str:
+    return " ".join(city.split()).casefold()
+
+
+async def _fetch_upstream(city: str, key: str) -> Dict[str, Any]:
+    logger.info("Fetching weather for %s from upstream", city)
+    started = time.perf_counter()
+    status = "error"
     try:
-        logger.info("Fetching weather for %s", city)
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(BASE_URL, params={
+        with tracer.start_as_current_span("GET weather upstream", kind=SpanKind.CLIENT) as span:
+            resp = await get_http_client().get(settings.WEATHER_BASE_URL, params={
                 "q": city,
                 "appid": settings.WEATHER_API_KEY,
                 "units": "metric"
             })
+            status = str(resp.status_code)
+            span.set_attribute("http.response.status_code", resp.status_code)
             resp.raise_for_status()
-            data = resp.json()
+    finally:
+        UPSTREAM_SECONDS.labels(status).observe(time.perf_counter() - started)
+    data = resp.json()
+    result = {"temp": data["main"]["temp"], "description": data["weather"][0]["description"]}
+    cache.set(key, result)
+    return result
+
+
+async def fetch_weather(city: str) -> Dict[str, Any]:
+    """
+    Current conditions for a city, served from the TTL cache when possible.
+    Concurrent misses for the same city share one upstream request.
+    """
+    key = normalize_city(city)
+    cached = cache.get(key)
+    trace.get_current_span().set_attribute("weather.cache_hit", cached is not None)
+    if cached is not None:
+        return cached
+    return await single_flight.do(key, lambda: _fetch_upstream(city, key))
 
-        temp = data["main"]["temp"]
-        desc = data["weather"][0]["description"]
-        result = f"{city}: {desc}, {temp}°C"
-        logger.info("Weather fetched successfully for %s", city)
-        return result
 
-    except httpx.HTTPStatusError as e:
-        logger.error("API error fetching weather: %s", e)
-        raise WeatherError(f"API returned error: {e}")
-    except Exception as e:
-        logger.exception("Unhandled error in weather tool")
-        raise WeatherError(f"Error fetching weather for {city}: {e}")
+@contextmanager
+def tool_call(name: str, ctx: Context, **attributes: Any) -> Iterator[trace.Span]:
+    """Server span (joined to the caller's trace), request id and metrics for one tool call."""
+    carrier = caller_carrier(ctx)
+    request_id.set(carrier.get("x-request-id", "-"))
+    with tracer.start_as_current_span(
+        f"tool {name}", context=caller_context(carrier), kind=SpanKind.SERVER,
+        attributes={"tool.name": name, **attributes},
+    ) as span:
+        started = time.perf_counter()
+        status = "error"
+        TOOL_IN_FLIGHT.labels(name).inc()
+        try:
+            yield span
+            status = "ok"
+        finally:
+            TOOL_IN_FLIGHT.labels(name).dec()
+            TOOL_SECONDS.labels(name).observe(time.perf_counter() - started)
+            TOOL_CALLS.labels(name, status).inc()
+
+
+@mcp.tool()
+async def get_weather(city: str, ctx: Context) -> str:
+    """Return the current weather for a city."""
+    with tool_call("get_weather", ctx, **{"weather.city": city}) as span:
+        try:
+            data = await fetch_weather(city)
+            result = f"{city}: {data['description']}, {data['temp']}°C"
+            logger.info("Weather fetched successfully for %s", city, extra=SAMPLED)
+            return result
+
+        except httpx.HTTPStatusError as e:
+            logger.error("API error fetching weather: %s", e)
+            span.set_status(Status(StatusCode.ERROR, "upstream error"))
+            raise WeatherError(f"API returned error: {e}")
+        except Exception as e:
+            logger.exception("Unhandled error in weather tool")
+            span.set_status(Status(StatusCode.ERROR, type(e).__name__))
+            raise WeatherError(f"Error fetching weather for {city}: {e}")
+
+
+def _describe_failure(e: Exception) -> str:
+    if isinstance(e, httpx.HTTPStatusError):
+        return "city not found" if e.response.status_code == 404 else f"upstream error {e.response.status_code}"
+    if isinstance(e, httpx.TimeoutException):
+        return "upstream timeout"
+    return f"{type(e).__name__}: {e}"
+
+
+async def _city_result(city: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    async with semaphore:
+        with tracer.start_as_current_span("weather city", attributes={"weather.city": city}) as span:
+            try:
+                data = await fetch_weather(city)
+            except Exception as e:
+                span.set_status(Status(StatusCode.ERROR, type(e).__name__))
+                logger.warning("Weather for %s failed in bulk call: %s", city, e)
+                BULK_CITIES.labels("error").inc()
+                return {"city": city, "error": _describe_failure(e)}
+    BULK_CITIES.labels("ok").inc()
+    return {"city": city, "temp_c": data["temp"], "description": data["description"]}
+
+
+@mcp.tool()
+async def get_weather_many(cities: List[str], ctx: Context) -> CallToolResult:
+    """
+    Current weather for several cities in one call, e.g. to compare them.
+    Returns {"results": [{"city", "temp_c", "description"} or {"city", "error"}]}
+    in request order; one city failing does not fail the others.
+    """
+    if len(cities) > settings.WEATHER_MANY_MAX_CITIES:
+        raise WeatherError(f"At most {settings.WEATHER_MANY_MAX_CITIES} cities per call")
+    with tool_call("get_weather_many", ctx, **{"weather.cities": len(cities)}):
+        # Duplicates (after normalization) are fetched once; the cache and
+        # single-flight already share work across calls
+        unique: Dict[str, str] = {}
+        for city in cities:
+            if city.strip():
+                unique.setdefault(normalize_city(city), city.strip())
+        semaphore = asyncio.Semaphore(settings.WEATHER_MANY_CONCURRENCY)
+        fetched = await asyncio.gather(*(_city_result(city, semaphore) for city in unique.values()))
+        by_key = dict(zip(unique, fetched))
+        results = [
+            {**by_key[normalize_city(c)], "city": c.strip()} if c.strip() else {"city": c, "error": "empty city name"}
+            for c in cities
+        ]
+        failed = sum("error" in r for r in results)
+        logger.info("Weather fetched for %d cities (%d failed)", len(results) - failed, failed, extra=SAMPLED)
+        data = {"results": results}
+        # Compact JSON for the model (FastMCP would indent a returned dict), and
+        # the same document as structured content for clients that read it
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        return CallToolResult(content=[TextContent(type="text", text=text)], structuredContent=data)
+
+
+@mcp.custom_route("/cache/stats", methods=["GET"])
+async def cache_stats(request: Request) -> JSONResponse:
+    return JSONResponse({"cache": cache.stats(), "single_flight": single_flight.stats()})
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+async def serve() -> None:
+    """Run the streamable-HTTP server; the upstream client is closed once it stops."""
+    try:
+        await mcp.run_streamable_http_async()
+    finally:
+        await close_http_client()
+
 
 if __name__ == "__main__":
-    # Uses the latest streamable-HTTP transport
-    mcp.run(transport="streamable-http")
+    setup_tracing("weather-server")
+    # Uses the latest streamable-HTTP transport (what mcp.run(transport="streamable-http") runs)
+    anyio.run(serve)
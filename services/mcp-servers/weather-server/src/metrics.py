@@ -0,0 +1,41 @@
+from typing import Any, Callable, Dict, Iterable
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import REGISTRY, CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+TOOL_SECONDS = Histogram("weather_tool_duration_seconds", "Weather tool latency", ["tool"], buckets=LATENCY_BUCKETS)
+TOOL_CALLS = Counter("weather_tool_calls", "Weather tool calls by outcome (ok, error)", ["tool", "status"])
+TOOL_IN_FLIGHT = Gauge("weather_tool_in_flight", "Weather tool calls being handled", ["tool"])
+BULK_CITIES = Counter("weather_bulk_cities", "Cities requested through get_weather_many by outcome", ["status"])
+UPSTREAM_SECONDS = Histogram(
+    "weather_upstream_duration_seconds", "Weather API request latency", ["status"], buckets=LATENCY_BUCKETS
+)
+
+
+class StatsCollector(Collector):
+    """
+    Exposes the numeric fields of a component's stats() dict, read only at
+    scrape time. Fields named in `counters` become counters, the rest gauges.
+    """
+
+    def __init__(self, prefix: str, stats: Callable[[], Dict[str, Any]], counters: Iterable[str] = ()):
+        self.prefix = prefix
+        self.stats = stats
+        self.counters = set(counters)
+
+    def collect(self):
+        for name, value in self.stats().items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            metric = f"{self.prefix}_{name}"
+            if name in self.counters:
+                yield CounterMetricFamily(metric, f"{self.prefix} {name}", value=value)
+            else:
+                yield GaugeMetricFamily(metric, f"{self.prefix} {name}", value=value)
+
+
+def register_stats(prefix: str, stats: Callable[[], Dict[str, Any]], counters: Iterable[str] = ()) -> None:
+    REGISTRY.register(StatsCollector(prefix, stats, counters))
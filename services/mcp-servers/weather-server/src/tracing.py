@@ -0,0 +1,85 @@
+from typing import Any, Dict, Optional, Sequence
+
+from opentelemetry import context, propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor, ConsoleSpanExporter, SimpleSpanProcessor, SpanExporter, SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+from config import settings
+from logger import setup_logger
+
+logger = setup_logger("tracing")
+
+# Until setup_tracing() installs a provider this hands out no-op spans
+tracer = trace.get_tracer("weather-server")
+
+_configured = False
+
+
+class JSONLinesSpanExporter(SpanExporter):
+    """Appends one JSON object per finished span to a local file."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", buffering=1)
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        for span in spans:
+            self._file.write(span.to_json(indent=None) + "\n")
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        self._file.close()
+
+
+def _span_processor():
+    kind = settings.TRACING_EXPORTER.lower()
+    if kind == "otlp":
+        # Optional: pip install opentelemetry-exporter-otlp-proto-http; reads OTEL_EXPORTER_OTLP_*
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return BatchSpanProcessor(OTLPSpanExporter())
+    # Local exporters write each span as it ends: uvicorn exits on SIGTERM
+    # without running atexit hooks, which would drop a batch still in memory
+    if kind == "file":
+        return SimpleSpanProcessor(JSONLinesSpanExporter(settings.TRACING_FILE))
+    return SimpleSpanProcessor(ConsoleSpanExporter())
+
+
+def setup_tracing(service_name: str) -> None:
+    """Install the global tracer provider when TRACING_ENABLED is set."""
+    global _configured
+    if _configured or not settings.TRACING_ENABLED:
+        return
+    _configured = True
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    provider.add_span_processor(_span_processor())
+    trace.set_tracer_provider(provider)
+    logger.info("Tracing enabled (%s exporter)", settings.TRACING_EXPORTER)
+
+
+def caller_carrier(ctx: Any) -> Dict[str, str]:
+    """
+    Propagation fields (traceparent, x-request-id) sent by the agent with a
+    tool call: in the request's _meta (persistent sessions) or, failing that,
+    in the HTTP request headers.
+    """
+    request_context = ctx.request_context
+    carrier: Dict[str, str] = {}
+    request = getattr(request_context, "request", None)
+    if request is not None and hasattr(request, "headers"):
+        carrier.update(request.headers)
+    if request_context.meta is not None:
+        carrier.update({k: v for k, v in request_context.meta.model_dump().items() if isinstance(v, str)})
+    return carrier
+
+
+def caller_context(carrier: Dict[str, str]) -> Optional[context.Context]:
+    """Trace context of the agent's tool call, or None when tracing is off."""
+    if not _configured:
+        return None
+    return propagate.extract(carrier)
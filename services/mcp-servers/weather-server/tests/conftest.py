@@ -0,0 +1,47 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+SERVICE = Path(__file__).resolve().parent.parent
+ROOT = SERVICE.parent.parent.parent
+
+# The server's modules import each other by bare name, as when run from src/
+sys.path.insert(0, str(SERVICE / "src"))
+os.environ.setdefault("WEATHER_API_KEY", "test")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def upstream():
+    """benchmarks/stubs/weather_upstream.py on a free port, answering after 200ms."""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, str(ROOT / "benchmarks" / "stubs" / "weather_upstream.py"),
+         "--port", str(port), "--latency-ms", "200"],
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 15
+        while True:
+            try:
+                httpx.get(f"{base}/stats")
+                break
+            except httpx.TransportError:
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise RuntimeError("weather upstream stub did not start")
+                time.sleep(0.1)
+        yield base
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
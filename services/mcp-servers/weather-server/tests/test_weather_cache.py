@@ -0,0 +1,81 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+from cache import SingleFlight, TTLCache
+from config import settings
+
+
+def upstream_calls(base: str) -> int:
+    return httpx.get(f"{base}/stats").json()["calls"]
+
+
+@pytest.fixture
+def server(upstream, monkeypatch):
+    """The weather module pointed at the stub, with an empty cache and single-flight."""
+    monkeypatch.setattr(settings, "WEATHER_BASE_URL", f"{upstream}/data/2.5/weather")
+    monkeypatch.setattr(main, "cache", TTLCache(16, 60))
+    monkeypatch.setattr(main, "single_flight", SingleFlight())
+    return main
+
+
+def run(coro):
+    """Run on a fresh loop, closing the upstream client the loop's connections belong to."""
+    async def wrapper():
+        try:
+            return await coro
+        finally:
+            await main.close_http_client()
+
+    return asyncio.run(wrapper())
+
+
+def test_concurrent_misses_share_one_upstream_request(server, upstream):
+    async def lookups():
+        return await asyncio.gather(*(server.fetch_weather("Paris") for _ in range(10)))
+
+    before = upstream_calls(upstream)
+    results = run(lookups())
+    assert upstream_calls(upstream) - before == 1
+    assert all(r == results[0] for r in results)
+    assert server.single_flight.stats()["coalesced"] == 9
+
+
+def test_repeat_lookup_is_served_from_cache(server, upstream):
+    before = upstream_calls(upstream)
+    first = run(server.fetch_weather("Oslo"))
+    # Different spelling, same normalized key
+    second = run(server.fetch_weather("  oslo "))
+    assert second == first
+    assert upstream_calls(upstream) - before == 1
+    assert server.cache.stats()["hits"] == 1
+
+
+def test_expired_entry_is_fetched_again(server, upstream, monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(server, "cache", TTLCache(16, 60, clock=lambda: now[0]))
+    before = upstream_calls(upstream)
+    run(server.fetch_weather("Lima"))
+    now[0] = 61
+    run(server.fetch_weather("Lima"))
+    assert upstream_calls(upstream) - before == 2
+
+
+def test_upstream_errors_are_not_cached(server, upstream):
+    # The stub rejects an empty city with 400
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            run(server.fetch_weather(""))
+    assert server.cache.stats()["entries"] == 0
+
+
+def test_close_http_client_releases_the_pool(server):
+    async def check():
+        client = server.get_http_client()
+        await server.close_http_client()
+        assert client.is_closed
+        assert server.get_http_client() is not client
+
+    run(check())
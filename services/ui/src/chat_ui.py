@@ -7,6 +7,7 @@ interactions, conversation history, and communication with the backend services.
 
 Features:
 - Real-time chat interface with conversation history
+- Incremental (token-by-token) rendering of streamed responses
 - Error handling and user feedback
 - Session state management
 - Responsive UI with proper styling
@@ -19,10 +20,12 @@ from streamlit import config
 config.set_option("browser.gatherUsageStats", False)
 
 import streamlit as st
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Optional
 import traceback
+import uuid
 
-from utils.api_client import post_agentic_query
+from utils.api_client import post_agentic_query, stream_agentic_query
+from utils.config import settings
 from utils.logger import setup_logger
 from utils.ui_helpers import inject_custom_css
 
@@ -48,6 +51,7 @@ UI_TEXT = {
     "send_button": "Send 🚀",
     "clear_button": "🧹 Clear Chat History",
     "thinking_message": "Thinking...",
+    "tool_call_message": "🔧 Calling `{name}`...",
     "clear_success": "Chat history cleared.",
     "error_prefix": "❌"
 }
@@ -67,6 +71,9 @@ def initialize_session_state() -> None:
         if "chat_history" not in st.session_state:
             st.session_state.chat_history = []
             logger.info("Initialized chat history in session state")
+        if "thread_id" not in st.session_state:
+            # The agent keeps this conversation's context under this id
+            st.session_state.thread_id = uuid.uuid4().hex
     except Exception as e:
         logger.error(f"Error initializing session state: {str(e)}")
         st.error("Failed to initialize application state")
@@ -116,7 +123,7 @@ def process_user_query(user_input: str) -> Dict[str, Any]:
         logger.info(f"Processing user query: '{user_input[:50]}{'...' if len(user_input) > 50 else ''}'")
         
         # Make API call to backend
-        result = post_agentic_query(user_input)
+        result = post_agentic_query(user_input, st.session_state.thread_id)
         
         if result.get("status") == "success":
             logger.info("Query processed successfully")
@@ -134,6 +141,64 @@ def process_user_query(user_input: str) -> Dict[str, Any]:
         }
 
 
+def stream_user_query(user_input: str, container) -> Dict[str, Any]:
+    """
+    Stream the assistant's answer into the chat container as tokens arrive.
+    
+    Args:
+        user_input (str): The user's input message
+        container: Streamlit container the conversation is rendered in
+        
+    Returns:
+        Dict[str, Any]: Result dictionary with status and content, in the same
+        shape as process_user_query
+    """
+    try:
+        logger.info(f"Streaming user query: '{user_input[:50]}{'...' if len(user_input) > 50 else ''}'")
+        answer = ""
+
+        with container:
+            with st.chat_message("user"):
+                st.markdown(user_input)
+
+            with st.chat_message("assistant"):
+                status = st.empty()
+                placeholder = st.empty()
+                status.caption(UI_TEXT["thinking_message"])
+
+                for event in stream_agentic_query(user_input, st.session_state.thread_id):
+                    kind, data = event.get("event"), event.get("data", {})
+                    if kind == "token":
+                        answer += data.get("content", "")
+                        placeholder.markdown(answer + "▌")
+                    elif kind == "tool_call":
+                        status.caption(UI_TEXT["tool_call_message"].format(name=data.get("name", "tool")))
+                    elif kind == "tool_result":
+                        # The model continues after the tool; earlier tokens were its preamble
+                        answer = ""
+                        status.caption(UI_TEXT["thinking_message"])
+                    elif kind == "done":
+                        answer = data.get("content") or answer
+                    elif kind == "error":
+                        status.empty()
+                        placeholder.empty()
+                        return {"status": "error", "content": data.get("detail", "Unknown error")}
+
+                status.empty()
+                placeholder.markdown(answer or "No response.")
+
+        logger.info("Streamed query processed successfully")
+        return {"status": "success", "content": {"content": answer or "No response."}}
+
+    except Exception as e:
+        logger.error(f"Error streaming user query: {str(e)}")
+        logger.debug(f"Full traceback: {traceback.format_exc()}")
+        return {
+            "status": "error",
+            "content": "An unexpected error occurred while processing your request."
+        }
+
+
 def add_to_chat_history(user_input: str, bot_response: str) -> None:
     """
     Add a conversation pair to the chat history.
@@ -159,6 +224,8 @@ def clear_chat_history() -> None:
     try:
         history_length = len(st.session_state.chat_history)
         st.session_state.chat_history.clear()
+        # Start a fresh agent-side conversation as well
+        st.session_state.thread_id = uuid.uuid4().hex
         logger.info(f"Cleared chat history ({history_length} entries)")
         st.success(UI_TEXT["clear_success"])
         
@@ -167,15 +234,19 @@ def clear_chat_history() -> None:
         st.error("Failed to clear chat history")
 
 
-def render_chat_history() -> None:
+def render_chat_history():
     """
     Render the chat history in the UI.
     
     This function displays all previous conversation exchanges
     in a structured format with proper message attribution.
+    
+    Returns:
+        The chat container, so streamed responses can be rendered into it
     """
     try:
-        with st.container(height=450, border= False):
+        chat_container = st.container(height=450, border= False)
+        with chat_container:
             #st.markdown(UI_TEXT["conversation_header"])
             
             # Display each conversation pair
@@ -193,10 +264,13 @@ def render_chat_history() -> None:
                     logger.error(f"Error rendering chat entry {i}: {str(e)}")
                     # Continue rendering other messages even if one fails
                     continue
+
+        return chat_container
                     
     except Exception as e:
         logger.error(f"Error rendering chat history: {str(e)}")
         st.error("Failed to display chat history")
+        return st.container()
 
 
 def render_input_form() -> Optional[str]:
@@ -291,7 +365,7 @@ def main() -> None:
         # Render Scrollable Chat History
         # --------------------------------------------
         st.markdown('<div class="responsive-chat-container " id="chat-box">', unsafe_allow_html=True)
-        render_chat_history()
+        chat_container = render_chat_history()
         st.markdown('</div>', unsafe_allow_html=True)
 
         # --------------------------------------------
@@ -308,8 +382,11 @@ def main() -> None:
             logger.info(f"📨 Received user input: {user_input}")
             
             if validate_user_input(user_input):
-                with st.spinner(UI_TEXT["thinking_message"]):
-                    result = process_user_query(user_input)
+                if settings.STREAMING_ENABLED:
+                    result = stream_user_query(user_input, chat_container)
+                else:
+                    with st.spinner(UI_TEXT["thinking_message"]):
+                        result = process_user_query(user_input)
 
                 if result.get("status") == "success":
                     try:
@@ -1,16 +1,27 @@
+import json
+from typing import Any, Dict, Iterator, Optional
+
 import requests
 from .config import settings
 from .logger import setup_logger
 
 logger = setup_logger()
 
-def post_agentic_query(query: str) -> dict:
+def _payload(query: str, thread_id: Optional[str]) -> Dict[str, Any]:
+    payload = {"query": query}
+    if thread_id:
+        payload["thread_id"] = thread_id
+    return payload
+
+
+def post_agentic_query(query: str, thread_id: Optional[str] = None) -> dict:
     """
-    Sends a POST request to the Agentic RAG API endpoint.
+    Sends a POST request to the Agentic RAG API endpoint. With a thread_id the
+    agent answers in the context of that conversation.
     """
     try:
         headers = {"X-INTERNAL-KEY": settings.INTERNAL_API_KEY}
-        payload = {"query": query}
+        payload = _payload(query, thread_id)
         response = requests.post(f"{settings.API_GATEWAY_URL}/ask", json=payload, headers=headers, timeout=15)
 
         if response.ok:
@@ -21,4 +32,43 @@ def post_agentic_query(query: str) -> dict:
 
     except Exception as e:
         logger.exception("API call error")
-        return {"status": "error", "content": "Internal error occurred"}
\ No newline at end of file
+        return {"status": "error", "content": "Internal error occurred"}
+
+
+def stream_agentic_query(query: str, thread_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Sends a POST request to the streaming endpoint and yields parsed SSE events
+    as {"event": str, "data": dict} while the agent is still running.
+    """
+    headers = {"X-INTERNAL-KEY": settings.INTERNAL_API_KEY, "Accept": "text/event-stream"}
+    payload = _payload(query, thread_id)
+    try:
+        with requests.post(
+            f"{settings.API_GATEWAY_URL}/ask/stream",
+            json=payload,
+            headers=headers,
+            stream=True,
+            timeout=(5, settings.STREAM_READ_TIMEOUT),
+        ) as response:
+            if not response.ok:
+                logger.warning("Streaming API call failed: %s", response.status_code)
+                yield {"event": "error", "data": {"detail": "Unknown error"}}
+                return
+
+            event, data_lines = "message", []
+            for line in response.iter_lines(decode_unicode=True):
+                if line is None:
+                    continue
+                if line == "":
+                    # Blank line terminates an event
+                    if data_lines:
+                        yield {"event": event, "data": json.loads("\n".join(data_lines))}
+                    event, data_lines = "message", []
+                elif line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data_lines.append(line[len("data:"):].strip())
+
+    except Exception:
+        logger.exception("Streaming API call error")
+        yield {"event": "error", "data": {"detail": "Internal error occurred"}}
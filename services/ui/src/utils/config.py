@@ -5,6 +5,8 @@ from pydantic import AnyHttpUrl, ValidationError
 class Settings(BaseSettings):
     API_GATEWAY_URL: AnyHttpUrl = "http://localhost:8000"
     INTERNAL_API_KEY: str = "supersecretkey"
+    STREAMING_ENABLED: bool = True
+    STREAM_READ_TIMEOUT: float = 120.0
 
     class Config:
         env_prefix = ""